@@ -1,4 +1,6 @@
 from views.BaseView import BaseView
+from models.StorageFactory import StorageFactory
+from utils.Settings import Settings
 from controllers.HomeController import HomeController
 from controllers.PlayerController import PlayerController
 from controllers.TournamentController import TournamentController
@@ -23,14 +25,24 @@ class MainController:
         Features:
             - Sets up main window properties
             - Initializes base view
+            - Creates the shared data manager and snapshot store
             - Creates and manages sub-controllers
             - Manages view navigation
+            - Writes pending saves on view switch and when the window
+              is closed
         """
         self.root = root
         self.root.title("Gestion de tournois d'échecs")
         self.root.geometry("1024x768")
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         self.base_view = BaseView(root)
 
+        # Shared repository used by every controller
+        self.settings = Settings.load()
+        self.data_manager = StorageFactory.create(self.settings)
+        # Snapshots taken before risky operations
+        self.snapshots = StorageFactory.create_snapshots(self.settings)
+
         # Initialize controllers
         self.home_controller = HomeController(self)
         self.player_controller = PlayerController(self)
@@ -69,6 +81,7 @@ class MainController:
             view.grid(row=0, column=0, sticky="nsew")
         # Show home view by default
         self.show_view("home")
+        self.refresh_unsaved_changes()
 
     def show_view(self, view_name):
         """Switch to the specified view
@@ -77,6 +90,8 @@ class MainController:
             view_name (str): Name of the view to display
             ('home', 'players', or 'tournaments')
         """
+        # Write what the previous view changed before leaving it
+        self.data_manager.flush()
         # If switching to rounds view, make sure tournament data is passed
         if view_name == "rounds" :
             self.views["rounds"].show()
@@ -84,3 +99,13 @@ class MainController:
             self.views["reports"].refresh_data()
 
         self.views[view_name].tkraise()
+
+    def refresh_unsaved_changes(self):
+        """Update the unsaved changes count, then schedule the next update"""
+        self.base_view.set_unsaved_changes(self.data_manager.unsaved_changes)
+        self.root.after(500, self.refresh_unsaved_changes)
+
+    def on_close(self):
+        """Write pending saves, then close the application window"""
+        self.data_manager.flush()
+        self.root.destroy()
@@ -1,5 +1,5 @@
 from models.Player import Player
-from models.DataManager import DataManager
+from utils.PlayerImport import read_players_csv, validate_player
 
 
 class PlayerController:
@@ -12,9 +12,11 @@ class PlayerController:
             master_controller: Main application controller
         """
         self.master_controller = master_controller
-        self.data_manager = DataManager()
+        self.data_manager = master_controller.data_manager
+        self.snapshots = master_controller.snapshots
         self.callbacks = {
             'save_player': self.save_player,
+            'import_players': self.import_players,
             'load_players': self.load_players,
             'return_home': self.return_home
         }
@@ -42,18 +44,9 @@ class PlayerController:
             tuple: (success: bool, message: str)
         """
         # Data validation
-        if not all([player_data["last_name"],
-                    player_data["first_name"],
-                    player_data["birth_date"],
-                    player_data["national_id"]]):
-            return False, "Tous les champs sont obligatoires."
-
-        # Validate national ID format
-        national_id = player_data["national_id"].upper()
-        if not (len(national_id) == 7 and
-                national_id[:2].isalpha() and
-                national_id[2:].isdigit()):
-            return False, "L'ID national doit contenir 2 lettres suivies de 5 chiffres"
+        error = validate_player(player_data)
+        if error:
+            return False, error
 
         # Check for existing player with the same ID
         players = self.load_players()
@@ -66,17 +59,6 @@ class PlayerController:
             elif edit_mode and player_data.get("original_id") != national_id:
                 # In edit mode, only a different existing ID is an error
                 return False, f"Un joueur avec l'ID {national_id} existe déjà."
-        # Validate birth date format
-        try:
-            day, month, year = player_data["birth_date"].split('/')
-            if not (len(day) == 2 and len(month) == 2 and len(year) == 4):
-                raise ValueError
-            if not (1 <= int(day) <= 31
-                    and 1 <= int(month) <= 12
-                    and 1900 <= int(year) <= 2100):
-                raise ValueError
-        except ValueError:
-            return False, "Format de date invalide. Utilisez JJ/MM/AAAA"
 
         # Create and save the new player
         player = Player(player_data["last_name"],
@@ -98,14 +80,41 @@ class PlayerController:
                                f"créé avec succès")
         return True, success_message
 
+    def import_players(self, filepath):
+        """Import players from a CSV file with a single write
+
+        Every row is validated as in `save_player`; invalid rows and IDs
+        already registered are reported and the other players are saved.
+
+        Args:
+            filepath (str): Path of a CSV file with the columns last_name,
+            first_name, birth_date and national_id
+
+        Returns:
+            tuple: (number of imported players,
+            list of (line number, error message))
+        """
+        try:
+            with open(filepath,
+                      "r",
+                      encoding="utf-8-sig",
+                      newline="") as file:
+                players, errors = read_players_csv(file, self.load_players())
+        except (OSError, UnicodeDecodeError) as error:
+            return 0, [(0, f"Impossible de lire le fichier : {error}")]
+        if players:
+            self.snapshots.take(self.data_manager, "Import de joueurs CSV")
+            self.data_manager.save_players([Player.from_dict(player_data)
+                                            for player_data in players.values()])
+        return len(players), errors
+
     def load_players(self):
         """Load all players from the database
 
        Returns:
             dict: Dictionary of all players, keyed by national ID
         """
-        data = self.data_manager.load_data()
-        return data.get("players", {})
+        return self.data_manager.get_players()
 
     def return_home(self):
         """Navigate back to home view"""
@@ -1,3 +1,6 @@
+from utils.Dates import format_date, format_time
+
+
 class ReportController:
     """Controller for generating and displaying reports"""
 
@@ -8,7 +11,7 @@ class ReportController:
             master_controller: Main application controller
         """
         self.master_controller = master_controller
-        self.data_manager = master_controller.tournament_controller.data_manager
+        self.data_manager = master_controller.data_manager
         self.callbacks = {
             'load_all_players':
                 self.load_all_players,
@@ -51,8 +54,7 @@ class ReportController:
         Returns:
             dict: Dictionary of all players
         """
-        data = self.data_manager.load_data()
-        return data.get("players", {})
+        return self.data_manager.get_players()
 
     def load_all_tournaments(self):
         """Load all tournaments from the database
@@ -60,8 +62,7 @@ class ReportController:
         Returns:
             dict: Dictionary of all tournaments
         """
-        data = self.data_manager.load_data()
-        return data.get("tournaments", {})
+        return self.data_manager.get_tournaments()
 
     def get_tournament_details(self, tournament_name):
         """Get details of a specific tournament
@@ -72,9 +73,7 @@ class ReportController:
         Returns:
             dict: Tournament details
         """
-        data = self.data_manager.load_data()
-        tournaments = data.get("tournaments", {})
-        return tournaments.get(tournament_name, {})
+        return self.data_manager.find_tournament(tournament_name)
 
     def get_tournament_players(self, tournament_name):
         """Get players of a specific tournament
@@ -85,19 +84,7 @@ class ReportController:
         Returns:
             dict: Dictionary of tournament players
         """
-        data = self.data_manager.load_data()
-        tournaments = data.get("tournaments", {})
-        tournament = tournaments.get(tournament_name, {})
-
-        # Get player IDs from tournament
-        player_ids = tournament.get('players', [])
-
-        # Get player details
-        all_players = data.get("players", {})
-        tournament_players = ({player_id: all_players.get(player_id, {})
-                              for player_id in player_ids if player_id in all_players})
-
-        return tournament_players
+        return self.data_manager.get_tournament_players(tournament_name)
 
     def get_tournament_rounds_matches(self, tournament_name):
         """Get rounds and matches of a specific tournament
@@ -108,11 +95,7 @@ class ReportController:
         Returns:
             list: List of rounds with matches
         """
-        data = self.data_manager.load_data()
-        tournaments = data.get("tournaments", {})
-        tournament = tournaments.get(tournament_name, {})
-
-        return tournament.get('rounds_data', [])
+        return self.data_manager.get_tournament_rounds(tournament_name)
 
     def get_players_alphabetical(self):
         """Get all players sorted alphabetically by last name
@@ -126,41 +109,43 @@ class ReportController:
         # Sort players alphabetically by name
         sorted_players = sorted(
             players_data.items(),
-            key=lambda x: x[1].get('last_name', '').lower()
-            if isinstance(x[1], dict) else ''
+            key=lambda x: x[1]['last_name'].lower()
         )
 
         # Format for display
         result = []
         for player_id, player in sorted_players:
-            if isinstance(player, dict):
-                result.append({
-                    'last_name': player.get('last_name', ''),
-                    'first_name': player.get('first_name', ''),
-                    'birth_date': player.get('birth_date', ''),
-                    'id': player_id
-                })
+            result.append({
+                'last_name': player['last_name'],
+                'first_name': player['first_name'],
+                'birth_date': player['birth_date'],
+                'id': player_id
+            })
 
         return result
 
     def get_tournaments_for_display(self):
-        """Get all tournaments formatted for display
+        """Get all tournaments formatted for display, by start date
 
         Returns:
             list: List of tournament dictionaries with display-ready format
         """
-        # Use load_all_tournaments instead of tournament_manager
-        tournaments_data = self.load_all_tournaments()
+        tournaments_data = self.data_manager.get_tournament_summaries()
+
+        # Dates are ordinals, tournaments without one come last
+        ordered = sorted(tournaments_data.items(),
+                         key=lambda item: (item[1]['start_date'] is None,
+                                           item[1]['start_date'] or 0))
 
         # Format for display
         result = []
-        for name, tournament in tournaments_data.items():
+        for name, tournament in ordered:
             result.append({
                 'name': name,
-                'location': tournament.get('location', ''),
-                'start_date': tournament.get('start_date', ''),
-                'end_date': tournament.get('end_date', ''),
-                'status': tournament.get('status', 'Non démarré')
+                'location': tournament['location'],
+                'start_date': format_date(tournament['start_date']),
+                'end_date': format_date(tournament['end_date']),
+                'status': tournament['status']
             })
 
         return result
@@ -171,9 +156,7 @@ class ReportController:
         Returns:
             list: List of tournament names
         """
-        # Use load_all_tournaments instead of tournament_manager
-        tournaments_data = self.load_all_tournaments()
-        return list(tournaments_data.keys())
+        return list(self.data_manager.get_tournament_summaries())
 
     def get_tournament_details_for_display(self, tournament_name):
         """Get details of a specific tournament formatted for display
@@ -191,8 +174,7 @@ class ReportController:
                 'data': None
             }
 
-        # Use get_tournament_details instead of tournament_manager
-        tournament_data = self.get_tournament_details(tournament_name)
+        tournament_data = self.data_manager.get_tournament_summary(tournament_name)
 
         if not tournament_data:
             return {
@@ -205,8 +187,8 @@ class ReportController:
         result = {
             'name': tournament_name,
             'location': tournament_data.get('location', ''),
-            'start_date': tournament_data.get('start_date', ''),
-            'end_date': tournament_data.get('end_date', ''),
+            'start_date': format_date(tournament_data['start_date']),
+            'end_date': format_date(tournament_data['end_date']),
             'rounds': tournament_data.get('rounds', ''),
             'description': tournament_data.get('description', ''),
             'status': tournament_data.get('status', 'Non démarré')
@@ -253,9 +235,9 @@ class ReportController:
         result = []
         for player_id, player in sorted_players:
             result.append({
-                'last_name': player.get('last_name', ''),
-                'first_name': player.get('first_name', ''),
-                'birth_date': player.get('birth_date', ''),
+                'last_name': player['last_name'],
+                'first_name': player['first_name'],
+                'birth_date': player['birth_date'],
                 'id': player_id
             })
 
@@ -281,69 +263,40 @@ class ReportController:
                 'data': None
             }
 
-        rounds_data = self.get_tournament_rounds_matches(tournament_name)
+        tournament = self.data_manager.load_tournament(tournament_name)
 
-        if not rounds_data:
+        if not tournament or not tournament.rounds_data:
             return {
                 'success': False,
                 'message': f"Aucun tour trouvé pour le tournoi {tournament_name}",
                 'data': None
             }
 
-        # Get players data for displaying names
-        players_data = self.load_all_players()
+        # Player names of the tournament, players deleted since are left blank
+        player_names = {player.national_id: player.full_name
+                        for player in tournament.players}
 
         # Format rounds and matches for display
         formatted_rounds = []
-        try:
-            for round_data in rounds_data:
-                formatted_round = {
-                    'name': round_data.get('name', ''),
-                    'start_time': round_data.get('start_time', 'Non démarré'),
-                    'end_time': round_data.get('end_time', 'En cours'),
-                    'matches': []
-                }
-
-                # Format matches
-                matches = round_data.get('matches', [])
-                for match in matches:
-                    if len(match) != 2:
-                        continue  # Skip invalid matches
-
-                    player1_id, score1 = match[0]
-                    player2_id, score2 = match[1]
-
-                    player1_data = players_data.get(player1_id, {})
-                    player2_data = players_data.get(player2_id, {})
-
-                    player1_name = player1_data.get('last_name', '')
-                    player2_name = player2_data.get('last_name', '')
-                    player1_first_name = player1_data.get('first_name', '')
-                    player2_first_name = player2_data.get('first_name', '')
-
-                    formatted_match = {
-                        'player1_name': f"{player1_first_name} {player1_name}".strip(),
-                        'score1': score1,
-                        'player2_name': f"{player2_first_name} {player2_name}".strip(),
-                        'score2': score2
-                    }
-
-                    formatted_round['matches'].append(formatted_match)
-
-                formatted_rounds.append(formatted_round)
+        for round_data in tournament.rounds_data:
+            formatted_rounds.append({
+                'name': round_data.name,
+                'start_time': format_time(round_data.start_time),
+                'end_time': (format_time(round_data.end_time)
+                             if round_data.is_finished else 'En cours'),
+                'matches': [{'player1_name': player_names.get(match.player1, ''),
+                             'score1': match.score1,
+                             'player2_name': ("Exemption" if match.is_bye
+                                              else player_names.get(match.player2, '')),
+                             'score2': match.score2}
+                            for match in round_data.matches]
+            })
 
-            return {
-                'success': True,
-                'message': "",
-                'data': formatted_rounds
-            }
-        except Exception as e:
-            # Add error handling to prevent crashes
-            return {
-                'success': False,
-                'message': f"Erreur lors du traitement des données: {str(e)}",
-                'data': None
-            }
+        return {
+            'success': True,
+            'message': "",
+            'data': formatted_rounds
+        }
 
     def return_home(self):
         """Navigate back to home view"""
@@ -364,7 +317,7 @@ class ReportController:
             }
 
         # Get tournament data
-        tournament_data = self.get_tournament_details(tournament_name)
+        tournament_data = self.data_manager.get_tournament_summary(tournament_name)
 
         if not tournament_data:
             return {
@@ -373,41 +326,29 @@ class ReportController:
                 'data': None
             }
 
-        # Calculate player points
-        player_points = {}
-        rounds_data = tournament_data.get('rounds_data', [])
-
-        # Initialize points for all players
-        for player_id in tournament_data.get('players', []):
-            player_points[player_id] = 0
-
-        # Sum points from all rounds
-        for round_data in rounds_data:
-            for match in round_data.get('matches', []):
-                if len(match) == 2:
-                    player1_id, score1 = match[0]
-                    player2_id, score2 = match[1]
-
-                    if player1_id in player_points:
-                        player_points[player1_id] += float(score1)
-                    if player2_id in player_points:
-                        player_points[player2_id] += float(score2)
+        # Standings are maintained as scores are entered
+        standings = self.data_manager.get_tournament_standings(tournament_name)
 
         # Sort players by points (descending)
-        sorted_players = sorted(player_points.items(), key=lambda x: x[1], reverse=True)
+        sorted_players = sorted(standings.items(),
+                                key=lambda x: x[1]['points'], reverse=True)
 
         # Get player details
-        players_data = self.load_all_players()
+        players_data = self.get_tournament_players(tournament_name)
 
         # Format for display
         result = []
-        for rank, (player_id, scores) in enumerate(sorted_players, 1):
+        for rank, (player_id, entry) in enumerate(sorted_players, 1):
             player_data = players_data.get(player_id, {})
             result.append({
                 'rank': rank,
                 'last_name': player_data.get('last_name', ''),
                 'first_name': player_data.get('first_name', ''),
-                'score': scores
+                'score': entry['points'],
+                'played': entry['played'],
+                'wins': entry['wins'],
+                'draws': entry['draws'],
+                'losses': entry['losses']
             })
 
         return {
@@ -1,6 +1,8 @@
-from datetime import datetime
 import random
-from models.DataManager import DataManager
+from models.Match import Match
+from models.Pairing import dutch_pairs, pairing_history, swiss_pairs
+from models.Round import Round
+from utils.Dates import today
 
 
 class RoundController:
@@ -13,7 +15,8 @@ class RoundController:
             master_controller: Main application controller
         """
         self.master_controller = master_controller
-        self.data_manager = DataManager()
+        self.data_manager = master_controller.data_manager
+        self.snapshots = master_controller.snapshots
         self.current_tournament = None
         self.callbacks = {
             'get_current_tournament': self.get_current_tournament,
@@ -45,27 +48,24 @@ class RoundController:
         self.current_tournament = tournament_name
 
     def get_current_tournament(self):
-        """Get the current tournament data
+        """Get the current tournament
 
         Returns:
-            dict: Current tournament data
+            Tournament: Current tournament, None if not found
         """
         if not self.current_tournament:
             self.current_tournament = (self.master_controller.
                                        tournament_controller.current_tournament)
 
-        data = self.data_manager.load_data()
-        tournaments = data.get("tournaments", {})
-        return tournaments.get(self.current_tournament, {})
+        return self.data_manager.load_tournament(self.current_tournament)
 
     def get_rounds_data(self):
         """Get rounds data for current tournament
 
         Returns:
-            list: List of rounds data
+            list: Round objects of the tournament
         """
-        tournament_data = self.get_current_tournament()
-        return tournament_data.get('rounds_data', [])
+        return self.get_current_tournament().rounds_data
 
     def get_player_scores(self):
         """Get player scores for current tournament
@@ -82,8 +82,7 @@ class RoundController:
         Returns:
             dict: Dictionary of player data
         """
-        data = self.data_manager.load_data()
-        return data.get("players", {})
+        return self.data_manager.get_players()
 
     def create_new_round(self):
         """Create a new round with paired players
@@ -91,26 +90,26 @@ class RoundController:
         Returns:
             tuple: (success, message)
         """
-        tournament_data = self.get_current_tournament()
+        tournament = self.get_current_tournament()
 
         # Check if tournament exists
-        if not tournament_data:
+        if not tournament:
             return False, "Tournoi non trouvé"
 
         # Check if all previous rounds are completed
-        rounds_data = tournament_data.get('rounds_data', [])
+        rounds_data = tournament.rounds_data
         for round_data in rounds_data:
-            if not round_data.get('end_time'):
+            if not round_data.is_finished:
                 return False, ("Veuillez terminer le tour en"
                                "cours avant d'en créer un nouveau")
 
         # Check if we've reached the maximum number of rounds
-        max_rounds = tournament_data.get('rounds', 4)
+        max_rounds = tournament.rounds
         if len(rounds_data) >= max_rounds:
             return False, f"Le nombre maximum de tours ({max_rounds}) a été atteint"
 
         # Get player IDs from tournament
-        player_ids = tournament_data.get('players', [])
+        player_ids = tournament.player_ids
         if len(player_ids) < 8:
             return False, "Le tournoi doit avoir au moins 8 joueurs"
 
@@ -118,103 +117,109 @@ class RoundController:
         round_number = len(rounds_data) + 1
         round_name = f"Round {round_number}"
 
-        # First round: random pairing
-        if round_number == 1:
+        # Round-robin: the next round of the Berger table. First round:
+        # random pairing, except in the Dutch system which pairs the first
+        # half of the registration order against the second
+        if tournament.schedule is not None:
+            if len(rounds_data) >= tournament.schedule.rounds:
+                return False, (f"Le calendrier toutes rondes compte "
+                               f"{tournament.schedule.rounds} tours")
+            pairs = self._generate_scheduled_round_pairs(tournament, len(rounds_data))
+        elif round_number == 1 and tournament.pairing != "dutch":
             pairs = self._generate_first_round_pairs(player_ids)
         else:
             # Subsequent rounds: pair by score
-            pairs = self._generate_subsequent_round_pairs(player_ids, rounds_data)
+            pairs = self._generate_subsequent_round_pairs(tournament)
 
-        # Create matches from pairs
-        matches = [((pair[0], 0), (pair[1], 0)) for pair in pairs]
+        # Create the round and its matches from pairs, a bye is scored at once
+        new_round = Round(round_name,
+                          [Match(player1, player2) if player2 is not None
+                           else Match.bye(player1) for player1, player2 in pairs],
+                          player_index=tournament.player_index)
 
-        # Create round data
-        new_round = {
-            'name': round_name,
-            'start_time': datetime.now().strftime("%d/%m/%Y %H:%M"),
-            'end_time': None,
-            'matches': matches
-        }
-
-        # Update tournament data
-        data = self.data_manager.load_data()
-        if 'rounds_data' not in data['tournaments'][self.current_tournament]:
-            data['tournaments'][self.current_tournament]['rounds_data'] = []
-
-        data['tournaments'][self.current_tournament]['rounds_data'].append(new_round)
-        data['tournaments'][self.current_tournament]['current_round'] = round_number
-
-        # Save updated data
-        self.data_manager.save_data(data)
+        # Append the round, this also updates the current round number
+        self.data_manager.add_round(self.current_tournament, new_round.to_dict())
 
         return True, f"Tour {round_name} créé avec succès"
 
     def _generate_first_round_pairs(self, player_ids):
         """Generate random pairs for the first round
 
+        With an odd number of players, the last registered one, the lowest
+        ranked, gets the bye.
+
         Args:
             player_ids: List of player IDs
 
         Returns:
-            list: List of player pairs
+            list: List of player pairs, then (player, None) for the bye
         """
-        # Shuffle players randomly
+        # Set the bye aside, then shuffle players randomly
         shuffled_players = player_ids.copy()
+        bye = shuffled_players.pop() if len(shuffled_players) % 2 else None
         random.shuffle(shuffled_players)
 
         # Create pairs
         pairs = []
         for i in range(0, len(shuffled_players), 2):
-            if i + 1 < len(shuffled_players):
-                pairs.append((shuffled_players[i], shuffled_players[i + 1]))
+            pairs.append((shuffled_players[i], shuffled_players[i + 1]))
+        if bye is not None:
+            pairs.append((bye, None))
 
         return pairs
 
-    def _generate_subsequent_round_pairs(self, player_ids, rounds_data):
-        """Generate pairs for subsequent rounds based on scores
+    def _generate_scheduled_round_pairs(self, tournament, round_index):
+        """Read the pairs of a round-robin round from its Berger table
+
+        The table is computed once, when the tournament is loaded, from the
+        number of players recorded with the tournament when it started;
+        players are numbered by registration order.
 
         Args:
-            player_ids: List of player IDs
-            rounds_data: Data from previous rounds
+            tournament: Round-robin tournament
+            round_index (int): Index of the round
 
         Returns:
-            list: List of player pairs
+            list: List of player pairs, white first, then (player, None)
+            for the bye
         """
-        # Calculate current points for each player
-        player_points = self.calculate_player_points()
+        player_index = tournament.player_index
+        return [(player_index[player1],
+                 player_index[player2] if player2 is not None else None)
+                for player1, player2 in tournament.schedule.pairs(round_index)]
 
-        # Sort players by points (descending)
-        sorted_players = sorted(player_points.items(), key=lambda x: x[1], reverse=True)
-        sorted_player_ids = [player[0] for player in sorted_players]
+    def _generate_subsequent_round_pairs(self, tournament):
+        """Generate pairs for subsequent rounds based on scores
 
-        # Get all previous matches to avoid duplicates
-        previous_matches = set()
-        for round_data in rounds_data:
-            for match in round_data.get('matches', []):
-                player1 = match[0][0]
-                player2 = match[1][0]
-                previous_matches.add(tuple(sorted([player1, player2])))
+        Players are ranked by points then registration order and paired by
+        the pairing system of the tournament, see models.Pairing. They are
+        handled by their position in the player index of the tournament, and
+        previous games are looked up in its opponent index.
 
-        # Generate pairs avoiding duplicates
-        pairs = []
-        unmatched = sorted_player_ids.copy()
-
-        while unmatched:
-            player1 = unmatched.pop(0)
-
-            # Find first available opponent that hasn't played against player1
-            for i, player2 in enumerate(unmatched):
-                if tuple(sorted([player1, player2])) not in previous_matches:
-                    pairs.append((player1, player2))
-                    unmatched.pop(i)
-                    break
-            else:
-                # If all opponents have been played against, just take the next one
-                if unmatched:
-                    player2 = unmatched.pop(0)
-                    pairs.append((player1, player2))
+        Args:
+            tournament: Tournament with its previous rounds
 
-        return pairs
+        Returns:
+            list: List of player pairs, white first, then (player, None)
+            for the bye
+        """
+        player_index = tournament.player_index
+        half_points, colours, floats = pairing_history(tournament.rounds_data,
+                                                       len(player_index))
+        positions = [player_index.intern(player_id)
+                     for player_id in tournament.player_ids]
+        ranking = sorted(positions,
+                         key=lambda position: (-half_points[position], position))
+
+        if tournament.pairing == "dutch":
+            pairs = dutch_pairs(ranking, half_points, tournament.opponents,
+                                colours, floats)
+        else:
+            pairs = swiss_pairs(ranking, half_points, tournament.opponents)
+
+        return [(player_index[player1],
+                 player_index[player2] if player2 is not None else None)
+                for player1, player2 in pairs]
 
     def finish_round(self, round_name):
         """Mark a round as finished
@@ -225,40 +230,27 @@ class RoundController:
         Returns:
             tuple: (success, message)
         """
-        tournament_data = self.get_current_tournament()
+        tournament = self.get_current_tournament()
 
         # Find the round
-        rounds_data = tournament_data.get('rounds_data', [])
-        round_index = None
-
-        for i, round_data in enumerate(rounds_data):
-            if round_data.get('name') == round_name:
-                round_index = i
-                break
-
+        round_index = tournament.find_round(round_name)
         if round_index is None:
             return False, f"Tour {round_name} non trouvé"
+        round_data = tournament.rounds_data[round_index]
 
         # Check if the round is already finished
-        if rounds_data[round_index].get('end_time'):
+        if round_data.is_finished:
             return False, f"Le tour {round_name} est déjà terminé"
         # Check if all matches have scores entered
-        round_matches = rounds_data[round_index].get('matches', [])
-        for match in round_matches:
-            if len(match) != 2 or match[0][1] == 0 and match[1][1] == 0:
+        for match in round_data.matches:
+            if not match.is_scored:
                 return False, (f"Tous les scores du tour {round_name}"
                                f"doivent être remplis avant de terminer")
 
-        data = self.data_manager.load_data()
-
-        (data['tournaments']
-         [self.current_tournament]
-         ['rounds_data']
-         [round_index]
-         ['end_time']) = datetime.now().strftime("%d/%m/%Y %H:%M")
-
-        # Save updated data
-        self.data_manager.save_data(data)
+        round_data.end_round()
+        self.data_manager.end_round(self.current_tournament,
+                                    round_index,
+                                    round_data.end_time)
 
         return True, f"Tour {round_name} terminé avec succès"
 
@@ -276,28 +268,21 @@ class RoundController:
             tuple: (success, message)
         """
 
-        tournament_data = self.get_current_tournament()
-        if tournament_data is None:
+        tournament = self.get_current_tournament()
+        if tournament is None:
             return False, "Données de tournoi invalides"
 
-        rounds_data = tournament_data.get('rounds_data', [])
-
         # Find the round index
-        round_index = next((i for i, r in enumerate(rounds_data)
-                           if r.get('name') == round_name), None)
+        round_index = tournament.find_round(round_name)
         if round_index is None:
             return False, "Tour non trouvé"
 
-        # Find the match index
-        match_index = None
-        for i, match in enumerate(rounds_data[round_index].get('matches', [])):
-            if len(match) == 2:
-                player_a, _ = match[0]
-                player_b, _ = match[1]
-                if {player_a, player_b} == {player1_id, player2_id}:
-                    match_index = i
-                    break
+        if not player2_id:
+            return False, "Le score d'une exemption ne se modifie pas"
 
+        # Find the match index
+        round_data = tournament.rounds_data[round_index]
+        match_index = round_data.find_match(player1_id, player2_id)
         if match_index is None:
             return False, "Match non trouvé"
 
@@ -307,19 +292,16 @@ class RoundController:
         except ValueError:
             return False, "Les scores doivent être des nombres valides"
 
-        if round(score1 + score2, 2) != 1.0:
+        if score1 not in (0, 0.5, 1) or score2 not in (0, 0.5, 1):
+            return False, "Les scores doivent valoir 0, 0.5 ou 1"
+        if score1 + score2 != 1.0:
             return False, "La somme des scores doit être égale à 1.0"
         # Update the match score
-        data = self.data_manager.load_data()
-        (data['tournaments']
-         [self.current_tournament]
-         ['rounds_data']
-         [round_index]
-         ['matches'][match_index]) = [
-            [player1_id, float(score1)],
-            [player2_id, float(score2)]
-        ]
-        self.data_manager.save_data(data)
+        self.data_manager.set_match(self.current_tournament,
+                                    round_index,
+                                    match_index,
+                                    Match(player1_id, player2_id,
+                                          score1, score2).to_dict())
 
         return True, "Scores mis à jour avec succès"
 
@@ -329,22 +311,12 @@ class RoundController:
         Returns:
             dict: Dictionary of player points
         """
-        tournament_data = self.get_current_tournament()
-        player_points = {player_id: 0 for player_id in
-                         tournament_data.get('players', [])}
-
-        # Sum points from all rounds
-        for round_data in tournament_data.get('rounds_data', []):
-            for match in round_data.get('matches', []):
-                player1_id, score1 = match[0]
-                player2_id, score2 = match[1]
-
-                if player1_id in player_points:
-                    player_points[player1_id] += float(score1)
-                if player2_id in player_points:
-                    player_points[player2_id] += float(score2)
-
-        return player_points
+        if not self.current_tournament:
+            self.get_current_tournament()
+        standings = self.data_manager.get_tournament_standings(
+            self.current_tournament)
+        return {player_id: entry['points']
+                for player_id, entry in standings.items()}
 
     def return_to_tournaments(self):
         """Return to the tournaments list view"""
@@ -357,15 +329,11 @@ class RoundController:
         Returns:
             dict: Dictionary mapping player IDs to names
         """
-        data = self.data_manager.load_data()
-        players = data.get('players', {})
-
-        player_names = {}
-        for player_id, player_data in players.items():
-            player_names[player_id] = f"{player_data.get('first_name', '')}"
-            f"{player_data.get('last_name', '')}"
-
-        return player_names
+        tournament = self.get_current_tournament()
+        if tournament is None:
+            return {}
+        return {player.national_id: player.full_name
+                for player in tournament.players}
 
     def reset_tournament_data(self):
         """Reset the current tournament data when navigating back"""
@@ -381,13 +349,13 @@ class RoundController:
         if not self.current_tournament:
             return False, "Aucun tournoi sélectionné"
 
-        tournament_data = self.get_current_tournament()
-        if not tournament_data:
+        tournament = self.get_current_tournament()
+        if not tournament:
             return False, "Tournoi non trouvé"
 
         # Check if all rounds are completed
-        rounds_data = tournament_data.get('rounds_data', [])
-        max_rounds = int(tournament_data.get('rounds', 4))
+        rounds_data = tournament.rounds_data
+        max_rounds = tournament.rounds
 
         # Verify all rounds are created and completed
         if len(rounds_data) < max_rounds:
@@ -396,26 +364,16 @@ class RoundController:
 
         # Check if any round is not finished
         for round_data in rounds_data:
-            if not round_data.get('end_time'):
+            if not round_data.is_finished:
                 return False, ("Tous les tours doivent être terminés"
                                "avant de clôturer le tournoi")
 
-        # Update tournament status
-        data = self.data_manager.load_data()
-
-        # Make sure the tournament exists in the data
-        if self.current_tournament not in data.get('tournaments', {}):
-            return False, "Tournoi non trouvé dans la base de données"
-
-        # Explicitly set the status to "Terminé"
-        data['tournaments'][self.current_tournament]['status'] = "Terminé"
-
-        # Add end date to the tournament
-        (data['tournaments']
-         [self.current_tournament]
-         ['end_date']) = datetime.now().strftime("%d/%m/%Y")
-
-        # Save updated data and verify it was saved
-        self.data_manager.save_data(data)
+        self.snapshots.take(self.data_manager,
+                            f"Clôture du tournoi {self.current_tournament}")
+        # Set the status to "Terminé" and record the end date
+        self.data_manager.update_tournament(
+            self.current_tournament,
+            status="Terminé",
+            end_date=today())
 
         return True, "Tournoi terminé avec succès"
@@ -1,5 +1,8 @@
+from models.Pairing import DEFAULT_PAIRING, PAIRING_SYSTEMS
+from models.RoundRobin import CYCLES, BergerTable
 from models.Tournament import Tournament
-from models.DataManager import DataManager
+from utils.Dates import parse_date
+from utils.Trf import import_trf, write_trf
 
 
 class TournamentController:
@@ -12,7 +15,8 @@ class TournamentController:
             master_controller: Main application controller
         """
         self.master_controller = master_controller
-        self.data_manager = DataManager()
+        self.data_manager = master_controller.data_manager
+        self.snapshots = master_controller.snapshots
         self.callbacks = {
             'save_tournament': self.save_tournament,
             'load_tournaments': self.load_tournaments,
@@ -20,6 +24,9 @@ class TournamentController:
             'add_players_to_tournament': self.add_players_to_tournament,
             'return_home': self.return_home,
             'open_round_page': self.open_round_page,
+            'import_trf': self.import_trf,
+            'export_trf': self.export_trf,
+            'archive_tournaments': self.archive_tournaments,
         }
 
     def get_callbacks(self):
@@ -37,10 +44,11 @@ class TournamentController:
             tournament_data (dict): Tournament information including:
                 - name: Tournament name
                 - location: Tournament location
-                - start_date: Start date
-                - end_date: End date
+                - start_date: Start date as JJ/MM/AAAA
+                - end_date: End date as JJ/MM/AAAA
                 - rounds: Number of rounds
                 - description: Tournament description
+                - pairing: Pairing system, a key of PAIRING_SYSTEMS
 
         Returns:
             tuple: (success: bool, message: str)
@@ -70,43 +78,49 @@ class TournamentController:
                 return False, message
 
         try:
-            start_day, start_month, start_year = tournament_data["start_date"].split(
-                '/')
-            if not (len(start_day) == 2
-                    and len(start_month) == 2
-                    and len(start_year) == 4):
-                raise ValueError
-            if not (1 <= int(start_day) <= 31
-                    and 1 <= int(start_month) <= 12
-                    and 1900 <= int(start_year) <= 2100):
-                raise ValueError
-            start_date_int = int(start_year + start_month + start_day)
-        except ValueError:
-            return False, "Format de date invalide . Utilisez JJ/MM/AAAA"
-        try:
-            end_day, end_month, end_year = tournament_data["end_date"].split('/')
-            if not (len(end_day) == 2 and len(end_month) == 2 and len(end_year) == 4):
-                raise ValueError
-            if not (1 <= int(end_day) <= 31
-                    and 1 <= int(end_month) <= 12
-                    and 1900 <= int(end_year) <= 2100):
-                raise ValueError
-            end_date_int = int(end_year + end_month + end_day)
+            start_date = parse_date(tournament_data["start_date"])
+            end_date = parse_date(tournament_data["end_date"])
         except ValueError:
             return False, "Format de date invalide. Utilisez JJ/MM/AAAA"
 
-        if end_date_int < start_date_int:
+        if end_date < start_date:
             return False, "La date de fin doit être postérieure à la date de début."
 
-        tournament = Tournament(
-            name=tournament_data["name"],
-            location=tournament_data["location"],
-            start_date=tournament_data["start_date"],
-            end_date=tournament_data["end_date"],
-            rounds=int(tournament_data["rounds"]),
-            description=tournament_data["description"]
-        )
-        self.data_manager.save_tournament(tournament)
+        pairing = tournament_data.get("pairing", DEFAULT_PAIRING)
+        if pairing not in PAIRING_SYSTEMS:
+            return False, "Système d'appariement inconnu."
+
+        current = tournaments.get(tournament_data["name"], {})
+        if (edit_mode and current.get("current_round")
+                and current.get("pairing") != pairing
+                and (pairing in CYCLES or current.get("pairing") in CYCLES)):
+            # The Berger table only holds for a round-robin from its first round
+            return False, ("Un tournoi commencé ne peut pas passer à un système "
+                           "toutes rondes ni le quitter.")
+
+        if edit_mode and tournament_data["name"] in tournaments:
+            # Only the edited fields change: players, rounds, status and
+            # creation date are kept, and an unchanged form writes nothing
+            self.data_manager.update_tournament(
+                tournament_data["name"],
+                location=tournament_data["location"],
+                start_date=start_date,
+                end_date=end_date,
+                rounds=int(tournament_data["rounds"]),
+                description=tournament_data["description"],
+                pairing=pairing
+            )
+        else:
+            tournament = Tournament(
+                name=tournament_data["name"],
+                location=tournament_data["location"],
+                start_date=start_date,
+                end_date=end_date,
+                rounds=int(tournament_data["rounds"]),
+                description=tournament_data["description"],
+                pairing=pairing
+            )
+            self.data_manager.save_tournament(tournament)
         if edit_mode:
             success_message = (f"Tournoi '{tournament_data['name']}'"
                                f"mis à jour avec succès")
@@ -115,13 +129,12 @@ class TournamentController:
         return True, success_message
 
     def load_tournaments(self):
-        """Load all tournaments from the database
+        """Load all tournaments from the database, without their rounds
 
         Returns:
             dict: Dictionary of all tournaments, keyed by name
         """
-        data = self.data_manager.load_data()
-        return data.get("tournaments", {})
+        return self.data_manager.get_tournament_summaries()
 
     def load_available_players(self):
         """Load all available players for tournament selection
@@ -129,8 +142,7 @@ class TournamentController:
         Returns:
             dict: Dictionary of all players, keyed by national ID
         """
-        data = self.data_manager.load_data()
-        return data.get("players", {})
+        return self.data_manager.get_players()
 
     def add_players_to_tournament(self, tournament_name, player_ids):
         """Add players to a tournament
@@ -141,9 +153,7 @@ class TournamentController:
             Returns:
             tuple: (success, message) indicating result
         """
-        # Load current data
-        data = self.data_manager.load_data()
-        tournaments = data.get("tournaments", {})
+        tournaments = self.load_tournaments()
 
         if tournament_name not in tournaments:
             return False, "Tournoi non trouvé"
@@ -152,11 +162,11 @@ class TournamentController:
         if tournaments[tournament_name].get('status') == "En cours":
             return False, "Impossible d'ajouter des joueurs à un tournoi déjà démarré"
 
-        # Update the tournament's players directly in the data
-        tournaments[tournament_name]['players'] = player_ids
-
-        # Save the updated data
-        self.data_manager.save_data(data)
+        self.snapshots.take(self.data_manager,
+                            f"Inscription des joueurs au tournoi {tournament_name}")
+        # Update the tournament's players
+        self.data_manager.update_tournament(tournament_name,
+                                            players=player_ids)
 
         # Check if there are at least 8 players
         if len(player_ids) < 8:
@@ -190,14 +200,82 @@ class TournamentController:
 
         # Store the tournament name in the controller for access by the rounds view
         self.current_tournament = tournament_name
-        data = self.data_manager.load_data()
 
         # Only update status if tournament is not already in progress
-        if data["tournaments"][tournament_name].get("status") != "En cours":
-            data["tournaments"][tournament_name]["status"] = "En cours"
-            self.data_manager.save_data(data)
-        else:
-            self.data_manager.save_data(data)
+        fields = {}
+        if tournament_data.get("status") != "En cours":
+            fields["status"] = "En cours"
+        pairing = tournament_data.get("pairing")
+        if (pairing in CYCLES and not tournament_data.get("current_round")
+                and tournament_data.get("schedule_size") != len(players)):
+            # Until its first round, a round-robin's Berger table follows the
+            # registered players and the tournament lasts as many rounds
+            fields["schedule_size"] = len(players)
+            fields["rounds"] = BergerTable.round_count(len(players),
+                                                       CYCLES[pairing])
+        if fields:
+            self.data_manager.update_tournament(tournament_name, **fields)
         # Navigate to the round page - only pass the view name
         self.master_controller.show_view("rounds")
         return True, f"Gestion du tournoi : {tournament_name}"
+
+    def import_trf(self, filepath):
+        """Import a tournament, its players and its rounds from a TRF file
+
+        Args:
+            filepath (str): Path of the TRF file
+
+        Returns:
+            tuple: (success: bool, message: str)
+        """
+        try:
+            with open(filepath,
+                      "r",
+                      encoding="utf-8-sig") as file:
+                self.snapshots.take(self.data_manager, "Import TRF")
+                name, warnings = import_trf(self.data_manager, file)
+        except (OSError, UnicodeDecodeError, ValueError) as error:
+            return False, f"Import impossible : {error}"
+        message = f"Tournoi '{name}' importé avec succès"
+        if warnings:
+            message += "\n" + "\n".join(warnings)
+        return True, message
+
+    def export_trf(self, tournament_name, filepath):
+        """Export a tournament to a TRF file
+
+        Args:
+            tournament_name (str): Name of the tournament
+            filepath (str): Path of the TRF file to write
+
+        Returns:
+            tuple: (success: bool, message: str)
+        """
+        tournament = self.data_manager.get_tournament_data(tournament_name)
+        if not tournament:
+            return False, "Tournoi non trouvé"
+        players = self.data_manager.get_tournament_players(tournament_name)
+        try:
+            with open(filepath,
+                      "w",
+                      encoding="utf-8") as file:
+                write_trf(file, tournament, players)
+        except OSError as error:
+            return False, f"Export impossible : {error}"
+        return True, f"Tournoi '{tournament_name}' exporté dans {filepath}"
+
+    def archive_tournaments(self):
+        """Move the finished tournaments to the per-season archives
+
+        Returns:
+            tuple: (success: bool, message: str)
+        """
+        try:
+            self.snapshots.take(self.data_manager, "Archivage des tournois terminés")
+            seasons = self.data_manager.archive_tournaments()
+        except OSError as error:
+            return False, f"Archivage impossible : {error}"
+        if not seasons:
+            return True, "Aucun tournoi terminé à archiver"
+        return True, "\n".join(f"Saison {season} : {len(names)} tournoi(s) archivé(s)"
+                               for season, names in sorted(seasons.items()))
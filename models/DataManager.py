@@ -1,49 +1,1203 @@
+import atexit
+import datetime
+import hashlib
 import json
+import re
+import threading
 from pathlib import Path
+from models.Formats import FORMATS, detect_format, gc_paused, get_format
+from models.Journal import Journal
+from models.JsonStream import iter_entries, iter_sections, read_header, write_document
+from models.Match import Match
 from models.Player import Player
+from models.Schema import (SCHEMA_VERSION, check_version, migrate_player,
+                           migrate_tournament)
+from models.Round import Round
+from models.Standings import Standings
 from models.Tournament import Tournament
+from utils.FileUtils import FileLock, atomic_open, atomic_write
+
+# Tournament keys stored in the shard rather than in the manifest
+DETAIL_KEYS = ("rounds_data", "standings")
+# Archives are written once and rarely read, so they favour size over speed
+ARCHIVE_FORMAT = FORMATS["json-lzma"]
 
 
 class DataManager:
-    """Manages data persistence for the chess tournament application"""
+    """Manages data persistence for the chess tournament application
+
+    A single instance is shared by all controllers. The parsed database is
+    kept in memory and only re-read when the file's modification time or
+    size changes, so repeated reads are dictionary lookups. Even then, files
+    whose content hash is unchanged are not parsed again. Player and
+    Tournament objects are cached in an identity map: loading the same
+    entity twice returns the same object until the data changes. The
+    parsed data stays authoritative, since the journal, shards and archives
+    work on the stored layout; loaded tournaments are kept in step with it
+    by each mutation and are held in addition to it.
+
+    Mutations are appended to a journal next to the database file instead
+    of rewriting it. The journal is replayed on load and compacted into
+    the main file every `compact_every` records. Saves issued within
+    `commit_window` seconds of each other are written together, and the
+    main file is always replaced atomically. Mutations that would not
+    change the data are skipped, and `unsaved_changes` counts the saves
+    not written yet.
+
+    With the "sharded" layout the main file is a manifest holding the
+    players and the tournament summaries, and the rounds of each
+    tournament live in their own file under a `tournaments` directory.
+    A file is only rewritten when its content changed. The
+    manifest doubles as a summary index: it is loaded on its own and a
+    tournament's shard is only read the first time its rounds are needed.
+
+    Files are written in the configured serialization format (see
+    models.Formats) and the format of each file is detected when read.
+    The main file records the schema version of the data; older files are
+    upgraded once when opened, see models.Schema and `_migrate`.
 
-    def __init__(self, filepath="data/database.json"):
+    Finished tournaments can be moved to compressed per-season archives
+    under an `archives` directory, see `archive_tournaments`. The main
+    file then only keeps their summary, with an "archive" key naming the
+    season, and their rounds are read from the archive when first needed.
+
+    Several processes may share the same files. Writes hold an exclusive
+    lock on a `.lock` file next to the database and reads a shared one.
+    The lock file stores a version number incremented by every write; if
+    it moved since the data was loaded, another process wrote in between,
+    so the data is reloaded and the pending mutations are applied again on
+    top of it before writing. Mutations on different entities therefore
+    merge, and for the same field the last writer wins.
+    """
+
+    def __init__(self, filepath="data/database.json", compact_every=500,
+                 commit_window=0.005, layout="single", file_format="json",
+                 flush_every=None):
         """Initialize the data manager with a file path
 
         Args:
             filepath (str): Path to the JSON database file,
             defaults to data/database.json
+            compact_every (int): Number of journal records after which
+            the journal is merged into the main file
+            commit_window (float): Delay in seconds during which successive
+            saves are grouped into a single physical write, 0 to write
+            immediately, None to wait for `flush_every` saves or an
+            explicit `flush`
+            layout (str): "single" to keep everything in one file,
+            "sharded" to store each tournament's rounds in its own file
+            file_format (str): Serialization format of the database files,
+            see models.Formats.FORMATS
+            flush_every (int): Number of pending saves that triggers a
+            write, None for no limit
         """
         self.filepath = Path(filepath)
+        self.compact_every = compact_every
+        self.commit_window = commit_window
+        self.flush_every = flush_every
+        self.layout = layout
+        self.format = get_format(file_format)
+        self.shard_dir = self.filepath.parent / "tournaments"
+        self.archive_dir = self.filepath.parent / "archives"
+        self.journal = Journal(self.filepath.with_suffix(".journal"))
+        self.lock = FileLock(self.filepath.with_suffix(".lock"))
+        self.stats = {"logical_saves": 0,
+                      "physical_writes": 0,
+                      "merged_saves": 0,
+                      "skipped_saves": 0,
+                      "rebased_saves": 0,
+                      "load_hits": 0,
+                      "load_misses": 0,
+                      "write_hits": 0,
+                      "write_misses": 0}
+        self._data = None
+        self._signature = None
+        self._players = {}
+        self._tournaments = {}
+        self._pending = []
+        self._pending_saves = 0
+        self._full_save_pending = False
+        # True when save_data was given data replacing the stored data
+        self._replacing = False
+        # Version of the files the in-memory data was read from
+        self._version = None
+        self._timer = None
+        self._lock = threading.RLock()
+        # Tournaments whose shard differs from the file on disk
+        self._dirty = set()
+        # Tournaments whose rounds_data has been loaded
+        self._hydrated = set()
+        # Hash of the content of each file the in-memory data matches
+        self._hashes = {}
+        # Length and hash of the journal lines already applied
+        self._journal_offset = 0
+        self._journal_hash = hashlib.blake2b(digest_size=16)
+        self._stored_layout = None
+        self._stored_format = None
+        self._stored_schema = None
         # Ensure the file exists, create if not
         self.filepath.parent.mkdir(parents=True,
                                    exist_ok=True)
         if not self.filepath.exists():
-            self.save_data({"players": {}, "tournaments": {}})
+            self._write_document({"players": {}, "tournaments": {}})
+        atexit.register(self.flush)
+        self._peek_storage()
+        if self._stored_schema < SCHEMA_VERSION:
+            self._migrate()
+        # Convert a database stored in another layout or format
+        if (self._stored_layout != self.layout
+                or not self._same_format(self._stored_format)):
+            self._load()
+            self._hydrate_all(archived=False)
+            self.save_data(self._data)
+
+    def _peek_storage(self):
+        """Detect the format, layout and schema version without loading the database
+
+        Only the beginning of the file is read, unless the format cannot be
+        read incrementally.
+        """
+        with open(self.filepath, 'rb') as file:
+            head = file.read(16)
+        self._stored_format = detect_format(head)
+        if not self._stored_format.streamable:
+            self._load()
+            return
+        with self._stored_format.open_text(self.filepath) as file:
+            header = read_header(file, ("schema_version", "layout"))
+        self._stored_layout = header.get("layout", "single")
+        self._stored_schema = check_version(header.get("schema_version", 1))
+
+    def _migrate(self):
+        """Upgrade the database files to the current schema version
+
+        When the journal is empty and the format can be read incrementally,
+        the main file is rewritten in a single pass, one entry at a time,
+        along with the shard of each tournament, so memory stays
+        proportional to the largest tournament. Otherwise the data is
+        loaded, upgraded in memory and saved.
+        """
+        with self.lock.hold():
+            self._peek_storage()
+            version = self._stored_schema
+            if version == SCHEMA_VERSION:
+                # Migrated by another process meanwhile
+                return
+            if self.journal.count or not self._stored_format.streamable:
+                self._load()
+                self._hydrate_all(archived=False)
+                self._data["players"] = {
+                    player_id: migrate_player(player_id, player, version)
+                    for player_id, player in self._data["players"].items()}
+                self._data["tournaments"] = {
+                    name: migrate_tournament(name, tournament, version)
+                    for name, tournament in self._data["tournaments"].items()}
+                self.save_data(self._data)
+                self.flush()
+            else:
+                self._migrate_stream(version)
+                self.lock.write(str(self._stored_version() + 1))
+            self._stored_schema = SCHEMA_VERSION
+
+    def _migrate_stream(self, version):
+        """Rewrite the database files at the current schema version in one pass
+
+        Args:
+            version (int): Schema version of the files
+        """
+        sharded = self._stored_layout == "sharded"
+        # Pretty and compact JSON are both detected as "json"
+        file_format = (self.format if self._same_format(self._stored_format)
+                       else self._stored_format)
+
+        def upgrade(section, entries):
+            for key, value in entries:
+                if section == "players":
+                    yield key, migrate_player(key, value, version)
+                elif not sharded:
+                    yield key, migrate_tournament(key, value, version)
+                else:
+                    shard_path = self._shard_path(key)
+                    if shard_path.exists():
+                        value.update(self._read_file(shard_path)[0])
+                    value = migrate_tournament(key, value, version)
+                    if "archive" not in value:
+                        shard = {detail: value[detail]
+                                 for detail in DETAIL_KEYS if detail in value}
+                        atomic_write(shard_path, file_format.encode(shard))
+                    yield key, {detail: item for detail, item in value.items()
+                                if detail not in DETAIL_KEYS}
+
+        header = {"schema_version": SCHEMA_VERSION}
+        if sharded:
+            header["layout"] = "sharded"
+        with atomic_open(self.filepath) as output, \
+                file_format.open_write(output) as text, \
+                file_format.open_text(self.filepath) as source:
+            sections = ((section, upgrade(section, entries))
+                        for section, entries in iter_sections(source))
+            write_document(text, header, sections, indent=file_format.indent)
+
+    def _can_stream(self):
+        """Tell whether entries can be read straight from the files
+
+        Streaming is only used while nothing is loaded in memory and the
+        journal is empty, since it reads the files as they are on disk.
+
+        Returns:
+            bool: True if the database files can be read incrementally
+        """
+        return (self._data is None
+                and not self.journal.count
+                and self._stored_format.streamable)
+
+    def _stream(self, section):
+        """Read the entries of a section of the main file one at a time
+
+        Args:
+            section (str): "players" or "tournaments"
+
+        Yields:
+            tuple: (key, value) for each entry of the section
+        """
+        with self._stored_format.open_text(self.filepath) as file:
+            yield from iter_entries(file, section)
+
+    def _with_rounds(self, name, tournament):
+        """Add the rounds stored in a shard to a streamed tournament
+
+        Args:
+            name (str): Name of the tournament
+            tournament (dict): Tournament data read from the main file
+
+        Returns:
+            dict: The tournament data with its rounds_data and standings
+        """
+        if "archive" in tournament:
+            tournament.update(self._read_archived(name, tournament["archive"]))
+        elif self._stored_layout == "sharded" and self._shard_path(name).exists():
+            shard, _, _ = self._read_file(self._shard_path(name))
+            tournament.update(shard)
+        return tournament
+
+    def iter_players(self):
+        """Iterate over the players one at a time
+
+        When the database is not loaded in memory, players are read from
+        the file incrementally so memory stays bounded.
+
+        Yields:
+            tuple: (national_id, player data)
+        """
+        with self._lock:
+            streaming = self._can_stream()
+        if streaming:
+            yield from self._stream("players")
+        else:
+            yield from list(self.get_players().items())
+
+    def iter_tournaments(self):
+        """Iterate over the tournaments, with their rounds, one at a time
+
+        When the database is not loaded in memory, tournaments are read
+        from the files incrementally, so memory is proportional to the
+        largest tournament rather than to the whole database.
+
+        Yields:
+            tuple: (name, tournament data)
+        """
+        with self._lock:
+            streaming = self._can_stream()
+        if streaming:
+            for name, tournament in self._stream("tournaments"):
+                yield name, self._with_rounds(name, tournament)
+        else:
+            for name in list(self._load()["tournaments"]):
+                yield name, self.get_tournament_data(name)
+
+    def find_tournament(self, name):
+        """Get a single tournament, with its rounds
+
+        When the database is not loaded in memory the files are scanned
+        without decoding the other tournaments.
+
+        Args:
+            name (str): Name of the tournament
+
+        Returns:
+            dict: Tournament data, or an empty dict if not found
+        """
+        with self._lock:
+            streaming = self._can_stream()
+        if not streaming:
+            return self.get_tournament_data(name)
+        for key, tournament in self._stream("tournaments"):
+            if key == name:
+                return self._with_rounds(name, tournament)
+        return {}
+
+    def _same_format(self, file_format):
+        """Tell whether files in a format need no conversion
+
+        Pretty and compact JSON cannot be told apart when read, so they are
+        considered the same format.
+
+        Args:
+            file_format: Format detected when reading a file
+
+        Returns:
+            bool: True if the file is stored in the configured format
+        """
+        json_names = ("json", "json-compact")
+        return (file_format.name == self.format.name
+                or (file_format.name in json_names
+                    and self.format.name in json_names))
+
+    def _read_file(self, filepath):
+        """Read and decode a database file, whatever its format
+
+        Args:
+            filepath (Path): Path of the file
+
+        Returns:
+            tuple: (decoded data, detected format, hash of the content)
+        """
+        with open(filepath, 'rb') as file:
+            raw = file.read()
+        file_format = detect_format(raw)
+        with gc_paused():
+            return file_format.decode(raw), file_format, self._digest(raw)
+
+    @staticmethod
+    def _digest(content):
+        """Hash the content of a file
+
+        Args:
+            content (bytes): Content of the file
+
+        Returns:
+            bytes: 128-bit BLAKE2 digest
+        """
+        return hashlib.blake2b(content, digest_size=16).digest()
+
+    def _file_digest(self, filepath):
+        """Hash the current content of a file
+
+        Args:
+            filepath (Path): Path of the file
+
+        Returns:
+            bytes: Digest of the file, None if it does not exist
+        """
+        try:
+            with open(filepath, 'rb') as file:
+                return self._digest(file.read())
+        except FileNotFoundError:
+            return None
+
+    def _file_signature(self):
+        """Return the signature used to detect external changes
+
+        Returns:
+            tuple: (mtime, size) of the database file and of the journal
+        """
+        stat = self.filepath.stat()
+        signature = [(stat.st_mtime_ns, stat.st_size), self.journal.signature()]
+        if self.shard_dir.exists():
+            # Replacing a shard updates the modification time of its directory
+            signature.append(self.shard_dir.stat().st_mtime_ns)
+        return tuple(signature)
+
+    def _shard_path(self, name):
+        """Return the path of the file holding a tournament's rounds
+
+        Args:
+            name (str): Name of the tournament
+
+        Returns:
+            Path: Path of the tournament shard
+        """
+        slug = re.sub(r"[^\w-]+", "_", name)[:40]
+        digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:8]
+        return self.shard_dir / f"{slug}-{digest}.json"
+
+    def archive_path(self, season):
+        """Return the path of the archive of a season
+
+        Args:
+            season (str): Season, as returned by `season`
+
+        Returns:
+            Path: Path of the compressed archive
+        """
+        return self.archive_dir / f"{season}.json.xz"
+
+    @staticmethod
+    def season(date):
+        """Return the season of a date, seasons running from September to August
+
+        Args:
+            date (int): Date as an ordinal, see utils.Dates
+
+        Returns:
+            str: Season as "2023-2024", "sans-date" if there is no date
+        """
+        if date is None:
+            return "sans-date"
+        day = datetime.date.fromordinal(date)
+        year = day.year - (day.month < 9)
+        return f"{year}-{year + 1}"
+
+    def _read_archive(self, season):
+        """Read the archive of a season, upgraded to the current schema version
+
+        Archives are never rewritten to upgrade them, since they are only
+        read when a report needs them.
+
+        Args:
+            season (str): Season, as returned by `season`
+
+        Returns:
+            dict: Archived tournaments keyed by name, empty if there is no
+            archive for the season
+        """
+        archive_path = self.archive_path(season)
+        if not archive_path.exists():
+            return {}
+        archive, _, _ = self._read_file(archive_path)
+        version = check_version(archive.get("schema_version", 1))
+        return {name: migrate_tournament(name, tournament, version)
+                for name, tournament in archive["tournaments"].items()}
+
+    def _read_archived(self, name, season):
+        """Read the rounds and standings of an archived tournament
+
+        Args:
+            name (str): Name of the tournament
+            season (str): Season of the archive holding it
+
+        Returns:
+            dict: rounds_data and standings of the tournament
+        """
+        tournament = self._read_archive(season).get(name, {})
+        return {key: tournament[key] for key in DETAIL_KEYS if key in tournament}
+
+    def _invalidate(self):
+        """Drop the cached entity objects"""
+        self._players.clear()
+        self._tournaments.clear()
 
     def load_data(self):
-        """Load all data from the JSON file
+        """Load all data, including the rounds of every tournament
 
         Returns:
             dict: Dictionary containing all application data
         """
-        with open(self.filepath,
-                  'r',
-                  encoding="utf-8") as file:
-            return json.load(file)
+        with self._lock:
+            self._load()
+            self._hydrate_all()
+            return self._data
+
+    def _load(self):
+        """Load the data, parsing the files only when they have changed
+
+        The main file is parsed and the journal replayed on top of it.
+        With the sharded layout the rounds of the tournaments are not
+        loaded, see `_hydrate`. While saves are waiting to be written the
+        in-memory data is authoritative and is returned as is.
+
+        Returns:
+            dict: Dictionary containing the application data
+        """
+        with self._lock:
+            if self._data is not None and self._pending_saves:
+                return self._data
+            if self._data is None or self._file_signature() != self._signature:
+                with self.lock.hold(shared=True):
+                    self._reload()
+            return self._data
+
+    def _reload(self, full=False):
+        """Bring the data up to date with the files, with the lock held
+
+        Files are compared by content hash rather than modification time:
+        when the main file and the loaded shards still hold what the data
+        was read from, and the journal only grew, they are not parsed again
+        and only the new journal records are applied.
+
+        Args:
+            full (bool): Parse the files even if their content is known,
+            for when the in-memory data holds unwritten changes
+        """
+        journal = self.journal.read_bytes()
+        if not full and self._unchanged_on_disk(journal):
+            self.stats["load_hits"] += 1
+            tail = journal[self._journal_offset:]
+        else:
+            self.stats["load_misses"] += 1
+            self._hashes = {}
+            self._data = self._read_document()
+            self._invalidate()
+            self._dirty.clear()
+            self._journal_offset = 0
+            self._journal_hash = hashlib.blake2b(digest_size=16)
+            self.journal.count = 0
+            tail = journal
+        records = self.journal.decode(tail)
+        for record in records:
+            self._apply(record)
+        # Other processes may have appended to the journal
+        self.journal.count += len(records)
+        self._journal_offset += len(tail)
+        self._journal_hash.update(tail)
+        self._signature = self._file_signature()
+        self._version = self._stored_version()
+
+    def _unchanged_on_disk(self, journal):
+        """Tell whether the files still hold what the data was read from
+
+        Args:
+            journal (bytes): Complete lines of the journal
+
+        Returns:
+            bool: True if the main file and the loaded shards are unchanged
+            and the journal starts with the lines already applied
+        """
+        if self._data is None or len(journal) < self._journal_offset:
+            return False
+        applied = hashlib.blake2b(journal[:self._journal_offset], digest_size=16)
+        if applied.digest() != self._journal_hash.digest():
+            return False
+        return all(self._file_digest(filepath) == digest
+                   for filepath, digest in self._hashes.items())
+
+    def _stored_version(self):
+        """Read the version of the files, with the lock held
+
+        Returns:
+            int: Number of writes made to the database, 0 if unknown
+        """
+        value = self.lock.read()
+        return int(value) if value.isdigit() else 0
 
     def save_data(self, data):
-        """Save data to the JSON file
+        """Save the whole data to the JSON file
+
+        The document is rewritten atomically and the journal emptied.
+        The write is grouped with other saves issued within the commit
+        window.
 
         Args:
             data (dict): Data to be saved
         """
-        with open(self.filepath,
-                  "w",
-                  encoding="utf-8") as file:
-            json.dump(data,
-                      file,
-                      indent=4)
+        with self._lock:
+            data.setdefault("players", {})
+            data.setdefault("tournaments", {})
+            if data is not self._data:
+                # Data built by the caller is complete and replaces the
+                # stored data, including the records waiting for the journal
+                self._hydrated = {name for name, tournament
+                                  in data["tournaments"].items()
+                                  if "archive" not in tournament}
+                self._pending.clear()
+                self._replacing = True
+            self._data = data
+            self._invalidate()
+            self._dirty.update(self._hydrated & data["tournaments"].keys())
+            self._full_save_pending = True
+            self._schedule_flush()
+
+    def compact(self):
+        """Merge the journal into the main database file"""
+        self.save_data(self._load())
+
+    def _commit(self, record):
+        """Apply a mutation in memory and queue it for the journal
+
+        Args:
+            record (dict): Mutation record, see the `_apply_*` methods
+        """
+        with self._lock:
+            self._load()
+            if not self._changes(record):
+                self.stats["skipped_saves"] += 1
+                return
+            self._pending.append(self.journal.encode(record))
+            self._apply(record)
+            self._schedule_flush()
+
+    def _changes(self, record):
+        """Tell whether applying a mutation record would modify the data
+
+        Args:
+            record (dict): Mutation record, see the `_apply_*` methods
+
+        Returns:
+            bool: False if the data already holds what the record writes
+        """
+        op = record["op"]
+        if op == "player_set":
+            return self._data["players"].get(record["id"]) != record["player"]
+        if op == "player_delete":
+            return record["id"] in self._data["players"]
+        if op == "players_set":
+            return any(self._data["players"].get(player_id) != player
+                       for player_id, player in record["players"].items())
+        tournament = self._data["tournaments"].get(record["name"])
+        if tournament is None:
+            return True
+        if op == "tournament_update":
+            return any(tournament.get(key) != value
+                       for key, value in record["fields"].items())
+        if op == "tournament_archive":
+            return tournament.get("archive") != record["season"]
+        self._hydrate(record["name"])
+        if op == "tournament_set":
+            # Standings are derived from the matches and not part of the record
+            return ({key: value for key, value in tournament.items()
+                     if key != "standings"} != record["tournament"])
+        if op == "standings_set":
+            return tournament.get("standings") != record["standings"]
+        rounds_data = tournament.get("rounds_data", [])
+        if op == "round_add":
+            return rounds_data[record["index"]:] != [record["round"]]
+        if record["index" if op == "round_end" else "round"] >= len(rounds_data):
+            return True
+        if op == "round_end":
+            return rounds_data[record["index"]].get("end_time") != record["end_time"]
+        matches = rounds_data[record["round"]]["matches"]
+        return (record["index"] >= len(matches)
+                or matches[record["index"]] != record["match"])
+
+    @property
+    def unsaved_changes(self):
+        """Number of saves not written to disk yet
+
+        Returns:
+            int: Pending logical saves
+        """
+        return self._pending_saves
+
+    def _schedule_flush(self):
+        """Count a logical save and arrange for it to be written"""
+        self.stats["logical_saves"] += 1
+        self._pending_saves += 1
+        if (self.commit_window == 0
+                or (self.flush_every
+                    and self._pending_saves >= self.flush_every)):
+            self.flush()
+        elif self.commit_window is not None and self._timer is None:
+            self._timer = threading.Timer(self.commit_window, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Write every pending save in one physical write"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending_saves:
+                return
+            with self.lock.hold():
+                version = self._stored_version()
+                if version != self._version and not self._replacing:
+                    self._rebase()
+                if self._pending or self._full_save_pending:
+                    if (self._full_save_pending
+                            or self.journal.count + len(self._pending)
+                            >= self.compact_every):
+                        self._write_document(self._data)
+                    else:
+                        content = self.journal.append(self._pending)
+                        self._journal_offset += len(content)
+                        self._journal_hash.update(content)
+                    version += 1
+                    self.lock.write(str(version))
+                    self.stats["physical_writes"] += 1
+                self.stats["merged_saves"] += self._pending_saves - 1
+                self._pending.clear()
+                self._pending_saves = 0
+                self._full_save_pending = False
+                self._replacing = False
+                self._signature = self._file_signature()
+                self._version = version
+
+    def _rebase(self):
+        """Apply the pending mutations on top of the data written meanwhile
+
+        Called with the lock held when another process wrote to the
+        database since it was loaded. Mutations that no longer change
+        anything are dropped.
+        """
+        records = [json.loads(line) for line in self._pending]
+        self._reload(full=True)
+        if self._full_save_pending:
+            self._dirty.update(self._hydrated)
+        self._pending = []
+        for record in records:
+            if self._changes(record):
+                self._pending.append(self.journal.encode(record))
+                self._apply(record)
+        self.stats["rebased_saves"] += len(records)
+
+    def _read_document(self):
+        """Read the database from disk, whatever its layout
+
+        Returns:
+            dict: Dictionary containing all application data
+        """
+        data, self._stored_format, digest = self._read_file(self.filepath)
+        self._hashes[self.filepath] = digest
+        data.setdefault("players", {})
+        data.setdefault("tournaments", {})
+        self._stored_schema = check_version(data.pop("schema_version", 1))
+        self._stored_layout = data.pop("layout", "single")
+        if self._stored_layout == "sharded":
+            self._hydrated = set()
+        else:
+            self._hydrated = {name for name, tournament in data["tournaments"].items()
+                              if "archive" not in tournament}
+        return data
+
+    def _hydrate(self, name):
+        """Load the rounds of a tournament from its shard or archive if not done yet
+
+        Args:
+            name (str): Name of the tournament
+        """
+        tournament = self._data["tournaments"].get(name)
+        if tournament is None or name in self._hydrated:
+            return
+        shard_path = self._shard_path(name)
+        with self.lock.hold(shared=True):
+            if "archive" in tournament:
+                tournament.update(self._read_archived(name, tournament["archive"]))
+            elif shard_path.exists():
+                shard, _, self._hashes[shard_path] = self._read_file(shard_path)
+                tournament.update(shard)
+        self._hydrated.add(name)
+
+    def _hydrate_all(self, archived=True):
+        """Load the rounds of every tournament
+
+        Args:
+            archived (bool): Also read the rounds of archived tournaments
+        """
+        if self._data is not None:
+            for name, tournament in self._data["tournaments"].items():
+                if archived or "archive" not in tournament:
+                    self._hydrate(name)
+
+    def _thaw(self, name):
+        """Load the rounds of a tournament about to change
+
+        A modified archived tournament is brought back into the main
+        database, since its archive is only written by `archive_tournaments`.
+
+        Args:
+            name (str): Name of the tournament
+        """
+        self._hydrate(name)
+        if self._data["tournaments"][name].pop("archive", None) is not None:
+            self._dirty.add(name)
+
+    def _write_document(self, data):
+        """Atomically rewrite the database files and empty the journal
+
+        Args:
+            data (dict): Data to be written
+        """
+        if self.layout == "sharded":
+            self.shard_dir.mkdir(exist_ok=True)
+            for name in self._dirty & data["tournaments"].keys():
+                tournament = data["tournaments"][name]
+                if "archive" in tournament:
+                    self._shard_path(name).unlink(missing_ok=True)
+                    self._hashes.pop(self._shard_path(name), None)
+                elif name in self._hydrated:
+                    shard = {key: tournament[key]
+                             for key in DETAIL_KEYS if key in tournament}
+                    self._write_file(self._shard_path(name),
+                                     self.format.encode(shard))
+            manifest = {
+                "schema_version": SCHEMA_VERSION,
+                "layout": "sharded",
+                "players": data["players"],
+                "tournaments": {name: {key: value
+                                       for key, value in tournament.items()
+                                       if key not in DETAIL_KEYS}
+                                for name, tournament in data["tournaments"].items()},
+            }
+            self._write_file(self.filepath,
+                             self.format.encode(manifest))
+        else:
+            self._hydrate_all(archived=False)
+            # Archived tournaments whose rounds were read keep only their summary
+            tournaments = {name: ({key: value for key, value in tournament.items()
+                                   if key not in DETAIL_KEYS}
+                                  if "archive" in tournament else tournament)
+                           for name, tournament in data["tournaments"].items()}
+            self._write_file(self.filepath,
+                             self.format.encode({"schema_version": SCHEMA_VERSION,
+                                                 **data,
+                                                 "tournaments": tournaments}))
+        self._dirty.clear()
+        self._stored_schema = SCHEMA_VERSION
+        self._stored_layout = self.layout
+        self._stored_format = self.format
+        self.journal.clear()
+        self._journal_offset = 0
+        self._journal_hash = hashlib.blake2b(digest_size=16)
+
+    def _write_file(self, filepath, content):
+        """Atomically write a database file unless it already holds content
+
+        Args:
+            filepath (Path): Path of the file
+            content (bytes): New content of the file
+        """
+        digest = self._digest(content)
+        if self._hashes.get(filepath) == digest:
+            self.stats["write_hits"] += 1
+            return
+        atomic_write(filepath, content)
+        self._hashes[filepath] = digest
+        self.stats["write_misses"] += 1
+
+    def _apply(self, record):
+        """Apply a mutation record to the in-memory data
+
+        Args:
+            record (dict): Mutation record with an 'op' key
+        """
+        getattr(self, f"_apply_{record['op']}")(record)
+
+    def _refresh_players(self):
+        """Point the loaded tournaments to the current Player objects
+
+        Their rounds and opponent indexes are kept, only the players are
+        looked up again.
+        """
+        for name, tournament in self._tournaments.items():
+            tournament.players = self._load_players(
+                self._data["tournaments"][name].get("players", []))
+
+    def _apply_player_set(self, record):
+        self._data["players"][record["id"]] = record["player"]
+        self._players.pop(record["id"], None)
+        self._refresh_players()
+
+    def _apply_players_set(self, record):
+        self._data["players"].update(record["players"])
+        self._players.clear()
+        self._refresh_players()
+
+    def _apply_player_delete(self, record):
+        self._data["players"].pop(record["id"], None)
+        self._players.pop(record["id"], None)
+        self._refresh_players()
+
+    def _apply_tournament_set(self, record):
+        self._data["tournaments"][record["name"]] = record["tournament"]
+        self._tournaments.pop(record["name"], None)
+        self._hydrated.add(record["name"])
+        self._dirty.add(record["name"])
+
+    def _apply_tournament_update(self, record):
+        fields = record["fields"]
+        self._data["tournaments"][record["name"]].update(fields)
+        loaded = self._tournaments.get(record["name"])
+        if loaded is not None:
+            # Updated in place, so that the opponent index is not rebuilt
+            loaded.update(fields, self._load_players(fields.get("players", [])))
+
+    def _apply_tournament_archive(self, record):
+        tournament = self._data["tournaments"][record["name"]]
+        for key in DETAIL_KEYS:
+            tournament.pop(key, None)
+        tournament["archive"] = record["season"]
+        self._hydrated.discard(record["name"])
+        self._tournaments.pop(record["name"], None)
+        self._dirty.add(record["name"])
+
+    def _apply_round_add(self, record):
+        self._thaw(record["name"])
+        tournament = self._data["tournaments"][record["name"]]
+        rounds_data = tournament.setdefault("rounds_data", [])
+        # Writing at a fixed index keeps the replay idempotent
+        if "standings" in tournament:
+            for round_data in rounds_data[record["index"]:]:
+                for match in round_data["matches"]:
+                    Standings.apply_match(tournament["standings"], match, -1)
+        del rounds_data[record["index"]:]
+        rounds_data.append(record["round"])
+        if "standings" in tournament:
+            for match in record["round"]["matches"]:
+                Standings.apply_match(tournament["standings"], match)
+        tournament["current_round"] = record["index"] + 1
+        loaded = self._tournaments.get(record["name"])
+        if loaded is not None:
+            # Loaded objects are kept in step rather than rebuilt
+            loaded.add_round(record["index"],
+                             Round.from_dict(record["round"], loaded.player_index))
+        self._dirty.add(record["name"])
+
+    def _apply_round_end(self, record):
+        self._thaw(record["name"])
+        tournament = self._data["tournaments"][record["name"]]
+        tournament["rounds_data"][record["index"]]["end_time"] = record["end_time"]
+        loaded = self._tournaments.get(record["name"])
+        if loaded is not None:
+            loaded.rounds_data[record["index"]].end_time = record["end_time"]
+        self._dirty.add(record["name"])
+
+    def _apply_match_set(self, record):
+        self._thaw(record["name"])
+        tournament = self._data["tournaments"][record["name"]]
+        round_data = tournament["rounds_data"][record["round"]]
+        if "standings" in tournament:
+            # Replace the previous result by the new one
+            Standings.apply_match(tournament["standings"],
+                                  round_data["matches"][record["index"]], -1)
+            Standings.apply_match(tournament["standings"], record["match"])
+        round_data["matches"][record["index"]] = record["match"]
+        if "standings" not in tournament:
+            tournament["standings"] = Standings.compute(tournament)
+        loaded = self._tournaments.get(record["name"])
+        if loaded is not None:
+            loaded.set_match(record["round"], record["index"],
+                             Match.from_dict(record["match"]))
+        self._dirty.add(record["name"])
+
+    def _apply_standings_set(self, record):
+        self._thaw(record["name"])
+        self._data["tournaments"][record["name"]]["standings"] = record["standings"]
+        self._tournaments.pop(record["name"], None)
+        self._dirty.add(record["name"])
+
+    def get_players(self):
+        """Get all players from the in-memory database
+
+        Returns:
+            dict: Dictionary of player data, keyed by national ID
+        """
+        return self._load()["players"]
+
+    def get_tournaments(self):
+        """Get all tournaments from the in-memory database
+
+        Returns:
+            dict: Dictionary of tournament data, keyed by name
+        """
+        return self.load_data()["tournaments"]
+
+    def get_tournament_data(self, name):
+        """Get the stored data of a single tournament
+
+        Args:
+            name (str): Name of the tournament
+
+        Returns:
+            dict: Tournament data, or an empty dict if not found
+        """
+        with self._lock:
+            self._load()
+            self._hydrate(name)
+            return self._data["tournaments"].get(name, {})
+
+    def read_tournament_data(self, name):
+        """Get the data of a tournament without keeping its rounds loaded
+
+        Rounds not loaded yet are read from their shard or archive for the
+        caller only, so going through every tournament, as a snapshot does,
+        keeps the other tournaments unloaded.
+
+        Args:
+            name (str): Name of the tournament
+
+        Returns:
+            dict: Tournament data, or an empty dict if not found
+        """
+        with self._lock:
+            self._load()
+            tournament = self._data["tournaments"].get(name)
+            if tournament is None or name in self._hydrated:
+                return tournament or {}
+            shard_path = self._shard_path(name)
+            with self.lock.hold(shared=True):
+                if "archive" in tournament:
+                    rounds = self._read_archived(name, tournament["archive"])
+                elif shard_path.exists():
+                    rounds = self._read_file(shard_path)[0]
+                else:
+                    return tournament
+            return dict(tournament, **rounds)
+
+    def get_tournament_summaries(self):
+        """Get every tournament without its rounds
+
+        Returns:
+            dict: Tournament data without rounds_data and standings,
+            keyed by name
+        """
+        return {name: self.get_tournament_summary(name)
+                for name in self._load()["tournaments"]}
+
+    def get_tournaments_between(self, start=None, end=None):
+        """Get the tournaments starting within a range of dates, by start date
+
+        Args:
+            start (int): First start date as an ordinal, None for no limit
+            end (int): Last start date as an ordinal, None for no limit
+
+        Returns:
+            dict: Tournament data without rounds_data and standings, keyed
+            by name and ordered by start date, tournaments without a start
+            date being left out
+        """
+        summaries = [(name, summary)
+                     for name, summary in self.get_tournament_summaries().items()
+                     if summary["start_date"] is not None
+                     and (start is None or summary["start_date"] >= start)
+                     and (end is None or summary["start_date"] <= end)]
+        summaries.sort(key=lambda item: item[1]["start_date"])
+        return dict(summaries)
+
+    def get_tournament_summary(self, name):
+        """Get the data of a single tournament without its rounds
+
+        Args:
+            name (str): Name of the tournament
+
+        Returns:
+            dict: Tournament data without rounds_data and standings,
+            or an empty dict
+        """
+        tournament = self._load()["tournaments"].get(name, {})
+        return {key: value for key, value in tournament.items()
+                if key not in DETAIL_KEYS}
+
+    def get_tournament_players(self, name):
+        """Get the players registered in a tournament
+
+        Args:
+            name (str): Name of the tournament
+
+        Returns:
+            dict: Player data of the tournament, keyed by national ID
+        """
+        players = self.get_players()
+        return {player_id: players[player_id]
+                for player_id in self.get_tournament_summary(name).get("players", [])
+                if player_id in players}
+
+    def get_tournament_rounds(self, name):
+        """Get the rounds and matches of a tournament
+
+        Args:
+            name (str): Name of the tournament
+
+        Returns:
+            list: Rounds data of the tournament
+        """
+        return self.get_tournament_data(name).get("rounds_data", [])
+
+    def get_tournament_standings(self, name):
+        """Get the standings of a tournament without scanning its matches
+
+        Standings are maintained when scores are entered; for tournaments
+        recorded before they existed, they are computed once, from the match
+        columns when the tournament is loaded.
+
+        Args:
+            name (str): Name of the tournament
+
+        Returns:
+            dict: Standings entries (points, played, wins, draws, losses)
+            keyed by player ID, in registration order
+        """
+        tournament = self.get_tournament_data(name)
+        if not tournament:
+            return {}
+        if "standings" not in tournament:
+            loaded = self._tournaments.get(name)
+            with self._lock:
+                tournament["standings"] = (loaded.compute_standings() if loaded
+                                           else Standings.compute(tournament))
+                self._dirty.add(name)
+        return Standings.complete(tournament["standings"],
+                                  tournament.get("players", []))
+
+    def verify_standings(self, name, repair=False):
+        """Recompute the standings of a tournament and report any drift
+
+        Args:
+            name (str): Name of the tournament
+            repair (bool): Replace the stored standings if they drifted
+
+        Returns:
+            dict: {player_id: {field: (stored, expected)}}, empty when the
+            stored standings are correct
+        """
+        tournament = self.get_tournament_data(name)
+        expected = Standings.compute(tournament)
+        drift = Standings.drift(self.get_tournament_standings(name), expected)
+        if drift and repair:
+            self._commit({"op": "standings_set",
+                          "name": name,
+                          "standings": expected})
+        return drift
+
+    def archive_tournaments(self, names=None):
+        """Move finished tournaments to compressed per-season archives
+
+        The rounds and standings of each tournament are written to the
+        archive of its season, then removed from the main database, which
+        keeps the summary with an "archive" key and is compacted. Archives
+        are written before the database, so an interrupted run only leaves
+        tournaments that are both archived and still in the database.
+
+        Args:
+            names (list): Names of the tournaments to archive, defaults to
+            every finished tournament not archived yet
+
+        Returns:
+            dict: Names of the archived tournaments, keyed by season
+        """
+        with self._lock:
+            self.flush()
+            with self.lock.hold():
+                tournaments = self._load()["tournaments"]
+                if names is None:
+                    names = [name for name, tournament in tournaments.items()
+                             if tournament.get("status") == "Terminé"
+                             and "archive" not in tournament]
+                seasons = {}
+                for name in names:
+                    if name in tournaments and "archive" not in tournaments[name]:
+                        season = self.season(tournaments[name].get("start_date"))
+                        seasons.setdefault(season, []).append(name)
+                if not seasons:
+                    return {}
+                self.archive_dir.mkdir(exist_ok=True)
+                for season, season_names in seasons.items():
+                    archived = self._read_archive(season)
+                    for name in season_names:
+                        self.get_tournament_standings(name)
+                        archived[name] = tournaments[name]
+                    content = {"schema_version": SCHEMA_VERSION,
+                               "tournaments": archived}
+                    atomic_write(self.archive_path(season),
+                                 ARCHIVE_FORMAT.encode(content))
+                for season, season_names in seasons.items():
+                    for name in season_names:
+                        self._commit({"op": "tournament_archive",
+                                      "name": name,
+                                      "season": season})
+                self.compact()
+                self.flush()
+        return seasons
 
     def save_tournament(self, tournament):
         """Save a tournament to the database
@@ -51,14 +1205,62 @@ class DataManager:
         Args:
             tournament: Tournament object to save
         """
-        data = self.load_data()
+        self._commit({"op": "tournament_set",
+                      "name": tournament.name,
+                      "tournament": tournament.to_dict()})
+        self._tournaments[tournament.name] = tournament
+
+    def update_tournament(self, name, **fields):
+        """Update some fields of a stored tournament
+
+        Args:
+            name (str): Name of the tournament
+            **fields: Fields to overwrite (status, players, end_date...)
+        """
+        self._commit({"op": "tournament_update",
+                      "name": name,
+                      "fields": fields})
+
+    def add_round(self, name, round_data):
+        """Append a new round to a tournament and make it the current round
+
+        Args:
+            name (str): Name of the tournament
+            round_data (dict): Round data with name, times and matches
+        """
+        index = len(self.get_tournament_data(name).get("rounds_data", []))
+        self._commit({"op": "round_add",
+                      "name": name,
+                      "index": index,
+                      "round": round_data})
+
+    def end_round(self, name, round_index, end_time):
+        """Record the end time of a round
 
-        # Initialize tournaments dictionary if it doesn't exist
-        if "tournaments" not in data:
-            data["tournaments"] = {}
+        Args:
+            name (str): Name of the tournament
+            round_index (int): Index of the round in rounds_data
+            end_time (str): End time of the round
+        """
+        self._commit({"op": "round_end",
+                      "name": name,
+                      "index": round_index,
+                      "end_time": end_time})
 
-        data["tournaments"][tournament.name] = tournament.to_dict()
-        self.save_data(data)
+    def set_match(self, name, round_index, match_index, match):
+        """Replace a match, typically to record its scores
+
+        Args:
+            name (str): Name of the tournament
+            round_index (int): Index of the round in rounds_data
+            match_index (int): Index of the match in the round
+            match (list): [[player1_id, score1], [player2_id, score2]]
+        """
+        self._commit({"op": "match_set",
+                      "name": name,
+                      "round": round_index,
+                      "index": match_index,
+                      "match": match})
 
     def load_tournament(self, name):
         """Load a tournament from the database
@@ -69,9 +1271,26 @@ class DataManager:
         Returns:
             Tournament: Tournament object if found, None otherwise
         """
-        data = self.load_data()
-        return Tournament.from_dict(
-            data["tournaments"].get(name)) if name in data["tournaments"] else None
+        data = self.get_tournament_data(name)
+        if not data:
+            return None
+        if name not in self._tournaments:
+            tournament = Tournament.from_dict(data)
+            tournament.players = self._load_players(data.get("players", []))
+            self._tournaments[name] = tournament
+        return self._tournaments[name]
+
+    def _load_players(self, player_ids):
+        """Load the players of a tournament
+
+        Args:
+            player_ids (list): National IDs of the players
+
+        Returns:
+            list: Player objects of the players found, in the same order
+        """
+        return [player for player in map(self.load_player, player_ids)
+                if player is not None]
 
     def save_player(self, player):
         """Save a player to the database
@@ -79,14 +1298,22 @@ class DataManager:
         Args:
             player: Player object to save
         """
-        data = self.load_data()
+        self._commit({"op": "player_set",
+                      "id": player.national_id,
+                      "player": player.to_dict()})
+        self._players[player.national_id] = player
 
-        # Initialize the players dictionary if it doesn't exist
-        if "players" not in data:
-            data["players"] = {}
+    def save_players(self, players):
+        """Save many players at once, as a single mutation
 
-        data["players"][player.national_id] = player.to_dict()
-        self.save_data(data)
+        Args:
+            players (list): Player objects to save
+        """
+        self._commit({"op": "players_set",
+                      "players": {player.national_id: player.to_dict()
+                                  for player in players}})
+        for player in players:
+            self._players[player.national_id] = player
 
     def load_player(self, national_id):
         """Load a player from the database
@@ -97,10 +1324,12 @@ class DataManager:
         Returns:
             Player: Player object if found, None otherwise
         """
-        data = self.load_data()
-        return Player.from_dict(
-            data["players"]
-            .get(national_id)) if national_id in data['players'] else None
+        players = self.get_players()
+        if national_id not in players:
+            return None
+        if national_id not in self._players:
+            self._players[national_id] = Player.from_dict(players[national_id])
+        return self._players[national_id]
 
     def delete_player(self, national_id):
         """Delete a player from the database
@@ -110,10 +1339,8 @@ class DataManager:
         Returns:
             bool: True if player was deleted, False if not found
         """
-        data = self.load_data()
-
-        if "players" in data and national_id in data["players"]:
-            del data["players"][national_id]
-            self.save_data(data)
-            return True
-        return False
+        if national_id not in self.get_players():
+            return False
+        self._commit({"op": "player_delete",
+                      "id": national_id})
+        return True
@@ -0,0 +1,220 @@
+import gc
+import gzip
+import io
+import json
+import lzma
+import marshal
+from contextlib import contextmanager
+
+
+class JsonFormat:
+    """Pretty-printed JSON, readable and editable by hand"""
+
+    name = "json"
+    streamable = True
+    # Indentation of the document, None for compact JSON
+    indent = 4
+
+    def encode(self, data):
+        """Serialize data
+
+        Args:
+            data (dict): Data to serialize
+
+        Returns:
+            bytes: Serialized data
+        """
+        return json.dumps(data, indent=4).encode("utf-8")
+
+    def decode(self, raw):
+        """Deserialize data
+
+        Args:
+            raw (bytes): Serialized data
+
+        Returns:
+            dict: Deserialized data
+        """
+        return json.loads(raw)
+
+    def matches(self, raw):
+        """Tell whether raw bytes are stored in this format
+
+        Args:
+            raw (bytes): Content of a file
+
+        Returns:
+            bool: True if the content can be decoded by this format
+        """
+        return raw.lstrip()[:1] in (b"{", b"[")
+
+    def open_text(self, filepath):
+        """Open a file for incremental reading, see models.JsonStream
+
+        Args:
+            filepath (Path): Path of the file
+
+        Returns:
+            A text file object
+        """
+        return open(filepath, "r", encoding="utf-8")
+
+    @contextmanager
+    def open_write(self, file):
+        """Write the document incrementally, see models.JsonStream
+
+        Args:
+            file: Binary file object, left open
+
+        Yields:
+            A text file object writing to `file` in this format
+        """
+        text = io.TextIOWrapper(file, encoding="utf-8")
+        try:
+            yield text
+        finally:
+            text.detach()
+
+
+class CompactJsonFormat(JsonFormat):
+    """JSON without indentation and with short separators"""
+
+    name = "json-compact"
+    indent = None
+
+    def encode(self, data):
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+class GzipJsonFormat(CompactJsonFormat):
+    """Compact JSON compressed with gzip"""
+
+    name = "json-gzip"
+
+    def encode(self, data):
+        # A fixed mtime keeps identical data byte-identical
+        return gzip.compress(super().encode(data), compresslevel=6, mtime=0)
+
+    def decode(self, raw):
+        return json.loads(gzip.decompress(raw))
+
+    def open_text(self, filepath):
+        return gzip.open(filepath, "rt", encoding="utf-8")
+
+    @contextmanager
+    def open_write(self, file):
+        with gzip.GzipFile(fileobj=file, mode="wb", compresslevel=6,
+                           mtime=0) as compressed:
+            with super().open_write(compressed) as text:
+                yield text
+
+    def matches(self, raw):
+        return raw.startswith(b"\x1f\x8b")
+
+
+class LzmaJsonFormat(CompactJsonFormat):
+    """Compact JSON compressed with lzma (xz container)"""
+
+    name = "json-lzma"
+
+    def encode(self, data):
+        return lzma.compress(super().encode(data), preset=6)
+
+    def decode(self, raw):
+        return json.loads(lzma.decompress(raw))
+
+    def open_text(self, filepath):
+        return lzma.open(filepath, "rt", encoding="utf-8")
+
+    @contextmanager
+    def open_write(self, file):
+        with lzma.LZMAFile(file, "wb", preset=6) as compressed:
+            with super().open_write(compressed) as text:
+                yield text
+
+    def matches(self, raw):
+        return raw.startswith(b"\xfd7zXZ\x00")
+
+
+class BinaryFormat:
+    """Binary encoding based on the marshal module
+
+    Much faster to load and save than JSON. The marshal format may change
+    between Python versions, so convert the database back to JSON before
+    upgrading Python.
+    """
+
+    name = "binary"
+    # marshal data can only be decoded as a whole
+    streamable = False
+    MAGIC = b"CHSB\x01"
+
+    def encode(self, data):
+        return self.MAGIC + marshal.dumps(data)
+
+    def decode(self, raw):
+        return marshal.loads(raw[len(self.MAGIC):])
+
+    def matches(self, raw):
+        return raw.startswith(self.MAGIC)
+
+
+FORMATS = {fmt.name: fmt for fmt in (JsonFormat(),
+                                     CompactJsonFormat(),
+                                     GzipJsonFormat(),
+                                     LzmaJsonFormat(),
+                                     BinaryFormat())}
+
+
+def get_format(name):
+    """Return a serialization format by name
+
+    Args:
+        name (str): One of the keys of FORMATS
+
+    Returns:
+        The format object
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if name not in FORMATS:
+        raise ValueError(f"Unknown database format: {name}")
+    return FORMATS[name]
+
+
+def detect_format(raw):
+    """Detect the format of serialized data
+
+    Pretty and compact JSON cannot be told apart and are both reported
+    as "json".
+
+    Args:
+        raw (bytes): Content of a file
+
+    Returns:
+        The format object
+
+    Raises:
+        ValueError: If the content matches no known format
+    """
+    for name in ("json-gzip", "json-lzma", "binary", "json"):
+        if FORMATS[name].matches(raw):
+            return FORMATS[name]
+    raise ValueError("Unknown database format")
+
+
+@contextmanager
+def gc_paused():
+    """Suspend the cyclic garbage collector while decoding a large document
+
+    Decoding allocates many containers that cannot form cycles; letting the
+    collector scan them repeatedly roughly doubles the decoding time.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
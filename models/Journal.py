@@ -0,0 +1,116 @@
+import json
+import os
+from pathlib import Path
+
+
+class Journal:
+    """Append-only log of database mutations stored next to the database file
+
+    Each mutation is written as one compact JSON line, so recording a change
+    costs the same whatever the size of the database. The journal is
+    replayed on load and emptied when the database is compacted.
+    """
+
+    def __init__(self, filepath):
+        """Initialize the journal
+
+        Args:
+            filepath (str): Path to the journal file
+        """
+        self.filepath = Path(filepath)
+        self.count = sum(1 for _ in self.read())
+
+    @staticmethod
+    def encode(record):
+        """Serialize a mutation record as a journal line
+
+        Records are encoded when they are committed, so that objects shared
+        with the in-memory data and modified afterwards are journaled as
+        they were at that time.
+
+        Args:
+            record (dict): Mutation record
+
+        Returns:
+            str: The journal line, ending with a newline
+        """
+        return json.dumps(record, separators=(",", ":")) + "\n"
+
+    def append(self, lines):
+        """Append encoded mutation records to the journal in a single write
+
+        The file is fsync'd before returning, so appended records survive
+        a crash.
+
+        Args:
+            lines (list): Records encoded with `encode`
+
+        Returns:
+            bytes: The bytes appended to the file
+        """
+        # Binary mode keeps the bytes identical on every platform
+        content = "".join(lines).encode("utf-8")
+        with open(self.filepath, "ab") as file:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+        self.count += len(lines)
+        return content
+
+    def read_bytes(self):
+        """Read the complete lines of the journal
+
+        A truncated last line, left by an interrupted write, is left out.
+
+        Returns:
+            bytes: Content of the journal up to its last newline
+        """
+        if not self.filepath.exists():
+            return b""
+        with open(self.filepath, "rb") as file:
+            raw = file.read()
+        return raw[:raw.rfind(b"\n") + 1]
+
+    @staticmethod
+    def decode(raw):
+        """Decode journal lines
+
+        Args:
+            raw (bytes): Complete lines read with `read_bytes`
+
+        Returns:
+            list: Mutation records in the order they were appended
+        """
+        records = []
+        for line in raw.splitlines():
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break
+        return records
+
+    def read(self):
+        """Read the records stored in the journal
+
+        Returns:
+            list: Mutation records in the order they were appended
+        """
+        return self.decode(self.read_bytes())
+
+    def clear(self):
+        """Remove every record from the journal"""
+        if self.filepath.exists():
+            self.filepath.unlink()
+        self.count = 0
+
+    def signature(self):
+        """Return the (mtime, size) pair of the journal file
+
+        Returns:
+            tuple: Modification time in nanoseconds and size in bytes,
+            or None if the journal is empty
+        """
+        if not self.filepath.exists():
+            return None
+        stat = self.filepath.stat()
+        return stat.st_mtime_ns, stat.st_size
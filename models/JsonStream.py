@@ -0,0 +1,299 @@
+import json
+import re
+
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+BRACKETS = re.compile(r"[{}\[\]]")
+STRING_SPECIAL = re.compile(r'["\\]')
+SCALAR = re.compile(r"[^,:\]}\s]*")
+
+
+class JsonStreamReader:
+    """Incremental reader walking a JSON document without loading it whole
+
+    The document is read in chunks. Values are located by scanning for
+    brackets and quotes, then only the values asked for are decoded, so
+    memory stays proportional to the chunk size plus the largest value
+    decoded. Skipped values are never held in memory entirely.
+    """
+
+    def __init__(self, file, chunk_size=1 << 16):
+        """Initialize the reader
+
+        Args:
+            file: Text file object opened for reading
+            chunk_size (int): Number of characters read at a time
+        """
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+
+    def _fill(self, keep_from):
+        """Read the next chunk, dropping the text before `keep_from`
+
+        Args:
+            keep_from (int): First buffer index still needed
+
+        Returns:
+            int: Number of characters dropped from the start of the buffer,
+            or -1 at the end of the file
+        """
+        # Growing reads keep the copies linear when a value spans many chunks
+        chunk = self.file.read(max(self.chunk_size, len(self.buffer) - keep_from))
+        if not chunk:
+            return -1
+        self.buffer = self.buffer[keep_from:] + chunk
+        self.pos -= keep_from
+        return keep_from
+
+    def _peek(self):
+        """Skip whitespace and return the next character
+
+        Returns:
+            str: Next character, or an empty string at the end of the file
+        """
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if self._fill(self.pos) < 0:
+                return ""
+
+    def _expect(self, char):
+        """Consume an expected structural character
+
+        Args:
+            char (str): Expected character
+
+        Raises:
+            ValueError: If another character is found
+        """
+        if self._peek() != char:
+            raise ValueError(f"Invalid JSON: expected {char!r} at {self.pos}")
+        self.pos += 1
+
+    def _value_end(self, keep):
+        """Find the end of the value starting at the current position
+
+        Between two strings, brackets are counted with str.count; they are
+        only examined one by one in the stretch where the value may end.
+
+        Args:
+            keep (bool): Keep the value text in the buffer so it can be
+            decoded; when False the text is dropped while scanning
+
+        Returns:
+            int: Buffer index just after the value
+        """
+        first = self._peek()
+        if not first:
+            raise ValueError("Invalid JSON: unexpected end of file")
+        index = self.pos
+        if first not in "{[\"":
+            while True:
+                end = SCALAR.match(self.buffer, index).end()
+                if end < len(self.buffer):
+                    return end
+                dropped = self._fill(self.pos if keep else end)
+                if dropped < 0:
+                    return end
+                index = end - dropped
+        depth = 0
+        in_string = first == '"'
+        if in_string:
+            index += 1
+        while True:
+            buffer = self.buffer
+            if in_string:
+                match = STRING_SPECIAL.search(buffer, index)
+                if match is None:
+                    # An escaped character may still be unread
+                    dropped = self._fill(self.pos if keep
+                                         else min(index, len(buffer)))
+                    if dropped < 0:
+                        raise ValueError("Invalid JSON: unexpected end of file")
+                    index -= dropped
+                elif match.group() == "\\":
+                    index = match.end() + 1
+                else:
+                    index = match.end()
+                    in_string = False
+                    if depth == 0:
+                        return index
+                continue
+            quote = buffer.find('"', index)
+            end = quote if quote >= 0 else len(buffer)
+            closes = buffer.count("}", index, end) + buffer.count("]", index, end)
+            if closes >= depth:
+                for match in BRACKETS.finditer(buffer, index, end):
+                    depth += 1 if match.group() in "{[" else -1
+                    if depth == 0:
+                        return match.end()
+            else:
+                opens = buffer.count("{", index, end) + buffer.count("[", index, end)
+                depth += opens - closes
+            if quote >= 0:
+                index = quote + 1
+                in_string = True
+                continue
+            dropped = self._fill(self.pos if keep else end)
+            if dropped < 0:
+                raise ValueError("Invalid JSON: unexpected end of file")
+            index = end - dropped
+
+    def read_value(self):
+        """Decode the value at the current position
+
+        Returns:
+            The decoded value
+        """
+        end = self._value_end(keep=True)
+        value = json.loads(self.buffer[self.pos:end])
+        self.pos = end
+        return value
+
+    def skip_value(self):
+        """Skip the value at the current position without decoding it"""
+        self.pos = self._value_end(keep=False)
+
+    def iter_object(self):
+        """Iterate over the keys of the object at the current position
+
+        After each key is yielded the caller must consume its value with
+        `read_value` or `skip_value` before asking for the next key.
+
+        Yields:
+            str: Keys of the object, in document order
+        """
+        self._expect("{")
+        if self._peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self._expect(":")
+            yield key
+            separator = self._peek()
+            self.pos += 1
+            if separator == "}":
+                return
+            if separator != ",":
+                raise ValueError(f"Invalid JSON: expected ',' or '}}' at {self.pos}")
+
+
+def iter_entries(file, section):
+    """Iterate over the entries of a top-level object of a JSON document
+
+    Args:
+        file: Text file object opened on the document
+        section (str): Top-level key, for instance "players" or "tournaments"
+
+    Yields:
+        tuple: (key, value) for each entry of the section
+    """
+    reader = JsonStreamReader(file)
+    for key in reader.iter_object():
+        if key != section:
+            reader.skip_value()
+            continue
+        for entry_key in reader.iter_object():
+            yield entry_key, reader.read_value()
+        return
+
+
+def read_header(file, keys):
+    """Read the top-level entries at the beginning of a JSON document
+
+    Reading stops at the first key not in `keys`, so the rest of the
+    document is not read.
+
+    Args:
+        file: Text file object opened on the document
+        keys (tuple): Keys of the header entries
+
+    Returns:
+        dict: Header entries found
+    """
+    reader = JsonStreamReader(file)
+    header = {}
+    for key in reader.iter_object():
+        if key not in keys:
+            break
+        header[key] = reader.read_value()
+    return header
+
+
+def iter_sections(file):
+    """Iterate over the top-level objects of a JSON document in one pass
+
+    Each section must be consumed entirely before the next one is asked
+    for. Top-level values that are not objects are skipped.
+
+    Args:
+        file: Text file object opened on the document
+
+    Yields:
+        tuple: (key, iterator of the (key, value) entries of the section)
+    """
+    reader = JsonStreamReader(file)
+
+    def entries():
+        for entry_key in reader.iter_object():
+            yield entry_key, reader.read_value()
+
+    for key in reader.iter_object():
+        if reader._peek() == "{":
+            yield key, entries()
+        else:
+            reader.skip_value()
+
+
+def write_document(file, header, sections, indent=None):
+    """Write a JSON document whose sections are produced one entry at a time
+
+    The output is the same as json.dumps with the given indentation, or
+    with compact separators when `indent` is None.
+
+    Args:
+        file: Text file object opened for writing
+        header (dict): Top-level entries written first
+        sections: (key, entries) pairs, where entries is an iterable of
+        (key, value) pairs written as a top-level object; both are read
+        lazily
+        indent (int): Indentation, None for compact JSON
+    """
+    if indent:
+        newline = "\n"
+        pad = " " * indent
+        colon = ": "
+    else:
+        newline = pad = ""
+        colon = ":"
+
+    def dumps(value, depth):
+        if not indent:
+            return json.dumps(value, separators=(",", ":"))
+        return json.dumps(value, indent=indent).replace("\n", "\n" + pad * depth)
+
+    file.write("{")
+    separator = newline + pad
+    for key, value in header.items():
+        file.write(f"{separator}{json.dumps(key)}{colon}{dumps(value, 1)}")
+        separator = "," + newline + pad
+    wrote_section = False
+    for key, entries in sections:
+        wrote_section = True
+        file.write(f"{separator}{json.dumps(key)}{colon}{{")
+        separator = "," + newline + pad
+        entry_separator = newline + pad * 2
+        for entry_key, value in entries:
+            file.write(f"{entry_separator}{json.dumps(entry_key)}{colon}"
+                       f"{dumps(value, 2)}")
+            entry_separator = "," + newline + pad * 2
+        if entry_separator != newline + pad * 2:
+            file.write(newline + pad)
+        file.write("}")
+    if header or wrote_section:
+        file.write(newline)
+    file.write("}")
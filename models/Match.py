@@ -1,38 +1,106 @@
+# Scores of both players for each result code: a code holds the half
+# points of the first player times 3 plus those of the second, so 0 is a
+# match not played yet, 6 a win of the first player and 4 a draw
+SCORES = tuple((first / 2, second / 2) for first in range(3) for second in range(3))
+RESULT_CODES = {scores: code for code, scores in enumerate(SCORES)}
+# Points of a pairing-allocated bye
+BYE_SCORE = 1.0
+
+
 class Match:
-    """Represents a chess match between two players with their respective scores"""
+    """Represents a chess match between two players with their respective scores
+
+    A bye is a match whose second player is None, worth BYE_SCORE to the
+    first one.
+    """
+
+    __slots__ = ("player1", "score1", "player2", "score2")
 
     def __init__(self, player1, player2, score1=0.0, score2=0.0):
         """Initialize a match with two players and their scores
 
         Args:
-            player1: First player object
-            player2: Second player object
+            player1 (str): National ID of the first player
+            player2 (str): National ID of the second player, None for a bye
             score1 (float): Score of first player (default: 0.0)
             score2 (float): Score of second player (default: 0.0)
         """
-        self.match = [(player1, score1),
-                      (player2, score2)]
+        self.player1 = player1
+        self.score1 = score1
+        self.player2 = player2
+        self.score2 = score2
+
+    @property
+    def players(self):
+        """tuple: National IDs of both players"""
+        return self.player1, self.player2
+
+    @property
+    def is_bye(self):
+        """bool: True if the first player has a bye"""
+        return self.player2 is None
+
+    @property
+    def is_scored(self):
+        """bool: True once a result has been entered"""
+        return bool(self.score1 or self.score2)
+
+    @property
+    def result_code(self):
+        """int: Code of the scores, see SCORES
+
+        Raises:
+            ValueError: If a score is not 0, 0.5 or 1
+        """
+        try:
+            return RESULT_CODES[(self.score1, self.score2)]
+        except KeyError:
+            raise ValueError(f"Score non géré : {self.score1}-{self.score2}") from None
 
     def to_dict(self):
         """Convert match data to dictionary format for storage
 
         Returns:
-            dict: Match data in dictionary format
+            list: [[player1, score1], [player2, score2]]
         """
-        return {"player1": self.match[0],
-                "player2": self.match[1]}
+        return [[self.player1, self.score1], [self.player2, self.score2]]
 
     @classmethod
     def from_dict(cls, data):
         """Create a Match instance from dictionary data
 
         Args:
-            data (dict): Dictionary containing match data
+            data (list): [[player1, score1], [player2, score2]]
 
         Returns:
             Match: New Match instance with loaded data
         """
-        return cls(data["player1"][0],
-                   data["player2"][0],
-                   data["player1"][1],
-                   data["player2"][1])
+        (player1, score1), (player2, score2) = data
+        return cls(player1, player2, score1, score2)
+
+    @classmethod
+    def bye(cls, player):
+        """Create the bye of a player
+
+        Args:
+            player (str): National ID of the player
+
+        Returns:
+            Match: Match of the player against no one, already scored
+        """
+        return cls(player, None, BYE_SCORE, 0.0)
+
+    @classmethod
+    def from_code(cls, player1, player2, code):
+        """Create a Match instance from a result code
+
+        Args:
+            player1 (str): National ID of the first player
+            player2 (str): National ID of the second player, None for a bye
+            code (int): Result code, see SCORES
+
+        Returns:
+            Match: New Match instance
+        """
+        score1, score2 = SCORES[code]
+        return cls(player1, player2, score1, score2)
@@ -0,0 +1,63 @@
+class OpponentIndex:
+    """Players already met by each player of a tournament
+
+    For each player position in the tournament's PlayerIndex, an integer
+    holds one bit per position of the players met, and the positions of
+    the players who had a bye are kept in a set. Rematch and bye checks are
+    then a shift or a lookup rather than scans of every round, and the
+    index takes a few bytes per player. A tournament builds it from its
+    rounds the first time it pairs a round and then extends it with each
+    new round.
+    """
+
+    __slots__ = ("played", "byes")
+
+    def __init__(self, rounds_data=()):
+        """Initialize the index
+
+        Args:
+            rounds_data (iterable): Rounds already played
+        """
+        self.played = []
+        self.byes = set()
+        for round_data in rounds_data:
+            self.add_round(round_data)
+
+    def add_round(self, round_data):
+        """Record the games of a round
+
+        Args:
+            round_data (Round): The round
+        """
+        played = self.played
+        for white, black in round_data.pairs():
+            if white == black:
+                self.byes.add(white)
+                continue
+            if len(played) <= max(white, black):
+                played.extend([0] * (max(white, black) + 1 - len(played)))
+            played[white] |= 1 << black
+            played[black] |= 1 << white
+
+    def has_played(self, player1, player2):
+        """Tell whether two players already met
+
+        Args:
+            player1 (int): Position of a player
+            player2 (int): Position of the other player
+
+        Returns:
+            bool: True if they played each other
+        """
+        return player1 < len(self.played) and bool(self.played[player1] >> player2 & 1)
+
+    def has_bye(self, player):
+        """Tell whether a player already had a bye
+
+        Args:
+            player (int): Position of the player
+
+        Returns:
+            bool: True if the player had a bye
+        """
+        return player in self.byes
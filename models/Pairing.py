@@ -0,0 +1,548 @@
+"""Pairing of the rounds of a Swiss tournament
+
+Two Swiss pairing systems are available, chosen per tournament: the
+weighted system ("weighted", the default) and the FIDE Dutch system
+("dutch"). Round-robins ("round_robin", "double_round_robin") follow the
+Berger tables instead, see models.RoundRobin.
+
+In the weighted system a round is paired as a maximum weight matching over
+the players, see utils.Matching. Pairing two players costs the square of
+the difference of their scores in half-points, so players stay within
+their score group and float to the nearest one when needed. A rematch
+costs more than any pairing without one, which makes avoiding rematches a
+hard constraint: a pairing with a rematch is only chosen when none without
+one exists.
+
+With an odd number of players, one more vertex stands for the bye, which
+is paired like an opponent on the lowest score: the bye goes to a player
+of the lowest score group that leaves the others pairable, the lowest
+ranked one first. A second bye for the same player costs as much as a
+rematch.
+
+Candidate opponents are limited to the players following each player in
+the ranking, within a window doubled until the pairing has no rematch or
+covers the whole ranking. The first solve is usually enough and keeps the
+graph small; the last one considers every pair, so rematches are avoided
+whenever possible.
+
+The Dutch system gives the bye first, then pairs the score brackets from
+the top, see DutchPairing.
+
+Both work on player positions in the player index of the tournament, ranked
+by score then by position, which is the registration order.
+"""
+from collections import deque
+from utils.Matching import max_weight_matching
+
+
+PAIRING_SYSTEMS = {"weighted": "Suisse pondéré",
+                   "dutch": "Système hollandais (FIDE)",
+                   "round_robin": "Toutes rondes (Berger)",
+                   "double_round_robin": "Double toutes rondes (Berger)"}
+DEFAULT_PAIRING = "weighted"
+# Number of following players in the ranking first considered as opponents
+WINDOW = 8
+# Nodes of the transposition search explored per bracket and number of pairs
+TRANSPOSITION_LIMIT = 20000
+# Players next to the S1/S2 boundary considered for exchanges of two players
+EXCHANGE_DEPTH = 6
+WHITE = 1
+BLACK = -1
+
+
+def pairing_history(rounds_data, count):
+    """Replay the rounds of a tournament for the pairing of the next one
+
+    Args:
+        rounds_data (list): Round objects of the tournament
+        count (int): Number of players in the player index
+
+    Returns:
+        tuple: (half_points, colours, floats), the score of each position
+        in half-points, its colours (WHITE or BLACK) round after round, and
+        its float in the last round (1 down, -1 up, 0 none), a bye counting
+        as a float down; the games played and the byes are in the
+        tournament's OpponentIndex
+    """
+    half_points = [0] * count
+    colours = [[] for _ in range(count)]
+    floats = [0] * count
+    for round_data in rounds_data:
+        floats = [0] * count
+        for white, black in zip(round_data.white, round_data.black):
+            if white == black:
+                floats[white] = 1
+                continue
+            colours[white].append(WHITE)
+            colours[black].append(BLACK)
+            if half_points[white] != half_points[black]:
+                higher, lower = ((white, black)
+                                 if half_points[white] > half_points[black]
+                                 else (black, white))
+                floats[higher] = 1
+                floats[lower] = -1
+        for white, black, code in zip(round_data.white, round_data.black,
+                                      round_data.results):
+            half_points[white] += code // 3
+            if white != black:
+                half_points[black] += code % 3
+    return half_points, colours, floats
+
+
+def swiss_pairs(ranking, half_points, opponents, window=WINDOW):
+    """Pair the players of a round
+
+    Args:
+        ranking (list): Player positions, best ranked first
+        half_points (list): Score of each position in half-points
+        opponents (OpponentIndex): Games already played and byes
+        window (int): Number of following players first considered as
+        opponents of each player
+
+    Returns:
+        list: (player1, player2) position pairs, the better ranked player
+        first, in ranking order; with an odd number of players the last
+        pair is (player, None), the bye
+    """
+    count = len(ranking)
+    if count < 2:
+        return [(player, None) for player in ranking]
+    spread = half_points[ranking[0]] - half_points[ranking[-1]]
+    # Costs of the pairings without rematch add up to less than one rematch
+    rematch = (spread * spread + 1) * (count // 2 + 1)
+    base = spread * spread + rematch + 1
+    # Weights are scaled so that the rank of the player getting the bye only
+    # breaks ties between pairings of the same cost; the bye of the lowest
+    # ranked player keeps the maximum weight, see max_weight_matching
+    bye = count if count % 2 else None
+    scale = count if bye is not None else 1
+    window = max(1, window)
+    while True:
+        edges = []
+        for i, player1 in enumerate(ranking):
+            for j in range(i + 1, min(count, i + 1 + window)):
+                player2 = ranking[j]
+                difference = half_points[player1] - half_points[player2]
+                weight = base - difference * difference
+                if opponents.has_played(player1, player2):
+                    weight -= rematch
+                edges.append((i, j, weight * scale))
+            if bye is not None:
+                difference = half_points[player1] - half_points[ranking[-1]]
+                weight = base - difference * difference
+                if opponents.has_bye(player1):
+                    weight -= rematch
+                edges.append((i, bye, weight * scale - (count - 1 - i)))
+        mate = max_weight_matching(edges, max_cardinality=True)
+        pairs = [(i, j) for i, j in enumerate(mate) if i < j]
+        if window >= count - 1 or not any(
+                opponents.has_bye(ranking[i]) if j == bye
+                else opponents.has_played(ranking[i], ranking[j]) for i, j in pairs):
+            return ([(ranking[i], ranking[j]) for i, j in pairs if j != bye]
+                    + [(ranking[i], None) for i, j in pairs if j == bye])
+        window *= 2
+
+
+class DutchPairing:
+    """Pairing of a round by the FIDE Dutch system
+
+    With an odd number of players, the bye goes first to the lowest ranked
+    player without a previous bye whose absence leaves the others pairable
+    without rematch. The others are split into score brackets, paired from
+    the top. The players
+    of a bracket who cannot be paired in it float down to the next one,
+    where they are paired first, against its best placed residents. The
+    rest of a bracket is split in two halves, S1 and S2, and S1 is paired
+    in order against S2 in the first transposition of S2 that satisfies the
+    absolute criteria (no rematch, no two players who must both have the
+    same colour) with the least colour preferences left unmet, then the
+    fewest players floating down twice in a row. Exchanges between S1 and
+    S2 are tried when no transposition does.
+
+    Transpositions are searched depth first, in lexicographic order,
+    cutting branches which already meet more unmet preferences than the
+    best candidate, with a budget of TRANSPOSITION_LIMIT nodes. Each
+    bracket computes the incompatible pairs of its players and the cost of
+    their colour clashes once, and caches whether the rest of the
+    tournament can still be paired below each set of players it would send
+    down. When that is impossible or the budget runs out in the last
+    bracket, the players left are paired by
+    swiss_pairs.
+    """
+
+    def __init__(self, ranking, half_points, opponents, colours, floats,
+                 limit=TRANSPOSITION_LIMIT):
+        """Initialize the pairing
+
+        Args:
+            ranking (list): Player positions by score then position
+            half_points (list): Score of each position in half-points
+            opponents (OpponentIndex): Games already played and byes
+            colours (list): Colours played by each position, see
+            pairing_history
+            floats (list): Float of each position in the last round
+            limit (int): Nodes of the transposition search per bracket
+        """
+        self.ranking = ranking
+        self.rank = {player: index for index, player in enumerate(ranking)}
+        self.half_points = half_points
+        self.opponents = opponents
+        self.colours = colours
+        self.floats = floats
+        self.limit = limit
+        self.preferences = {player: self._preference(colours[player])
+                            for player in ranking}
+        self.blocked = {}
+        self.clashes = {}
+        self.budget = 0
+        self.best_cost = 0
+        self.weight = 1
+
+    @staticmethod
+    def _preference(colours):
+        """Compute the colour preference of a player
+
+        Args:
+            colours (list): Colours played, WHITE or BLACK, oldest first
+
+        Returns:
+            tuple: (strength, colour), strength 3 absolute, 2 strong,
+            1 mild, 0 none; colour WHITE, BLACK or 0
+        """
+        if not colours:
+            return 0, 0
+        difference = sum(colours)
+        if difference > 1:
+            return 3, BLACK
+        if difference < -1:
+            return 3, WHITE
+        if len(colours) > 1 and colours[-1] == colours[-2]:
+            return 3, -colours[-1]
+        if difference:
+            return 2, -difference
+        return 1, -colours[-1]
+
+    def _pair_cost(self, player1, player2):
+        """Cost of the colour preference one of two players will not get"""
+        strength1, colour1 = self.preferences[player1]
+        strength2, colour2 = self.preferences[player2]
+        if not colour1 or colour1 != colour2:
+            return 0
+        return self.weight * (self.weight + (min(strength1, strength2) >= 2))
+
+    def pair(self):
+        """Pair the round
+
+        Returns:
+            list: (white, black) position pairs by board; with an odd number
+            of players the last pair is (player, None), the bye
+        """
+        players = self.ranking
+        bye = None
+        if len(players) % 2:
+            bye = self._bye()
+            players = [player for player in players if player != bye]
+        brackets = []
+        for player in players:
+            if (brackets
+                    and self.half_points[brackets[-1][0]] == self.half_points[player]):
+                brackets[-1].append(player)
+            else:
+                brackets.append([player])
+        pairs = []
+        floaters = []
+        for index, residents in enumerate(brackets):
+            lower = [player for bracket in brackets[index + 1:] for player in bracket]
+            result = self._pair_bracket(floaters, residents, lower)
+            if result is None:
+                pairs.extend(swiss_pairs(floaters + residents + lower,
+                                         self.half_points, self.opponents))
+                break
+            bracket_pairs, floaters = result
+            pairs.extend(bracket_pairs)
+        pairs = [self._allocate(player1, player2) for player1, player2 in pairs]
+        return pairs + [(bye, None)] if bye is not None else pairs
+
+    def _bye(self):
+        """Choose the player who gets the bye
+
+        Returns:
+            int: The lowest ranked player without a previous bye who leaves
+            the others pairable, or failing that the lowest ranked without
+            a previous bye, or the lowest ranked if they all had one
+        """
+        eligible = ([player for player in reversed(self.ranking)
+                     if not self.opponents.has_bye(player)]
+                    or self.ranking[::-1])
+        for player in eligible:
+            if self._completes([other for other in self.ranking if other != player]):
+                return player
+        return eligible[0]
+
+    def _pair_bracket(self, floaters, residents, lower):
+        """Pair a bracket
+
+        Args:
+            floaters (list): Players moved down from the brackets above
+            residents (list): Players of the bracket
+            lower (list): Players of the brackets below
+
+        Returns:
+            tuple: (pairs, players moving down), None if the bracket cannot
+            be paired so that the players below can be too
+        """
+        players = floaters + residents
+        self.blocked = {player: {other for other in players
+                                 if self.opponents.has_played(player, other)
+                                 or self._colour_clash(player, other)}
+                        for player in players}
+        self.weight = len(players) + 1
+        self.clashes = {player: {other: self._pair_cost(player, other)
+                                 for other in players
+                                 if self._pair_cost(player, other)}
+                        for player in players}
+        completions = {}
+        top = len(players) // 2
+        for pair_count in range(top, -1 if lower else top - 1, -1):
+            self.budget = self.limit
+            self.best_cost = best_cost = self.weight ** 3
+            best = None
+            for pairs, down, cost in self._candidates(floaters, residents, pair_count):
+                cost += sum(self.floats[player] == 1 for player in down)
+                if cost >= best_cost:
+                    continue
+                if lower:
+                    key = frozenset(down)
+                    if key not in completions:
+                        completions[key] = self._completes(down + lower)
+                    if not completions[key]:
+                        continue
+                best, best_cost = (pairs, down), cost
+                self.best_cost = cost
+                if not cost:
+                    break
+            if best is not None:
+                return best
+        return None
+
+    def _colour_clash(self, player1, player2):
+        strength1, colour1 = self.preferences[player1]
+        strength2, colour2 = self.preferences[player2]
+        return strength1 == strength2 == 3 and colour1 == colour2
+
+    def _candidates(self, floaters, residents, pair_count):
+        """Yield the pairings of a bracket in the order of the Dutch system
+
+        The best placed floaters are paired first against the residents,
+        then the residents left are paired as a homogeneous bracket.
+
+        Args:
+            floaters (list): Players moved down, by rank
+            residents (list): Players of the bracket, by rank
+            pair_count (int): Number of pairs to make
+
+        Yields:
+            tuple: (pairs, players moving down by rank, cost of the unmet
+            colour preferences)
+        """
+        moved = min(len(floaters), pair_count)
+        limbo = floaters[moved:]
+        transpositions = self._transpositions(floaters[:moved], residents, 0)
+        for floater_pairs, rest, cost in transpositions:
+            for pairs, down, total in self._homogeneous(rest, pair_count - moved,
+                                                        cost):
+                yield (floater_pairs + pairs, sorted(limbo + down, key=self.rank.get),
+                       total)
+
+    def _homogeneous(self, players, pair_count, cost):
+        """Yield the pairings of players of the same score
+
+        Args:
+            players (list): Players, by rank
+            pair_count (int): Number of pairs to make
+            cost (int): Cost of the pairs already made in the bracket
+
+        Yields:
+            tuple: (pairs, players left, cost)
+        """
+        s1, s2 = players[:pair_count], players[pair_count:]
+        for exchanged1, exchanged2 in self._exchanges(s1, s2):
+            yield from self._transpositions(exchanged1, exchanged2, cost)
+
+    def _exchanges(self, s1, s2):
+        """Yield S1 and S2, then with one and two players exchanged
+
+        Exchanges come in the order of the Dutch system: the smallest
+        difference between the sums of the bracket numbers of the players
+        moved to S1 and to S2, then moving the lowest players of S1 and the
+        highest players of S2. Exchanges of two players are limited to the
+        EXCHANGE_DEPTH players on each side of the boundary.
+
+        Args:
+            s1 (list): Upper half of the bracket, by rank
+            s2 (list): Lower half of the bracket, by rank
+
+        Yields:
+            tuple: (S1, S2), each by rank
+        """
+        yield s1, s2
+        if not s1:
+            return
+        singles = sorted(((j + len(s1) - i, -i, j), (i,), (j,))
+                         for i in range(len(s1)) for j in range(len(s2)))
+        first1 = max(0, len(s1) - EXCHANGE_DEPTH)
+        depth2 = min(len(s2), EXCHANGE_DEPTH)
+        doubles = sorted(((j1 + j2 + 2 * len(s1) - i1 - i2, -i2, -i1, j1, j2),
+                          (i1, i2), (j1, j2))
+                         for i1 in range(first1, len(s1))
+                         for i2 in range(i1 + 1, len(s1))
+                         for j1 in range(depth2) for j2 in range(j1 + 1, depth2))
+        for _, up, down in singles + doubles:
+            if self.budget <= 0:
+                return
+            moved_up = [s2[j] for j in down]
+            moved_down = [s1[i] for i in up]
+            yield (sorted([player for player in s1 if player not in moved_down]
+                          + moved_up, key=self.rank.get),
+                   sorted([player for player in s2 if player not in moved_up]
+                          + moved_down, key=self.rank.get))
+
+    def _transpositions(self, s1, s2, cost):
+        """Yield the pairings of S1 against S2 in lexicographic order of S2
+
+        The search is depth first, skipping incompatible players and
+        branches whose cost reaches the best candidate so far, and stops
+        when the budget of nodes is spent.
+
+        Args:
+            s1 (list): Players to pair, by rank
+            s2 (list): Their possible opponents, by rank
+            cost (int): Cost of the pairs already made in the bracket
+
+        Yields:
+            tuple: (pairs, players of S2 left, cost)
+        """
+        if not s1:
+            yield [], list(s2), cost
+            return
+        size = len(s2)
+        chosen = [0] * len(s1)
+        costs = [cost] * (len(s1) + 1)
+        taken = [False] * size
+        level = start = 0
+        while True:
+            self.budget -= 1
+            if self.budget < 0:
+                return
+            player = s1[level]
+            blocked = self.blocked[player]
+            clashes = self.clashes[player]
+            for j in range(start, size):
+                if taken[j] or s2[j] in blocked:
+                    continue
+                pair_cost = costs[level] + clashes.get(s2[j], 0)
+                if pair_cost < self.best_cost:
+                    break
+            else:
+                # No opponent left for this player: backtrack
+                level -= 1
+                if level < 0:
+                    return
+                taken[chosen[level]] = False
+                start = chosen[level] + 1
+                continue
+            chosen[level] = j
+            taken[j] = True
+            costs[level + 1] = pair_cost
+            if level + 1 < len(s1):
+                level += 1
+                start = 0
+                continue
+            yield ([(s1[index], s2[chosen[index]]) for index in range(len(s1))],
+                   [s2[index] for index in range(size) if not taken[index]],
+                   pair_cost)
+            taken[j] = False
+            start = j + 1
+
+    def _completes(self, players):
+        """Check that players can all be paired without rematch
+
+        A greedy pass in rank order usually settles it, a maximum
+        cardinality matching decides otherwise. The players left are kept
+        in a deque, as they are taken from its front.
+
+        Args:
+            players (list): Players, by rank
+
+        Returns:
+            bool: True if at most one player is left unpaired
+        """
+        left = deque(players)
+        while len(left) > 1:
+            player = left.popleft()
+            opponent = next((index for index, other in enumerate(left)
+                             if not self.opponents.has_played(player, other)), None)
+            if opponent is None:
+                break
+            del left[opponent]
+        else:
+            return True
+        edges = [(i, j, 1) for i in range(len(players))
+                 for j in range(i + 1, len(players))
+                 if not self.opponents.has_played(players[i], players[j])]
+        mate = max_weight_matching(edges, max_cardinality=True)
+        return sum(other >= 0 for other in mate) >= len(players) - len(players) % 2
+
+    def _allocate(self, player1, player2):
+        """Give the colours of a pair
+
+        Both preferences are granted when they allow it, otherwise the
+        stronger one, then colours alternate from the last round in which
+        the players had different colours, then the better ranked player
+        gets his preference. Without preferences, the better ranked player
+        has white on odd ranks in the bracket order, black on even ones.
+
+        Args:
+            player1: Position of a player
+            player2: Position of the other player
+
+        Returns:
+            tuple: (white, black)
+        """
+        if self.rank[player1] > self.rank[player2]:
+            player1, player2 = player2, player1
+        strength1, colour1 = self.preferences[player1]
+        strength2, colour2 = self.preferences[player2]
+        if colour1 != colour2:
+            colour = colour1 or -colour2
+        elif not colour1:
+            colour = WHITE if self.rank[player1] % 2 == 0 else BLACK
+        elif strength1 != strength2:
+            colour = colour1 if strength1 > strength2 else -colour2
+        else:
+            colour = colour1
+            for own, other in zip(reversed(self.colours[player1]),
+                                  reversed(self.colours[player2])):
+                if own != other:
+                    colour = -own
+                    break
+        return (player1, player2) if colour == WHITE else (player2, player1)
+
+
+def dutch_pairs(ranking, half_points, opponents, colours, floats,
+                limit=TRANSPOSITION_LIMIT):
+    """Pair the players of a round by the FIDE Dutch system
+
+    Args:
+        ranking (list): Player positions by score then position
+        half_points (list): Score of each position in half-points
+        opponents (OpponentIndex): Games already played and byes
+        colours (list): Colours played by each position, see pairing_history
+        floats (list): Float of each position in the last round
+        limit (int): Nodes of the transposition search per bracket
+
+    Returns:
+        list: (white, black) position pairs by board, then (player, None)
+        for the bye with an odd number of players
+    """
+    return DutchPairing(ranking, half_points, opponents, colours, floats, limit).pair()
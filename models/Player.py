@@ -1,6 +1,8 @@
 class Player:
     """Represents a chess player with personal information"""
 
+    __slots__ = ("last_name", "first_name", "birth_date", "national_id")
+
     def __init__(self, last_name, first_name, birth_date, national_id):
         """Initialize a player with their personal details
 
@@ -15,13 +17,23 @@ class Player:
         self.birth_date = birth_date
         self.national_id = national_id
 
+    @property
+    def full_name(self):
+        """str: First name followed by last name"""
+        return f"{self.first_name} {self.last_name}".strip()
+
     def to_dict(self):
         """Convert player data to dictionary format for storage
 
         Returns:
             dict: Player data in dictionary format
         """
-        return self.__dict__
+        return {
+            "last_name": self.last_name,
+            "first_name": self.first_name,
+            "birth_date": self.birth_date,
+            "national_id": self.national_id
+        }
 
     @classmethod
     def from_dict(cls, data):
@@ -0,0 +1,49 @@
+class PlayerIndex:
+    """Dense integer positions of the players of a tournament
+
+    National IDs are interned once per tournament so that rounds can store
+    their matches as columns of small integers.
+    """
+
+    __slots__ = ("ids", "positions")
+
+    def __init__(self, ids=()):
+        """Initialize the index
+
+        Args:
+            ids (iterable): National IDs to intern first, usually the
+            registered players in registration order
+        """
+        self.ids = []
+        self.positions = {}
+        for national_id in ids:
+            self.intern(national_id)
+
+    def intern(self, national_id):
+        """Return the position of a player, adding it if needed
+
+        Args:
+            national_id (str): National ID of the player
+
+        Returns:
+            int: Position of the player in the index
+        """
+        position = self.positions.get(national_id)
+        if position is None:
+            position = self.positions[national_id] = len(self.ids)
+            self.ids.append(national_id)
+        return position
+
+    def __getitem__(self, position):
+        """Return the national ID at a position
+
+        Args:
+            position (int): Position in the index
+
+        Returns:
+            str: National ID of the player
+        """
+        return self.ids[position]
+
+    def __len__(self):
+        return len(self.ids)
@@ -1,20 +1,73 @@
-from datetime import datetime
-from models.Match import Match
+from array import array
+from models.Match import SCORES, Match
+from models.PlayerIndex import PlayerIndex
+from utils.Dates import now
 
 
 class Round:
-    """Represents a round in a chess tournament containing multiple matches"""
+    """Represents a round in a chess tournament containing multiple matches
 
-    def __init__(self, name):
+    Matches are held as three columns: the positions of both players in the
+    tournament's PlayerIndex and the result code of the match (see
+    models.Match.SCORES). Match objects are only built when asked for. A
+    bye is stored as a match of the player against themself.
+    """
+
+    __slots__ = ("name", "start_time", "end_time", "player_index",
+                 "white", "black", "results")
+
+    def __init__(self, name, matches=None, start_time=None, end_time=None,
+                 player_index=None):
         """Initialize a round with a name and start time
 
         Args:
             name (str): Name of the round (e.g., 'Round 1')
+            matches (list): Match objects of the round (default: none)
+            start_time (int): Start time as a Unix timestamp, now if not given
+            end_time (int): End time as a Unix timestamp, None while the
+            round is in progress
+            player_index (PlayerIndex): Index shared with the tournament,
+            a new one if not given
         """
         self.name = name
-        self.matches = []
-        self.start_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.end_time = None
+        self.start_time = now() if start_time is None else start_time
+        self.end_time = end_time
+        self.player_index = player_index if player_index is not None else PlayerIndex()
+        self.white = array("I")
+        self.black = array("I")
+        self.results = array("B")
+        for match in matches or ():
+            self.add_match(match)
+
+    @property
+    def is_finished(self):
+        """bool: True once the round has an end time"""
+        return self.end_time is not None
+
+    @property
+    def matches(self):
+        """list: Match objects of the round, built from the columns"""
+        ids = self.player_index.ids
+        return [Match.from_code(ids[white], ids[black] if black != white else None,
+                                code)
+                for white, black, code in zip(self.white, self.black, self.results)]
+
+    def pairs(self):
+        """Iterate over the players of each match
+
+        Returns:
+            iterator: (white, black) positions in the player index, the
+            same position twice for a bye
+        """
+        return zip(self.white, self.black)
+
+    def byes(self):
+        """Return the players who have a bye
+
+        Returns:
+            list: Positions in the player index
+        """
+        return [white for white, black in self.pairs() if white == black]
 
     def add_match(self, match):
         """Add a match to the round
@@ -22,11 +75,48 @@ class Round:
         Args:
             match (Match): Match object to add to the round
         """
-        self.matches.append(match)
+        code = match.result_code
+        white = self.player_index.intern(match.player1)
+        self.white.append(white)
+        self.black.append(white if match.is_bye
+                          else self.player_index.intern(match.player2))
+        self.results.append(code)
+
+    def set_match(self, index, match):
+        """Replace a match of the round
+
+        Args:
+            index (int): Index of the match in the round
+            match (Match): New match
+        """
+        code = match.result_code
+        white = self.player_index.intern(match.player1)
+        self.white[index] = white
+        self.black[index] = (white if match.is_bye
+                             else self.player_index.intern(match.player2))
+        self.results[index] = code
+
+    def find_match(self, player1, player2):
+        """Find the match between two players
+
+        Args:
+            player1 (str): National ID of a player
+            player2 (str): National ID of the other player, None for a bye
+
+        Returns:
+            int: Index of the match in the round, None if not found
+        """
+        positions = self.player_index.positions
+        first = positions.get(player1)
+        second = first if player2 is None else positions.get(player2)
+        if first is None or second is None:
+            return None
+        return next((index for index, pair in enumerate(self.pairs())
+                     if pair == (first, second) or pair == (second, first)), None)
 
     def end_round(self):
         """End the round and record the end time"""
-        self.end_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.end_time = now()
 
     def to_dict(self):
         """Convert round data to dictionary format for storage
@@ -34,25 +124,31 @@ class Round:
         Returns:
             dict: Round data including matches, start and end times
         """
+        ids = self.player_index.ids
         return {
             "name": self.name,
-            "matches": [match.to_dict() for match in self.matches],
             "start_time": self.start_time,
-            "end_time": self.end_time
+            "end_time": self.end_time,
+            "matches": [[[ids[white], SCORES[code][0]],
+                         [ids[black] if black != white else None, SCORES[code][1]]]
+                        for white, black, code in zip(self.white, self.black,
+                                                      self.results)]
         }
 
     @classmethod
-    def from_dict(cls, data):
+    def from_dict(cls, data, player_index=None):
         """Create a Round instance from dictionary data
 
         Args:
             data (dict): Dictionary containing round data
+            player_index (PlayerIndex): Index shared with the tournament,
+            a new one if not given
 
         Returns:
             Round: New Round instance with loaded data
         """
-        round_instance = cls(data["name"])
-        round_instance.matches = [Match.from_dict(match) for match in data["matches"]]
-        round_instance.start_time = data["start_time"]
-        round_instance.end_time = data["end_time"]
-        return round_instance
+        return cls(data["name"],
+                   [Match.from_dict(match) for match in data["matches"]],
+                   data["start_time"],
+                   data["end_time"],
+                   player_index)
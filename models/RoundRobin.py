@@ -0,0 +1,133 @@
+"""Round-robin schedules from the Berger tables
+
+Players are numbered from 0 by registration order. With an even number n
+of players, in round r (counted from 0) player n - 1 meets player
+p = r * n / 2 modulo n - 1, with black in even rounds and white in odd
+ones, and every other pair of players a, b with a + b = 2p modulo n - 1
+meets, the player just after p around the circle having white. These are
+the tables of the FIDE handbook (C.05, annex 1): every player alternates
+colours as much as possible and has the same number of whites, give or
+take one. With an odd number of players, a number is added for the bye
+and the player who would meet it gets the bye.
+
+A double round-robin plays the cycle again with colours reversed. As the
+handbook recommends, the last two rounds of the first cycle are swapped,
+so that from six players on no one has the same colour three times in a
+row across the two cycles.
+"""
+from array import array
+
+
+# Number of cycles of each round-robin pairing system
+CYCLES = {"round_robin": 1, "double_round_robin": 2}
+
+
+class BergerTable:
+    """Schedule of every round of a round-robin, computed once
+
+    The rounds are held in a single array of player numbers, white then
+    black for each board, so a league of a few hundred players and
+    hundreds of rounds fits in a few hundred kilobytes and a round is a
+    slice of it.
+    """
+
+    __slots__ = ("count", "cycles", "boards", "table")
+
+    def __init__(self, count, cycles=1):
+        """Compute the schedule
+
+        Args:
+            count (int): Number of players
+            cycles (int): 1 for a round-robin, 2 for a double one
+        """
+        self.count = count
+        self.cycles = cycles
+        size = count + count % 2
+        self.boards = size // 2
+        cycle = [self._round(size, number) for number in range(size - 1)]
+        if cycles == 2 and len(cycle) > 1:
+            cycle[-2], cycle[-1] = cycle[-1], cycle[-2]
+        self.table = array("I")
+        for round_pairs in cycle:
+            self.table.extend(round_pairs)
+        for _ in range(1, cycles):
+            for round_pairs in cycle:
+                for board in range(0, len(round_pairs), 2):
+                    self.table.extend((round_pairs[board + 1], round_pairs[board]))
+
+    @staticmethod
+    def _round(size, number):
+        """Compute a round of the first cycle
+
+        Args:
+            size (int): Even number of players, counting the bye
+            number (int): Index of the round
+
+        Returns:
+            list: White and black player of each board, in board order
+        """
+        last = size - 1
+        pivot = number * (size // 2) % last
+        pairs = [pivot, last] if number % 2 == 0 else [last, pivot]
+        for step in range(1, size // 2):
+            pairs.extend(((pivot + step) % last, (pivot - step) % last))
+        return pairs
+
+    @staticmethod
+    def round_count(count, cycles=1):
+        """Return the number of rounds of a round-robin
+
+        Args:
+            count (int): Number of players
+            cycles (int): 1 for a round-robin, 2 for a double one
+
+        Returns:
+            int: Number of rounds
+        """
+        return (count + count % 2 - 1) * cycles
+
+    @property
+    def rounds(self):
+        """int: Number of rounds of the schedule"""
+        return len(self.table) // (2 * self.boards)
+
+    def pairs(self, round_index):
+        """Return the pairs of a round
+
+        Args:
+            round_index (int): Index of the round
+
+        Returns:
+            list: (white, black) player numbers by board, then (player,
+            None) for the bye with an odd number of players
+        """
+        start = round_index * 2 * self.boards
+        players = self.table[start:start + 2 * self.boards]
+        pairs = []
+        bye = []
+        for board in range(0, len(players), 2):
+            white, black = players[board], players[board + 1]
+            if black == self.count:
+                bye.append((white, None))
+            elif white == self.count:
+                bye.append((black, None))
+            else:
+                pairs.append((white, black))
+        return pairs + bye
+
+
+def round_robin_schedule(pairing, count):
+    """Build the schedule of a round-robin tournament
+
+    Args:
+        pairing (str): Pairing system of the tournament
+        count (int): Number of players of the table, None before the
+        tournament starts
+
+    Returns:
+        BergerTable: The schedule, None if the tournament is not a
+        round-robin or has no table of at least two players
+    """
+    if pairing not in CYCLES or count is None or count < 2:
+        return None
+    return BergerTable(count, CYCLES[pairing])
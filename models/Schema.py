@@ -0,0 +1,255 @@
+"""Versions of the stored data and the migrations between them
+
+Version 1 is the layout written before the version was recorded. Version 2
+normalizes it: every player and tournament holds all its fields with their
+proper types, matches are [[player1_id, score1], [player2_id, score2]]
+with float scores, round times use TIME_FORMAT, and the standings, which
+are derived from the matches, are dropped to be computed again.
+Version 3 stores the tournament dates as ordinals and the round and
+creation times as Unix timestamps, see utils.Dates. Version 4 records the
+pairing system of each tournament, the weighted one for existing ones.
+Version 5 allows byes, matches whose second player is None; existing data
+is unchanged, but earlier versions must not read it. Version 6 records the
+number of players of the Berger table of each round-robin, its number of
+registered players for existing ones.
+"""
+from datetime import datetime
+from models.RoundRobin import CYCLES
+
+
+SCHEMA_VERSION = 6
+# Format of the start and end times of the rounds in version 2
+TIME_FORMAT = "%d/%m/%Y %H:%M"
+# Formats of the tournament dates and creation times up to version 2
+DATE_FORMAT = "%d/%m/%Y"
+CREATED_AT_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Formats of round times written by earlier versions
+LEGACY_TIME_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%d/%m/%Y")
+PLAYER_FIELDS = ("last_name", "first_name", "birth_date")
+TOURNAMENT_DEFAULTS = {"location": "",
+                       "start_date": "",
+                       "end_date": "",
+                       "rounds": 4,
+                       "current_round": 0,
+                       "description": "",
+                       "players": (),
+                       "status": "Non démarré",
+                       "created_at": ""}
+
+
+def _time(value):
+    """Convert a round time to TIME_FORMAT
+
+    Args:
+        value (str): Time in any format written by earlier versions
+
+    Returns:
+        str: The time as JJ/MM/AAAA HH:MM, None if there is none, or the
+        value unchanged if it is not a known format
+    """
+    if not isinstance(value, str):
+        # None, or already a timestamp when the entry was upgraded further
+        return value
+    if not value:
+        return None
+    for time_format in (TIME_FORMAT,) + LEGACY_TIME_FORMATS:
+        try:
+            return datetime.strptime(value, time_format).strftime(TIME_FORMAT)
+        except ValueError:
+            continue
+    return value
+
+
+def _match(match):
+    """Convert a match to [[player1_id, score1], [player2_id, score2]]
+
+    Args:
+        match: Match as a pair of [player_id, score], or in the
+        {"player1": ..., "player2": ...} layout of Match.to_dict
+
+    Returns:
+        list: The normalized match
+    """
+    if isinstance(match, dict):
+        match = [match["player1"], match["player2"]]
+    return [[str(player_id), float(score or 0)] for player_id, score in match]
+
+
+def _player_2(player_id, player):
+    upgraded = dict(player)
+    for field in PLAYER_FIELDS:
+        upgraded[field] = str(player.get(field) or "")
+    upgraded["national_id"] = player_id
+    return upgraded
+
+
+def _tournament_2(name, tournament):
+    upgraded = {key: value for key, value in tournament.items() if key != "standings"}
+    upgraded["name"] = name
+    for key, default in TOURNAMENT_DEFAULTS.items():
+        if upgraded.get(key) is None:
+            upgraded[key] = default
+    upgraded["rounds"] = int(upgraded["rounds"])
+    upgraded["current_round"] = int(upgraded["current_round"])
+    upgraded["players"] = [str(player_id) for player_id in upgraded["players"]]
+    if "archive" in upgraded:
+        # The rounds of archived tournaments are upgraded when read
+        return upgraded
+    upgraded["rounds_data"] = [
+        {"name": round_data.get("name") or f"Round {number}",
+         "start_time": _time(round_data.get("start_time")),
+         "end_time": _time(round_data.get("end_time")),
+         "matches": [_match(match) for match in round_data.get("matches", [])]}
+        for number, round_data in enumerate(upgraded.get("rounds_data") or [], 1)]
+    return upgraded
+
+
+def _ordinal(value):
+    """Convert a tournament date to an ordinal
+
+    Args:
+        value (str): Date as JJ/MM/AAAA
+
+    Returns:
+        int: Ordinal of the date, None if there is none or it is invalid
+    """
+    if not isinstance(value, str):
+        return value
+    try:
+        return datetime.strptime(value.strip(), DATE_FORMAT).toordinal()
+    except ValueError:
+        return None
+
+
+def _timestamp(value, time_format):
+    """Convert a time to a Unix timestamp
+
+    Args:
+        value (str): Time in `time_format`, local time
+        time_format (str): Format of the time
+
+    Returns:
+        int: Timestamp, None if there is no time, 0 if it cannot be read
+        (the time is lost but a round keeps being finished)
+    """
+    if not isinstance(value, str):
+        return value
+    if not value:
+        return None
+    try:
+        return int(datetime.strptime(value, time_format).timestamp())
+    except ValueError:
+        return 0
+
+
+def _player_3(player_id, player):
+    return player
+
+
+def _tournament_3(name, tournament):
+    upgraded = dict(tournament)
+    upgraded["start_date"] = _ordinal(tournament["start_date"])
+    upgraded["end_date"] = _ordinal(tournament["end_date"])
+    upgraded["created_at"] = _timestamp(tournament["created_at"], CREATED_AT_FORMAT)
+    if "archive" in upgraded:
+        return upgraded
+    upgraded["rounds_data"] = [
+        dict(round_data,
+             start_time=_timestamp(round_data.get("start_time"), TIME_FORMAT),
+             end_time=_timestamp(round_data.get("end_time"), TIME_FORMAT))
+        for round_data in tournament.get("rounds_data") or []]
+    return upgraded
+
+
+def _player_4(player_id, player):
+    return player
+
+
+def _tournament_4(name, tournament):
+    upgraded = dict(tournament)
+    upgraded["pairing"] = tournament.get("pairing") or "weighted"
+    return upgraded
+
+
+def _player_5(player_id, player):
+    return player
+
+
+def _tournament_5(name, tournament):
+    return tournament
+
+
+def _player_6(player_id, player):
+    return player
+
+
+def _tournament_6(name, tournament):
+    upgraded = dict(tournament)
+    if upgraded.get("schedule_size") is None and tournament.get("pairing") in CYCLES:
+        upgraded["schedule_size"] = len(tournament.get("players") or ())
+    else:
+        upgraded.setdefault("schedule_size", None)
+    return upgraded
+
+
+# Upgrades of a player and of a tournament to version N, keyed by N. Each
+# entry is upgraded on its own so a database can be migrated in a single
+# streaming pass, and upgrading an entry twice must be harmless since the
+# shards of a sharded database are migrated one at a time.
+MIGRATIONS = {
+    2: (_player_2, _tournament_2),
+    3: (_player_3, _tournament_3),
+    4: (_player_4, _tournament_4),
+    5: (_player_5, _tournament_5),
+    6: (_player_6, _tournament_6),
+}
+
+
+def check_version(version):
+    """Make sure stored data can be read by this version of the application
+
+    Args:
+        version (int): Schema version of the stored data
+
+    Returns:
+        int: The version
+
+    Raises:
+        ValueError: If the data was written by a newer version
+    """
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"Database schema version {version} is newer than "
+                         f"the supported version {SCHEMA_VERSION}")
+    return version
+
+
+def migrate_player(player_id, player, version):
+    """Upgrade a player to the current schema version
+
+    Args:
+        player_id (str): National ID of the player
+        player (dict): Player data at `version`
+        version (int): Schema version of the data
+
+    Returns:
+        dict: Player data at SCHEMA_VERSION
+    """
+    for target in range(version + 1, SCHEMA_VERSION + 1):
+        player = MIGRATIONS[target][0](player_id, player)
+    return player
+
+
+def migrate_tournament(name, tournament, version):
+    """Upgrade a tournament, with its rounds if present, to the current version
+
+    Args:
+        name (str): Name of the tournament
+        tournament (dict): Tournament data at `version`
+        version (int): Schema version of the data
+
+    Returns:
+        dict: Tournament data at SCHEMA_VERSION
+    """
+    for target in range(version + 1, SCHEMA_VERSION + 1):
+        tournament = MIGRATIONS[target][1](name, tournament)
+    return tournament
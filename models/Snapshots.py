@@ -0,0 +1,198 @@
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from models.Schema import (SCHEMA_VERSION, check_version, migrate_player,
+                           migrate_tournament)
+from utils.FileUtils import atomic_write
+
+
+class SnapshotStore:
+    """Point-in-time copies of the database sharing unchanged content
+
+    The database is cut into chunks: one per tournament, without its
+    standings which are derived from the matches, and one per group of
+    players whose IDs start with the same two letters. Each chunk is stored
+    once under `objects`, named by the hash of its content, and a snapshot
+    is a small manifest listing the hashes of its chunks. A new snapshot
+    therefore only adds the chunks that changed since the previous ones.
+
+    Archived tournaments are kept as their summary, their archive being
+    left in place. Chunks are upgraded to the current schema version when
+    a snapshot is restored.
+    """
+
+    def __init__(self, directory="data/snapshots", keep=20):
+        """Initialize the snapshot store
+
+        Args:
+            directory (str): Directory holding the manifests and the chunks
+            keep (int): Number of snapshots kept, older ones are deleted;
+            0 disables snapshots
+        """
+        self.directory = Path(directory)
+        self.object_dir = self.directory / "objects"
+        self.keep = keep
+
+    def _object_path(self, digest):
+        """Return the path of a chunk
+
+        Args:
+            digest (str): Hash of the chunk
+
+        Returns:
+            Path: Path of the chunk file
+        """
+        return self.object_dir / digest[:2] / f"{digest}.json"
+
+    def _put(self, value):
+        """Store a chunk unless an identical one is already stored
+
+        Args:
+            value: JSON-serializable content of the chunk
+
+        Returns:
+            str: Hash of the chunk
+        """
+        content = json.dumps(value, sort_keys=True, separators=(",", ":"),
+                             ensure_ascii=False).encode("utf-8")
+        digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+        path = self._object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write(path, content)
+        return digest
+
+    def _get(self, digest):
+        """Read a chunk
+
+        Args:
+            digest (str): Hash of the chunk
+
+        Returns:
+            The content of the chunk
+        """
+        with open(self._object_path(digest),
+                  "r",
+                  encoding="utf-8") as file:
+            return json.load(file)
+
+    def take(self, data_manager, label):
+        """Take a snapshot of the database, then apply the retention policy
+
+        Args:
+            data_manager: DataManager or SqliteDataManager
+            label (str): Reason of the snapshot, shown when listing them
+
+        Returns:
+            str: ID of the snapshot, None if snapshots are disabled
+        """
+        if self.keep <= 0:
+            return None
+        players = data_manager.get_players()
+        groups = {}
+        for player_id, player in players.items():
+            groups.setdefault(player_id[:2], {})[player_id] = player
+        tournaments = {}
+        for name, summary in data_manager.get_tournament_summaries().items():
+            if "archive" not in summary:
+                # Read without loading the rounds in the data manager
+                summary = {key: value for key, value
+                           in data_manager.read_tournament_data(name).items()
+                           if key != "standings"}
+            tournaments[name] = self._put(summary)
+        now = datetime.now()
+        manifest = {"id": now.strftime("%Y%m%d-%H%M%S-%f"),
+                    "schema_version": SCHEMA_VERSION,
+                    "label": label,
+                    "created_at": now.strftime("%Y-%m-%d %H:%M:%S"),
+                    "players": {prefix: self._put(group)
+                                for prefix, group in groups.items()},
+                    "player_count": len(players),
+                    "tournaments": tournaments}
+        atomic_write(self.directory / f"{manifest['id']}.json",
+                     json.dumps(manifest, ensure_ascii=False).encode("utf-8"))
+        self.prune()
+        return manifest["id"]
+
+    def _manifests(self):
+        """Read the manifests of every snapshot
+
+        Returns:
+            list: Manifests, oldest first
+        """
+        manifests = []
+        for path in sorted(self.directory.glob("*.json")):
+            with open(path,
+                      "r",
+                      encoding="utf-8") as file:
+                manifests.append(json.load(file))
+        return manifests
+
+    def list_snapshots(self):
+        """List the snapshots
+
+        Returns:
+            list: Dicts with id, label, created_at, players and tournaments
+            (number of each), oldest first
+        """
+        return [{"id": manifest["id"],
+                 "label": manifest["label"],
+                 "created_at": manifest["created_at"],
+                 "players": manifest["player_count"],
+                 "tournaments": len(manifest["tournaments"])}
+                for manifest in self._manifests()]
+
+    def restore(self, data_manager, snapshot_id):
+        """Replace the database with the content of a snapshot
+
+        A snapshot of the current database is taken first, so a restore
+        can itself be undone.
+
+        Args:
+            data_manager: DataManager or SqliteDataManager
+            snapshot_id (str): ID of the snapshot
+
+        Raises:
+            ValueError: If the snapshot does not exist
+        """
+        path = self.directory / f"{snapshot_id}.json"
+        if not path.exists():
+            raise ValueError(f"Sauvegarde {snapshot_id} introuvable")
+        with open(path,
+                  "r",
+                  encoding="utf-8") as file:
+            manifest = json.load(file)
+        version = check_version(manifest.get("schema_version", 1))
+        data = {"players": {}, "tournaments": {}}
+        for digest in manifest["players"].values():
+            data["players"].update(
+                (player_id, migrate_player(player_id, player, version))
+                for player_id, player in self._get(digest).items())
+        for name, digest in manifest["tournaments"].items():
+            data["tournaments"][name] = migrate_tournament(name, self._get(digest),
+                                                           version)
+        self.take(data_manager, f"Avant restauration de {snapshot_id}")
+        data_manager.save_data(data)
+        data_manager.flush()
+
+    def prune(self):
+        """Delete the snapshots beyond `keep` and the chunks they alone used
+
+        Returns:
+            int: Number of deleted snapshots
+        """
+        manifests = self._manifests()
+        expired = manifests[:-self.keep] if self.keep > 0 else manifests
+        if not expired:
+            return 0
+        for manifest in expired:
+            (self.directory / f"{manifest['id']}.json").unlink()
+        used = {digest
+                for manifest in manifests[len(expired):]
+                for section in ("players", "tournaments")
+                for digest in manifest[section].values()}
+        for path in self.object_dir.glob("*/*.json"):
+            if path.stem not in used:
+                path.unlink()
+        return len(expired)
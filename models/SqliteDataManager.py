@@ -0,0 +1,753 @@
+import sqlite3
+from pathlib import Path
+from models.DataManager import DataManager
+from models.Match import Match
+from models.Player import Player
+from models.Round import Round
+from models.Schema import (SCHEMA_VERSION, check_version, migrate_player,
+                           migrate_tournament)
+from models.Standings import Standings
+from models.Tournament import Tournament
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    national_id TEXT PRIMARY KEY,
+    last_name TEXT NOT NULL,
+    first_name TEXT NOT NULL,
+    birth_date TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tournaments (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    location TEXT,
+    start_date INTEGER,
+    end_date INTEGER,
+    rounds INTEGER,
+    current_round INTEGER DEFAULT 0,
+    description TEXT,
+    status TEXT DEFAULT 'Non démarré',
+    created_at INTEGER,
+    pairing TEXT DEFAULT 'weighted',
+    schedule_size INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_tournaments_start_date ON tournaments(start_date);
+CREATE TABLE IF NOT EXISTS tournament_players (
+    tournament_id INTEGER NOT NULL REFERENCES tournaments(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    national_id TEXT NOT NULL,
+    PRIMARY KEY (tournament_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_tournament_players_national_id
+    ON tournament_players(national_id);
+CREATE TABLE IF NOT EXISTS rounds (
+    id INTEGER PRIMARY KEY,
+    tournament_id INTEGER NOT NULL REFERENCES tournaments(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT,
+    start_time INTEGER,
+    end_time INTEGER,
+    UNIQUE (tournament_id, position)
+);
+CREATE TABLE IF NOT EXISTS matches (
+    round_id INTEGER NOT NULL REFERENCES rounds(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    player1_id TEXT NOT NULL,
+    score1 REAL DEFAULT 0,
+    player2_id TEXT,
+    score2 REAL DEFAULT 0,
+    PRIMARY KEY (round_id, position)
+);
+"""
+
+TOURNAMENT_FIELDS = ("name", "location", "start_date", "end_date", "rounds",
+                     "current_round", "description", "status", "created_at", "pairing",
+                     "schedule_size")
+
+
+class SqliteDataManager:
+    """SQLite implementation of the DataManager interface
+
+    Players, tournaments, registrations, rounds and matches live in their
+    own tables, so each query only reads the rows it needs. Every mutation
+    is committed in its own transaction.
+    """
+
+    def __init__(self, filepath="data/database.sqlite3",
+                 import_from="data/database.json"):
+        """Open (and create if needed) the SQLite database
+
+        Args:
+            filepath (str): Path to the SQLite database file
+            import_from (str): JSON database imported once when the SQLite
+            database is created, None to start empty
+        """
+        self.filepath = Path(filepath)
+        self.filepath.parent.mkdir(parents=True,
+                                   exist_ok=True)
+        self.stats = {"logical_saves": 0,
+                      "physical_writes": 0,
+                      "merged_saves": 0}
+        self._players = {}
+        self._tournaments = {}
+        created = not self.filepath.exists()
+        self.connection = sqlite3.connect(self.filepath)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+        if created:
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            if import_from and Path(import_from).exists():
+                self.migrate_from_json(import_from)
+        else:
+            self._migrate()
+
+    def _migrate(self):
+        """Upgrade the database to the current schema version
+
+        The schema version is kept in the user_version pragma, 0 for
+        databases created before it was recorded. Column types may change
+        between versions, so the tables are created again and refilled
+        with the upgraded data. SQLite rolls back schema changes with the
+        rest of a transaction, so the whole upgrade runs in one: an error
+        or a crash leaves the database as it was.
+
+        Raises:
+            ValueError: If the database was written by a newer version
+        """
+        version = check_version(
+            self.connection.execute("PRAGMA user_version").fetchone()[0])
+        if version == SCHEMA_VERSION:
+            return
+        # Upgrades are idempotent, so version 0 is upgraded as version 1
+        version = max(version, 1)
+        with self.connection:
+            self.connection.execute("BEGIN")
+            # Columns added since then are read as NULL and filled by the upgrade
+            columns = {row[1] for row in
+                       self.connection.execute("PRAGMA table_info(tournaments)")}
+            for field in TOURNAMENT_FIELDS:
+                if field not in columns:
+                    self.connection.execute(
+                        f"ALTER TABLE tournaments ADD COLUMN {field}")
+            data = self.load_data()
+            data = {"players": {player_id: migrate_player(player_id, player, version)
+                                for player_id, player in data["players"].items()},
+                    "tournaments": {name: migrate_tournament(name, tournament, version)
+                                    for name, tournament
+                                    in data["tournaments"].items()}}
+            for table in ("matches", "rounds", "tournament_players", "tournaments",
+                          "players"):
+                self.connection.execute(f"DROP TABLE {table}")
+            for statement in SCHEMA.split(";"):
+                if statement.strip():
+                    self.connection.execute(statement)
+            self._insert_data(data)
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._players.clear()
+        self._tournaments.clear()
+
+    def migrate_from_json(self, json_path):
+        """Import a JSON database, including its journal, into the SQLite tables
+
+        Args:
+            json_path (str): Path to the JSON database file
+        """
+        self.save_data(DataManager(json_path).load_data())
+
+    def _write(self, statements):
+        """Run write statements in a single transaction
+
+        Args:
+            statements (list): (sql, parameters) pairs
+        """
+        with self.connection:
+            for sql, parameters in statements:
+                self.connection.execute(sql, parameters)
+        self.stats["logical_saves"] += 1
+        self.stats["physical_writes"] += 1
+
+    def _tournament_id(self, name):
+        """Return the row id of a tournament
+
+        Args:
+            name (str): Name of the tournament
+
+        Returns:
+            int: Row id, or None if the tournament does not exist
+        """
+        row = self.connection.execute(
+            "SELECT id FROM tournaments WHERE name = ?", (name,)).fetchone()
+        return row["id"] if row else None
+
+    def _round_id(self, name, round_index):
+        """Return the row id of a round
+
+        Args:
+            name (str): Name of the tournament
+            round_index (int): Index of the round in the tournament
+
+        Returns:
+            int: Row id, or None if the round does not exist
+        """
+        row = self.connection.execute(
+            "SELECT rounds.id FROM rounds "
+            "JOIN tournaments ON tournaments.id = rounds.tournament_id "
+            "WHERE tournaments.name = ? AND rounds.position = ?",
+            (name, round_index)).fetchone()
+        return row["id"] if row else None
+
+    def load_data(self):
+        """Load all data in the same layout as the JSON database
+
+        Returns:
+            dict: Dictionary containing all application data
+        """
+        return {"players": self.get_players(),
+                "tournaments": self.get_tournaments()}
+
+    def save_data(self, data):
+        """Replace the whole database content
+
+        Args:
+            data (dict): Data in the JSON database layout
+        """
+        with self.connection:
+            self.connection.execute("DELETE FROM tournaments")
+            self.connection.execute("DELETE FROM players")
+            self._insert_data(data)
+        self._players.clear()
+        self._tournaments.clear()
+        self.stats["logical_saves"] += 1
+        self.stats["physical_writes"] += 1
+
+    def _insert_data(self, data):
+        """Insert all players and tournaments, must run inside a transaction
+
+        Args:
+            data (dict): Data in the JSON database layout
+        """
+        self.connection.executemany(
+            "INSERT INTO players VALUES (?, ?, ?, ?)",
+            [(player_id, player.get("last_name", ""),
+              player.get("first_name", ""), player.get("birth_date", ""))
+             for player_id, player in data.get("players", {}).items()])
+        for name, tournament in data.get("tournaments", {}).items():
+            self._insert_tournament(dict(tournament, name=name))
+
+    def _insert_tournament(self, tournament):
+        """Insert a tournament with its players, rounds and matches
+
+        Must be called inside a transaction.
+
+        Args:
+            tournament (dict): Tournament data in the JSON layout
+        """
+        cursor = self.connection.execute(
+            f"INSERT INTO tournaments ({', '.join(TOURNAMENT_FIELDS)}) "
+            f"VALUES ({', '.join('?' * len(TOURNAMENT_FIELDS))})",
+            [tournament.get(field) for field in TOURNAMENT_FIELDS])
+        tournament_id = cursor.lastrowid
+        self._insert_players(tournament_id, tournament.get("players", []))
+        for position, round_data in enumerate(tournament.get("rounds_data", [])):
+            self._insert_round(tournament_id, position, round_data)
+
+    def _insert_players(self, tournament_id, player_ids):
+        """Register players in a tournament, must run inside a transaction
+
+        Args:
+            tournament_id (int): Row id of the tournament
+            player_ids (list): National IDs of the players
+        """
+        self.connection.executemany(
+            "INSERT INTO tournament_players VALUES (?, ?, ?)",
+            [(tournament_id, position, player_id)
+             for position, player_id in enumerate(player_ids)])
+
+    def _insert_round(self, tournament_id, position, round_data):
+        """Insert a round and its matches, must run inside a transaction
+
+        Args:
+            tournament_id (int): Row id of the tournament
+            position (int): Index of the round in the tournament
+            round_data (dict): Round data in the JSON layout
+        """
+        cursor = self.connection.execute(
+            "INSERT INTO rounds (tournament_id, position, name, start_time, end_time) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (tournament_id, position, round_data.get("name"),
+             round_data.get("start_time"), round_data.get("end_time")))
+        self.connection.executemany(
+            "INSERT INTO matches VALUES (?, ?, ?, ?, ?, ?)",
+            [(cursor.lastrowid, index, match[0][0], match[0][1],
+              match[1][0], match[1][1])
+             for index, match in enumerate(round_data.get("matches", []))])
+
+    def flush(self):
+        """Nothing to do: every mutation is committed immediately"""
+
+    @property
+    def unsaved_changes(self):
+        """Number of saves not written to disk yet
+
+        Returns:
+            int: Always 0, every mutation is committed immediately
+        """
+        return 0
+
+    def get_players(self):
+        """Get all players
+
+        Returns:
+            dict: Dictionary of player data, keyed by national ID
+        """
+        rows = self.connection.execute("SELECT * FROM players")
+        return {row["national_id"]: dict(row) for row in rows}
+
+    def get_tournaments(self):
+        """Get all tournaments with their rounds
+
+        Returns:
+            dict: Dictionary of tournament data, keyed by name
+        """
+        tournaments = self.get_tournament_summaries()
+        for name, tournament in tournaments.items():
+            tournament["rounds_data"] = self.get_tournament_rounds(name)
+        return tournaments
+
+    def get_tournament_data(self, name):
+        """Get the data of a single tournament with its rounds
+
+        Args:
+            name (str): Name of the tournament
+
+        Returns:
+            dict: Tournament data, or an empty dict if not found
+        """
+        tournament = self.get_tournament_summary(name)
+        if tournament:
+            tournament["rounds_data"] = self.get_tournament_rounds(name)
+        return tournament
+
+    def read_tournament_data(self, name):
+        """Get the data of a tournament, see get_tournament_data
+
+        Rows are read on each call and never kept, so this is the same as
+        get_tournament_data.
+
+        Args:
+            name (str): Name of the tournament
+
+        Returns:
+            dict: Tournament data, or an empty dict if not found
+        """
+        return self.get_tournament_data(name)
+
+    def iter_players(self):
+        """Iterate over the players one row at a time
+
+        Yields:
+            tuple: (national_id, player data)
+        """
+        for row in self.connection.execute("SELECT * FROM players"):
+            yield row["national_id"], dict(row)
+
+    def iter_tournaments(self):
+        """Iterate over the tournaments, with their rounds, one at a time
+
+        Yields:
+            tuple: (name, tournament data)
+        """
+        names = [row["name"] for row in
+                 self.connection.execute("SELECT name FROM tournaments")]
+        for name in names:
+            yield name, self.get_tournament_data(name)
+
+    def find_tournament(self, name):
+        """Get a single tournament, with its rounds
+
+        Args:
+            name (str): Name of the tournament
+
+        Returns:
+            dict: Tournament data, or an empty dict if not found
+        """
+        return self.get_tournament_data(name)
+
+    def _summaries(self, where="", parameters=(), order=""):
+        """Get tournaments without their rounds
+
+        Args:
+            where (str): WHERE clause selecting the tournaments, empty for all
+            parameters (tuple): Parameters of the WHERE clause
+            order (str): ORDER BY clause of the tournaments
+
+        Returns:
+            dict: Tournament data without rounds_data, keyed by name, in
+            the order of the query
+        """
+        tournaments = {}
+        rows = self.connection.execute(
+            f"SELECT id, {', '.join(TOURNAMENT_FIELDS)} FROM tournaments "
+            f"{where} {order}",
+            parameters)
+        for row in rows:
+            tournament = dict(row)
+            tournament["players"] = []
+            tournaments[tournament.pop("id")] = tournament
+        rows = self.connection.execute(
+            f"SELECT tournament_id, national_id FROM tournament_players "
+            f"JOIN tournaments ON tournaments.id = tournament_players.tournament_id "
+            f"{where} ORDER BY tournament_id, position", parameters)
+        for row in rows:
+            tournaments[row["tournament_id"]]["players"].append(row["national_id"])
+        return {tournament["name"]: tournament for tournament in tournaments.values()}
+
+    def get_tournament_summaries(self):
+        """Get every tournament without its rounds
+
+        Returns:
+            dict: Tournament data without rounds_data, keyed by name
+        """
+        return self._summaries()
+
+    def get_tournaments_between(self, start=None, end=None):
+        """Get the tournaments starting within a range of dates, by start date
+
+        The range is read from the index on the start dates.
+
+        Args:
+            start (int): First start date as an ordinal, None for no limit
+            end (int): Last start date as an ordinal, None for no limit
+
+        Returns:
+            dict: Tournament data without rounds_data, keyed by name and
+            ordered by start date, tournaments without a start date being
+            left out
+        """
+        return self._summaries("WHERE start_date BETWEEN ? AND ?",
+                               (-1 if start is None else start,
+                                2 ** 62 if end is None else end),
+                               "ORDER BY start_date, id")
+
+    def get_tournament_summary(self, name):
+        """Get the data of a single tournament without its rounds
+
+        Args:
+            name (str): Name of the tournament
+
+        Returns:
+            dict: Tournament data without rounds_data, or an empty dict
+        """
+        row = self.connection.execute(
+            f"SELECT id, {', '.join(TOURNAMENT_FIELDS)} FROM tournaments "
+            f"WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return {}
+        tournament = dict(row)
+        rows = self.connection.execute(
+            "SELECT national_id FROM tournament_players "
+            "WHERE tournament_id = ? ORDER BY position", (tournament.pop("id"),))
+        tournament["players"] = [row["national_id"] for row in rows]
+        return tournament
+
+    def get_tournament_players(self, name):
+        """Get the players registered in a tournament
+
+        Args:
+            name (str): Name of the tournament
+
+        Returns:
+            dict: Player data of the tournament, keyed by national ID
+        """
+        rows = self.connection.execute(
+            "SELECT players.* FROM tournament_players "
+            "JOIN tournaments ON tournaments.id = tournament_players.tournament_id "
+            "JOIN players ON players.national_id = tournament_players.national_id "
+            "WHERE tournaments.name = ? ORDER BY tournament_players.position",
+            (name,))
+        return {row["national_id"]: dict(row) for row in rows}
+
+    def get_tournament_rounds(self, name):
+        """Get the rounds and matches of a tournament
+
+        Args:
+            name (str): Name of the tournament
+
+        Returns:
+            list: Rounds data of the tournament
+        """
+        rounds = {}
+        rows = self.connection.execute(
+            "SELECT rounds.id, rounds.name, rounds.start_time, rounds.end_time "
+            "FROM rounds JOIN tournaments ON tournaments.id = rounds.tournament_id "
+            "WHERE tournaments.name = ? ORDER BY rounds.position", (name,))
+        for row in rows:
+            rounds[row["id"]] = {"name": row["name"],
+                                 "start_time": row["start_time"],
+                                 "end_time": row["end_time"],
+                                 "matches": []}
+        if rounds:
+            rows = self.connection.execute(
+                f"SELECT * FROM matches WHERE round_id IN "
+                f"({', '.join('?' * len(rounds))}) ORDER BY round_id, position",
+                list(rounds))
+            for row in rows:
+                rounds[row["round_id"]]["matches"].append(
+                    [[row["player1_id"], row["score1"]],
+                     [row["player2_id"], row["score2"]]])
+        return list(rounds.values())
+
+    def get_tournament_standings(self, name):
+        """Get the standings of a tournament
+
+        The results are aggregated by SQLite from the indexed match rows,
+        which stay consistent with the matches by construction. Byes, whose
+        second player is NULL, only count for their points.
+
+        Args:
+            name (str): Name of the tournament
+
+        Returns:
+            dict: Standings entries (points, played, wins, draws, losses)
+            keyed by player ID, in registration order
+        """
+        rows = self.connection.execute(
+            "SELECT player_id, SUM(score) AS points, COUNT(opponent) AS played, "
+            "SUM(opponent IS NOT NULL AND score > other) AS wins, "
+            "SUM(opponent IS NOT NULL AND score = other) AS draws, "
+            "SUM(opponent IS NOT NULL AND score < other) AS losses FROM ("
+            "SELECT round_id, player1_id AS player_id, score1 AS score, "
+            "player2_id AS opponent, score2 AS other FROM matches UNION ALL "
+            "SELECT round_id, player2_id, score2, player1_id, score1 FROM matches "
+            "WHERE player2_id IS NOT NULL) AS results "
+            "JOIN rounds ON rounds.id = results.round_id "
+            "JOIN tournaments ON tournaments.id = rounds.tournament_id "
+            "WHERE tournaments.name = ? AND (score != 0 OR other != 0) "
+            "GROUP BY player_id", (name,))
+        standings = {row["player_id"]: {field: row[field]
+                                        for field in Standings.FIELDS}
+                     for row in rows}
+        for entry in standings.values():
+            entry["points"] = float(entry["points"])
+        return Standings.complete(standings,
+                                  self.get_tournament_summary(name).get("players", []))
+
+    def verify_standings(self, name, repair=False):
+        """Recompute the standings of a tournament and report any drift
+
+        Args:
+            name (str): Name of the tournament
+            repair (bool): Unused, standings are never stored separately
+
+        Returns:
+            dict: {player_id: {field: (stored, expected)}}, empty when the
+            standings are correct
+        """
+        expected = Standings.compute(self.get_tournament_data(name))
+        return Standings.drift(self.get_tournament_standings(name), expected)
+
+    def archive_tournaments(self, names=None):
+        """Archive finished tournaments, which SQLite does not need
+
+        Rows are only read when queried, so finished tournaments cost
+        nothing when the other data is loaded and stay in their tables.
+
+        Args:
+            names (list): Unused
+
+        Returns:
+            dict: Always empty, nothing is archived
+        """
+        return {}
+
+    def save_tournament(self, tournament):
+        """Save a tournament, replacing any tournament with the same name
+
+        Args:
+            tournament: Tournament object to save
+        """
+        with self.connection:
+            self.connection.execute("DELETE FROM tournaments WHERE name = ?",
+                                    (tournament.name,))
+            self._insert_tournament(tournament.to_dict())
+        self.stats["logical_saves"] += 1
+        self.stats["physical_writes"] += 1
+        self._tournaments[tournament.name] = tournament
+
+    def update_tournament(self, name, **fields):
+        """Update some fields of a stored tournament
+
+        Args:
+            name (str): Name of the tournament
+            **fields: Fields to overwrite (status, players, end_date...)
+        """
+        tournament_id = self._tournament_id(name)
+        statements = [(f"UPDATE tournaments SET {field} = ? WHERE id = ?",
+                       (value, tournament_id))
+                      for field, value in fields.items()
+                      if field in TOURNAMENT_FIELDS]
+        if "players" in fields:
+            statements.append(("DELETE FROM tournament_players "
+                               "WHERE tournament_id = ?", (tournament_id,)))
+            statements.extend(("INSERT INTO tournament_players VALUES (?, ?, ?)",
+                               (tournament_id, position, player_id))
+                              for position, player_id in enumerate(fields["players"]))
+        self._write(statements)
+        loaded = self._tournaments.get(name)
+        if loaded is not None:
+            # Updated in place, so that the opponent index is not rebuilt
+            loaded.update(fields, self._load_players(fields.get("players", [])))
+
+    def add_round(self, name, round_data):
+        """Append a new round to a tournament and make it the current round
+
+        Args:
+            name (str): Name of the tournament
+            round_data (dict): Round data with name, times and matches
+        """
+        tournament_id = self._tournament_id(name)
+        with self.connection:
+            position = self.connection.execute(
+                "SELECT COUNT(*) FROM rounds WHERE tournament_id = ?",
+                (tournament_id,)).fetchone()[0]
+            self._insert_round(tournament_id, position, round_data)
+            self.connection.execute(
+                "UPDATE tournaments SET current_round = ? WHERE id = ?",
+                (position + 1, tournament_id))
+        self.stats["logical_saves"] += 1
+        self.stats["physical_writes"] += 1
+        loaded = self._tournaments.get(name)
+        if loaded is not None:
+            # Loaded objects are kept in step rather than rebuilt
+            loaded.add_round(position, Round.from_dict(round_data, loaded.player_index))
+
+    def end_round(self, name, round_index, end_time):
+        """Record the end time of a round
+
+        Args:
+            name (str): Name of the tournament
+            round_index (int): Index of the round in the tournament
+            end_time (str): End time of the round
+        """
+        self._write([("UPDATE rounds SET end_time = ? WHERE id = ?",
+                      (end_time, self._round_id(name, round_index)))])
+        loaded = self._tournaments.get(name)
+        if loaded is not None:
+            loaded.rounds_data[round_index].end_time = end_time
+
+    def set_match(self, name, round_index, match_index, match):
+        """Replace a match, typically to record its scores
+
+        Args:
+            name (str): Name of the tournament
+            round_index (int): Index of the round in the tournament
+            match_index (int): Index of the match in the round
+            match (list): [[player1_id, score1], [player2_id, score2]]
+        """
+        self._write([("UPDATE matches SET player1_id = ?, score1 = ?, "
+                      "player2_id = ?, score2 = ? "
+                      "WHERE round_id = ? AND position = ?",
+                      (match[0][0], match[0][1], match[1][0], match[1][1],
+                       self._round_id(name, round_index), match_index))])
+        loaded = self._tournaments.get(name)
+        if loaded is not None:
+            loaded.set_match(round_index, match_index, Match.from_dict(match))
+
+    def load_tournament(self, name):
+        """Load a tournament from the database
+
+        Args:
+            name (str): Name of the tournament to load
+
+        Returns:
+            Tournament: Tournament object if found, None otherwise
+        """
+        if name not in self._tournaments:
+            data = self.get_tournament_data(name)
+            if not data:
+                return None
+            tournament = Tournament.from_dict(data)
+            tournament.players = self._load_players(data["players"])
+            self._tournaments[name] = tournament
+        return self._tournaments[name]
+
+    def _load_players(self, player_ids):
+        """Load the players of a tournament
+
+        Args:
+            player_ids (list): National IDs of the players
+
+        Returns:
+            list: Player objects of the players found, in the same order
+        """
+        return [player for player in map(self.load_player, player_ids)
+                if player is not None]
+
+    def _refresh_players(self):
+        """Point the loaded tournaments to the current Player objects
+
+        Their rounds and opponent indexes are kept, only the players are
+        looked up again.
+        """
+        for tournament in self._tournaments.values():
+            tournament.players = self._load_players(tournament.player_ids)
+
+    def save_player(self, player):
+        """Save a player to the database
+
+        Args:
+            player: Player object to save
+        """
+        self._write([("INSERT OR REPLACE INTO players VALUES (?, ?, ?, ?)",
+                      (player.national_id, player.last_name,
+                       player.first_name, player.birth_date))])
+        self._players[player.national_id] = player
+        self._refresh_players()
+
+    def save_players(self, players):
+        """Save many players at once, in a single transaction
+
+        Args:
+            players (list): Player objects to save
+        """
+        self._write([("INSERT OR REPLACE INTO players VALUES (?, ?, ?, ?)",
+                      (player.national_id, player.last_name,
+                       player.first_name, player.birth_date))
+                     for player in players])
+        for player in players:
+            self._players[player.national_id] = player
+        self._refresh_players()
+
+    def load_player(self, national_id):
+        """Load a player from the database
+
+        Args:
+            national_id (str): National ID of the player to load
+
+        Returns:
+            Player: Player object if found, None otherwise
+        """
+        if national_id not in self._players:
+            row = self.connection.execute(
+                "SELECT * FROM players WHERE national_id = ?",
+                (national_id,)).fetchone()
+            if row is None:
+                return None
+            self._players[national_id] = Player.from_dict(dict(row))
+        return self._players[national_id]
+
+    def delete_player(self, national_id):
+        """Delete a player from the database
+
+        Args:
+            national_id (str): National ID of the player to delete
+        Returns:
+            bool: True if player was deleted, False if not found
+        """
+        with self.connection:
+            cursor = self.connection.execute(
+                "DELETE FROM players WHERE national_id = ?", (national_id,))
+        self._players.pop(national_id, None)
+        self._refresh_players()
+        return cursor.rowcount > 0
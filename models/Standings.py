@@ -0,0 +1,105 @@
+class Standings:
+    """Materialized tournament standings
+
+    Standings map each player ID to a dict of points, games played, wins,
+    draws and losses. They are stored with the tournament and updated
+    incrementally when a match result changes, by removing the previous
+    result and adding the new one. A match whose two scores are 0 has not
+    been played yet and does not count, and a bye (a match without second
+    player) only counts for its points.
+    """
+
+    FIELDS = ("points", "played", "wins", "draws", "losses")
+
+    @staticmethod
+    def empty_entry():
+        """Return the standings entry of a player who has not played
+
+        Returns:
+            dict: Entry with every counter at zero
+        """
+        return {"points": 0.0, "played": 0, "wins": 0, "draws": 0, "losses": 0}
+
+    @staticmethod
+    def apply_match(standings, match, sign=1):
+        """Add (or remove) the result of a match to standings in place
+
+        Args:
+            standings (dict): Standings keyed by player ID
+            match (list): [[player1_id, score1], [player2_id, score2]]
+            sign (int): 1 to add the result, -1 to remove it
+        """
+        (player1_id, score1), (player2_id, score2) = match
+        score1, score2 = float(score1), float(score2)
+        if score1 == 0 and score2 == 0:
+            return
+        if player2_id is None:
+            entry = standings.setdefault(player1_id, Standings.empty_entry())
+            entry["points"] += sign * score1
+            return
+        for player_id, score, other in ((player1_id, score1, score2),
+                                        (player2_id, score2, score1)):
+            entry = standings.setdefault(player_id, Standings.empty_entry())
+            entry["points"] += sign * score
+            entry["played"] += sign
+            if score > other:
+                entry["wins"] += sign
+            elif score < other:
+                entry["losses"] += sign
+            else:
+                entry["draws"] += sign
+
+    @staticmethod
+    def compute(tournament):
+        """Compute the standings of a tournament from all its matches
+
+        Args:
+            tournament (dict): Tournament data with players and rounds_data
+
+        Returns:
+            dict: Standings keyed by player ID
+        """
+        standings = {player_id: Standings.empty_entry()
+                     for player_id in tournament.get("players", [])}
+        for round_data in tournament.get("rounds_data", []):
+            for match in round_data["matches"]:
+                Standings.apply_match(standings, match)
+        return standings
+
+    @staticmethod
+    def complete(standings, player_ids):
+        """Return the standings of the registered players
+
+        Args:
+            standings (dict): Stored standings keyed by player ID
+            player_ids (list): Players registered in the tournament
+
+        Returns:
+            dict: Standings in registration order, players without result
+            having an empty entry
+        """
+        return {player_id: standings.get(player_id, Standings.empty_entry())
+                for player_id in player_ids}
+
+    @staticmethod
+    def drift(stored, expected):
+        """Compare stored standings with freshly computed ones
+
+        Args:
+            stored (dict): Materialized standings
+            expected (dict): Standings computed from the matches
+
+        Returns:
+            dict: {player_id: {field: (stored, expected)}} for every
+            counter that differs
+        """
+        differences = {}
+        for player_id in stored.keys() | expected.keys():
+            stored_entry = stored.get(player_id, Standings.empty_entry())
+            expected_entry = expected.get(player_id, Standings.empty_entry())
+            fields = {field: (stored_entry[field], expected_entry[field])
+                      for field in Standings.FIELDS
+                      if abs(stored_entry[field] - expected_entry[field]) > 1e-9}
+            if fields:
+                differences[player_id] = fields
+        return differences
@@ -0,0 +1,70 @@
+from models.DataManager import DataManager
+from models.Snapshots import SnapshotStore
+from models.SqliteDataManager import SqliteDataManager
+
+
+class StorageFactory:
+    """Creates the data manager matching the configured storage backend"""
+
+    @staticmethod
+    def flush_options(settings):
+        """Translate the flush policy into DataManager arguments
+
+        Args:
+            settings (dict): Application settings, see utils.Settings
+
+        Returns:
+            dict: commit_window and flush_every arguments
+
+        Raises:
+            ValueError: If the flush policy is unknown
+        """
+        policy = settings["flush_policy"]
+        if policy == "immediate":
+            return {"commit_window": 0, "flush_every": None}
+        if policy == "interval":
+            return {"commit_window": settings["flush_interval_ms"] / 1000,
+                    "flush_every": None}
+        if policy == "mutations":
+            return {"commit_window": None,
+                    "flush_every": settings["flush_mutations"]}
+        if policy == "manual":
+            return {"commit_window": None, "flush_every": None}
+        raise ValueError(f"Unknown flush policy: {policy}")
+
+    @staticmethod
+    def create(settings):
+        """Create the data manager selected by the settings
+
+        Args:
+            settings (dict): Application settings, see utils.Settings
+
+        Returns:
+            DataManager | SqliteDataManager: The configured data manager
+
+        Raises:
+            ValueError: If the storage backend is unknown
+        """
+        backend = settings["storage_backend"]
+        if backend == "json":
+            return DataManager(settings["json_path"],
+                               layout=settings["json_layout"],
+                               file_format=settings["json_format"],
+                               **StorageFactory.flush_options(settings))
+        if backend == "sqlite":
+            return SqliteDataManager(settings["sqlite_path"],
+                                     import_from=settings["json_path"])
+        raise ValueError(f"Unknown storage backend: {backend}")
+
+    @staticmethod
+    def create_snapshots(settings):
+        """Create the snapshot store selected by the settings
+
+        Args:
+            settings (dict): Application settings, see utils.Settings
+
+        Returns:
+            SnapshotStore: The configured snapshot store
+        """
+        return SnapshotStore(settings["snapshot_dir"],
+                             keep=settings["snapshot_keep"])
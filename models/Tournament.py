@@ -1,19 +1,35 @@
-from datetime import datetime
+from models.OpponentIndex import OpponentIndex
+from models.Pairing import DEFAULT_PAIRING
+from models.PlayerIndex import PlayerIndex
+from models.Round import Round
+from models.RoundRobin import round_robin_schedule
+from utils.Dates import now
+
+# Stored fields held as plain attributes, which an update overwrites as is
+PLAIN_FIELDS = ("location", "start_date", "end_date", "rounds", "current_round",
+                "description", "status", "created_at", "pairing", "schedule_size")
 
 
 class Tournament:
     """Represents a chess tournament with players, rounds, and matches"""
 
-    def __init__(self, name, location, start_date, end_date, rounds, description):
+    __slots__ = ("name", "location", "start_date", "end_date", "rounds",
+                 "description", "players", "current_round", "rounds_data",
+                 "status", "created_at", "player_index", "_opponents", "pairing",
+                 "schedule_size", "schedule")
+
+    def __init__(self, name, location, start_date, end_date, rounds, description,
+                 pairing=DEFAULT_PAIRING):
         """Initialize a new tournament
 
         Args:
             name (str): Tournament name
             location (str): Tournament location
-            start_date (str): Start date in DD/MM/YYYY format
-            end_date (str): End date in DD/MM/YYYY format
+            start_date (int): Start date as an ordinal, see utils.Dates
+            end_date (int): End date as an ordinal
             rounds (int): Number of rounds
             description (str): Tournament description
+            pairing (str): Pairing system, a key of PAIRING_SYSTEMS
         """
         self.name = name
         self.location = location
@@ -25,7 +41,21 @@ class Tournament:
         self.current_round = 0
         self.rounds_data = []
         self.status = "Non démarré"  # Add default status
-        self.created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.created_at = now()
+        # Shared by the rounds, which store players by their position
+        self.player_index = PlayerIndex()
+        # Players already met, built from rounds_data when first needed
+        self._opponents = None
+        self.pairing = pairing
+        # Players of the Berger table of a round-robin, set when it starts
+        self.schedule_size = None
+        # Berger table of a round-robin, by player position
+        self.schedule = None
+
+    @property
+    def player_ids(self):
+        """list: National IDs of the registered players"""
+        return [player.national_id for player in self.players]
 
     def add_player(self, player):
         """Add a player to the tournament if not already registered
@@ -38,9 +68,132 @@ class Tournament:
         """
         if player not in self.players:
             self.players.append(player)
+            self.player_index.intern(player.national_id)
             return True
         return False
 
+    def find_round(self, round_name):
+        """Find a round by its name
+
+        Args:
+            round_name (str): Name of the round
+
+        Returns:
+            int: Index of the round in rounds_data, None if not found
+        """
+        return next((index for index, round_data in enumerate(self.rounds_data)
+                     if round_data.name == round_name), None)
+
+    @property
+    def opponents(self):
+        """OpponentIndex: Players already met, built on first use"""
+        if self._opponents is None:
+            self._opponents = OpponentIndex(self.rounds_data)
+        return self._opponents
+
+    def add_round(self, index, round_data):
+        """Store a round at an index and record its games
+
+        The rounds from the index on are replaced, which only happens when
+        a round is written again; the opponent index is then rebuilt when
+        next needed.
+
+        Args:
+            index (int): Index of the round, normally the number of rounds
+            round_data (Round): Round sharing the tournament's player index
+        """
+        if index < len(self.rounds_data):
+            del self.rounds_data[index:]
+            self._opponents = None
+        self.rounds_data.append(round_data)
+        if self._opponents is not None:
+            self._opponents.add_round(round_data)
+        self.current_round = len(self.rounds_data)
+
+    def set_match(self, round_index, match_index, match):
+        """Replace a match of a round
+
+        Args:
+            round_index (int): Index of the round
+            match_index (int): Index of the match in the round
+            match (Match): New match
+        """
+        round_data = self.rounds_data[round_index]
+        players = (round_data.white[match_index], round_data.black[match_index])
+        round_data.set_match(match_index, match)
+        if (round_data.white[match_index], round_data.black[match_index]) != players:
+            # Only scores change in practice, other players need a rebuild
+            self._opponents = None
+
+    def update(self, fields, players=None):
+        """Overwrite stored fields in place, as update_tournament does
+
+        The rounds and the opponent index are kept, and the Berger table is
+        built again when its size or the pairing system changes. Before the
+        first round, new registrations start the player index over in
+        registration order; afterwards the index only grows, since the
+        rounds refer to its positions.
+
+        Args:
+            fields (dict): Stored fields to overwrite
+            players (list): Player objects of fields["players"], if present
+        """
+        for field in PLAIN_FIELDS:
+            if field in fields:
+                setattr(self, field, fields[field])
+        if "schedule_size" in fields or "pairing" in fields:
+            self.schedule = round_robin_schedule(self.pairing, self.schedule_size)
+        if "players" in fields:
+            self.players = players
+            if not self.rounds_data:
+                self.player_index = PlayerIndex(fields["players"])
+            else:
+                for player_id in fields["players"]:
+                    self.player_index.intern(player_id)
+
+    def compute_standings(self):
+        """Compute the standings from the match columns of the rounds
+
+        Gives the same entries as Standings.compute on the stored data,
+        with counters kept per player position instead of per national ID.
+        A bye only counts for its points.
+
+        Returns:
+            dict: Standings (points, played, wins, draws, losses) keyed by
+            player ID, for every player of the index
+        """
+        count = len(self.player_index)
+        half_points = [0] * count
+        played = [0] * count
+        wins = [0] * count
+        draws = [0] * count
+        for round_data in self.rounds_data:
+            for white, black, code in zip(round_data.white, round_data.black,
+                                          round_data.results):
+                if not code:
+                    continue
+                white_half, black_half = divmod(code, 3)
+                half_points[white] += white_half
+                if white == black:
+                    continue
+                half_points[black] += black_half
+                played[white] += 1
+                played[black] += 1
+                if white_half > black_half:
+                    wins[white] += 1
+                elif white_half < black_half:
+                    wins[black] += 1
+                else:
+                    draws[white] += 1
+                    draws[black] += 1
+        return {player_id: {"points": half_points[position] / 2,
+                            "played": played[position],
+                            "wins": wins[position],
+                            "draws": draws[position],
+                            "losses": (played[position] - wins[position]
+                                       - draws[position])}
+                for position, player_id in enumerate(self.player_index.ids)}
+
     def to_dict(self):
         """Convert tournament data to dictionary format for storage
 
@@ -55,15 +208,21 @@ class Tournament:
             "rounds": self.rounds,
             "current_round": self.current_round,
             "description": self.description,
-            "players": [player.national_id for player in self.players],
+            "players": self.player_ids,
+            "rounds_data": [round_data.to_dict() for round_data in self.rounds_data],
             "created_at": self.created_at,
-            "status": self.status  # Add status to the dictionary
+            "status": self.status,  # Add status to the dictionary
+            "pairing": self.pairing,
+            "schedule_size": self.schedule_size
         }
 
     @classmethod
     def from_dict(cls, data):
         """Create a Tournament instance from dictionary data
 
+        The players are stored as national IDs and are left empty here:
+        the data manager resolves them to Player objects.
+
         Args:
             data (dict): Dictionary containing tournament data
 
@@ -76,9 +235,16 @@ class Tournament:
             data["start_date"],
             data["end_date"],
             data["rounds"],
-            data["current_round"],
             data["description"],
-            data['status'],
+            data["pairing"],
         )
+        tournament.current_round = data["current_round"]
+        tournament.status = data["status"]
+        tournament.player_index = PlayerIndex(data["players"])
+        tournament.rounds_data = [Round.from_dict(round_data, tournament.player_index)
+                                  for round_data in data.get("rounds_data", [])]
+        tournament.schedule_size = data.get("schedule_size")
+        tournament.schedule = round_robin_schedule(tournament.pairing,
+                                                   tournament.schedule_size)
         tournament.created_at = data["created_at"]
         return tournament
@@ -0,0 +1,597 @@
+"""Benchmarks of the storage layer and the pairings on synthetic data
+
+Usage:
+    python -m utils.Benchmark formats
+    python -m utils.Benchmark stream
+    python -m utils.Benchmark concurrency [--processes 8]
+    python -m utils.Benchmark trf
+    python -m utils.Benchmark migrate
+    python -m utils.Benchmark memory
+    python -m utils.Benchmark pairing [--rounds 9]
+    python -m utils.Benchmark dutch [--rounds 9]
+    python -m utils.Benchmark opponents
+    python -m utils.Benchmark byes [--rounds 9]
+    python -m utils.Benchmark roundrobin
+"""
+import argparse
+import copy
+import multiprocessing
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from models.DataManager import DataManager
+from models.Formats import FORMATS
+from models.OpponentIndex import OpponentIndex
+from models.Pairing import BLACK, WHITE, dutch_pairs, pairing_history, swiss_pairs
+from models.RoundRobin import BergerTable
+from models.Schema import migrate_tournament
+from models.Standings import Standings
+from models.Tournament import Tournament
+from utils.Trf import import_trf, write_trf
+
+
+def synthetic_database(players=2000, tournaments=100, rounds=10, boards=50, seed=0):
+    """Build a database in the JSON layout filled with random results
+
+    The data has no schema_version, like the files of version 1.
+
+    Args:
+        players (int): Number of registered players
+        tournaments (int): Number of tournaments
+        rounds (int): Number of rounds per tournament
+        boards (int): Number of matches per round
+        seed (int): Random seed
+
+    Returns:
+        dict: Database with players * tournaments * rounds * boards matches
+    """
+    rng = random.Random(seed)
+    player_ids = [f"{chr(65 + i // 2600 % 26)}{chr(65 + i // 100000 % 26)}"
+                  f"{i % 100000:05d}" for i in range(players)]
+    data = {"players": {player_id: {"last_name": f"Nom{index}",
+                                    "first_name": f"Prenom{index}",
+                                    "birth_date": "01/01/1990",
+                                    "national_id": player_id}
+                        for index, player_id in enumerate(player_ids)},
+            "tournaments": {}}
+    for index in range(tournaments):
+        entrants = rng.sample(player_ids, boards * 2)
+        rounds_data = []
+        for number in range(1, rounds + 1):
+            rng.shuffle(entrants)
+            matches = []
+            for board in range(boards):
+                score = rng.choice((0.0, 0.5, 1.0))
+                matches.append([[entrants[2 * board], score],
+                                [entrants[2 * board + 1], 1.0 - score]])
+            rounds_data.append({"name": f"Round {number}",
+                                "start_time": "01/01/2024 10:00",
+                                "end_time": "01/01/2024 14:00",
+                                "matches": matches})
+        name = f"Tournoi {index}"
+        data["tournaments"][name] = {"name": name,
+                                     "location": "Paris",
+                                     "start_date": "01/01/2024",
+                                     "end_date": "02/01/2024",
+                                     "rounds": rounds,
+                                     "current_round": rounds,
+                                     "description": "",
+                                     "players": entrants,
+                                     "created_at": "2024-01-01 00:00:00",
+                                     "status": "Terminé",
+                                     "rounds_data": rounds_data}
+    return data
+
+
+def timed(function, *args):
+    """Run a function and measure its duration
+
+    Args:
+        function: Function to run
+        *args: Arguments passed to the function
+
+    Returns:
+        tuple: (result, duration in milliseconds)
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def bench_formats(args):
+    """Compare save time, load time and size of every database format"""
+    data = synthetic_database()
+    matches = sum(len(round_data["matches"])
+                  for tournament in data["tournaments"].values()
+                  for round_data in tournament["rounds_data"])
+    print(f"{matches} matchs, {len(data['players'])} joueurs")
+    print(f"{'format':<14}{'save ms':>10}{'load ms':>10}{'size KiB':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name in FORMATS:
+            filepath = Path(directory) / name / "database.json"
+            data_manager = DataManager(filepath, commit_window=0, file_format=name)
+            _, save_ms = timed(data_manager.save_data, data)
+            _, load_ms = timed(lambda: DataManager(filepath,
+                                                   file_format=name).load_data())
+            size = filepath.stat().st_size / 1024
+            print(f"{name:<14}{save_ms:>10.0f}{load_ms:>10.0f}{size:>10.0f}")
+
+
+def retained_memory(function, *args):
+    """Run a function and measure the memory still allocated by its result
+
+    Args:
+        function: Function to run
+        *args: Arguments passed to the function
+
+    Returns:
+        tuple: (result, allocation in MiB when it returns)
+    """
+    tracemalloc.start()
+    try:
+        result = function(*args)
+        return result, tracemalloc.get_traced_memory()[0] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+
+def peak_memory(function, *args):
+    """Run a function and measure the peak memory it allocates
+
+    Args:
+        function: Function to run
+        *args: Arguments passed to the function
+
+    Returns:
+        tuple: (result, peak allocation in MiB)
+    """
+    tracemalloc.start()
+    try:
+        result = function(*args)
+        return result, tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+
+def bench_stream(args):
+    """Compare fetching one tournament by streaming with a full load"""
+    data = synthetic_database(players=5000, tournaments=200, rounds=10, boards=100)
+    name = list(data["tournaments"])[-1]
+    with tempfile.TemporaryDirectory() as directory:
+        filepath = Path(directory) / "database.json"
+        DataManager(filepath, commit_window=0).save_data(data)
+        del data
+        size = filepath.stat().st_size / 2 ** 20
+        print(f"Base de {size:.0f} MiB, lecture du dernier tournoi")
+        tournament, stream_peak = peak_memory(
+            lambda: DataManager(filepath).find_tournament(name))
+        _, stream_ms = timed(lambda: DataManager(filepath).find_tournament(name))
+        full, load_peak = peak_memory(
+            lambda: DataManager(filepath).load_data()["tournaments"][name])
+        _, load_ms = timed(lambda: DataManager(filepath).load_data())
+        assert tournament == full
+        print(f"{'lecture':<16}{'ms':>8}{'pic MiB':>10}")
+        print(f"{'flux':<16}{stream_ms:>8.0f}{stream_peak:>10.1f}")
+        print(f"{'chargement':<16}{load_ms:>8.0f}{load_peak:>10.1f}")
+
+
+def enter_results(filepath, worker, workers, boards):
+    """Enter the results of one worker's share of the boards
+
+    Run in a separate process by `bench_concurrency`.
+
+    Args:
+        filepath (Path): Path of the shared database
+        worker (int): Index of this worker
+        workers (int): Number of workers
+        boards (int): Number of matches in the round
+
+    Returns:
+        dict: Statistics of the worker's data manager
+    """
+    rng = random.Random(worker)
+    data_manager = DataManager(filepath, compact_every=50, commit_window=0)
+    matches = data_manager.get_tournament_rounds("Tournoi 0")[0]["matches"]
+    for board in range(worker, boards, workers):
+        (player1_id, _), (player2_id, _) = matches[board]
+        score = rng.choice((0.0, 0.5, 1.0))
+        data_manager.set_match("Tournoi 0", 0, board,
+                               [[player1_id, score], [player2_id, 1.0 - score]])
+    return data_manager.stats
+
+
+def bench_concurrency(args):
+    """Enter results from several processes at once and check none is lost"""
+    data = synthetic_database(players=1000, tournaments=1, rounds=1, boards=500)
+    round_data = data["tournaments"]["Tournoi 0"]["rounds_data"][0]
+    for match in round_data["matches"]:
+        match[0][1] = match[1][1] = 0.0
+    with tempfile.TemporaryDirectory() as directory:
+        filepath = Path(directory) / "database.json"
+        DataManager(filepath, commit_window=0).save_data(data)
+        with multiprocessing.Pool(args.processes) as pool:
+            start = time.perf_counter()
+            stats = pool.starmap(enter_results,
+                                 [(filepath, worker, args.processes, 500)
+                                  for worker in range(args.processes)])
+            elapsed = time.perf_counter() - start
+        data_manager = DataManager(filepath)
+        matches = data_manager.get_tournament_rounds("Tournoi 0")[0]["matches"]
+        lost = sum(1 for match in matches if match[0][1] + match[1][1] != 1.0)
+        drift = data_manager.verify_standings("Tournoi 0")
+    print(f"{args.processes} processus, 500 résultats en {elapsed:.1f} s")
+    print(f"écritures : {sum(s['physical_writes'] for s in stats)}, "
+          f"réappliquées : {sum(s['rebased_saves'] for s in stats)}")
+    print(f"résultats perdus : {lost}, classements incorrects : {len(drift)}")
+    if lost or drift:
+        raise SystemExit(1)
+
+
+def bench_trf(args):
+    """Export a 500-player, 11-round tournament to TRF and import it back"""
+    data = synthetic_database(players=500, tournaments=1, rounds=11, boards=250)
+    tournament = migrate_tournament("Tournoi 0", data["tournaments"]["Tournoi 0"], 1)
+    with tempfile.TemporaryDirectory() as directory:
+        trf_path = Path(directory) / "tournoi.trf"
+        with open(trf_path, "w", encoding="utf-8") as file:
+            _, export_peak = peak_memory(write_trf, file, tournament, data["players"])
+        with open(trf_path, "w", encoding="utf-8") as file:
+            _, export_ms = timed(write_trf, file, tournament, data["players"])
+        # Players already known keep their IDs, so the rounds can be compared
+        data_manager = DataManager(Path(directory) / "database.json", commit_window=0)
+        data_manager.save_data({"players": data["players"], "tournaments": {}})
+        with open(trf_path, "r", encoding="utf-8") as file:
+            _, import_ms = timed(import_trf, data_manager, file)
+        imported = data_manager.get_tournament_data("Tournoi 0")
+        size = trf_path.stat().st_size / 1024
+    # TRF lists results by player, so the board order is not kept
+    assert ([sorted(round_data["matches"]) for round_data in imported["rounds_data"]]
+            == [sorted(round_data["matches"])
+                for round_data in tournament["rounds_data"]])
+    print(f"500 joueurs, 11 rondes, fichier TRF de {size:.0f} KiB")
+    print(f"export : {export_ms:.0f} ms, pic {export_peak:.2f} MiB")
+    print(f"import : {import_ms:.0f} ms")
+
+
+def bench_migrate(args):
+    """Upgrade a version 1 database in a streaming pass and compare with a load"""
+    data = synthetic_database(players=5000, tournaments=200, rounds=10, boards=100)
+    with tempfile.TemporaryDirectory() as directory:
+        filepath = Path(directory) / "database.json"
+        original = FORMATS["json"].encode(data)
+        del data
+        size = len(original) / 2 ** 20
+        filepath.write_bytes(original)
+        _, migrate_ms = timed(DataManager, filepath)
+        filepath.write_bytes(original)
+        del original
+        data_manager, migrate_peak = peak_memory(DataManager, filepath)
+        assert data_manager.get_tournament_summary("Tournoi 0")["current_round"] == 10
+        _, load_peak = peak_memory(lambda: DataManager(filepath).load_data())
+    print(f"Base de {size:.0f} MiB en version 1")
+    print(f"migration : {migrate_ms:.0f} ms, pic {migrate_peak:.1f} MiB")
+    print(f"chargement complet : pic {load_peak:.1f} MiB")
+
+
+def bench_memory(args):
+    """Compare 100 000 matches held as nested dicts and as model objects
+
+    The objects store each round as array columns of player positions and
+    result codes.
+    """
+    data = synthetic_database(players=1000, tournaments=20, rounds=10, boards=500)
+    tournaments = [migrate_tournament(name, tournament, 1)
+                   for name, tournament in data["tournaments"].items()]
+    # Strings and floats are shared by both copies, so only the containers
+    # of each representation are measured
+    dicts, dicts_mib = retained_memory(copy.deepcopy, tournaments)
+    objects, objects_mib = retained_memory(
+        lambda: [Tournament.from_dict(tournament) for tournament in tournaments])
+    _, objects_ms = timed(
+        lambda: [Tournament.from_dict(tournament) for tournament in tournaments])
+    matches = sum(len(round_data.results)
+                  for tournament in objects for round_data in tournament.rounds_data)
+    assert ([tournament.to_dict()["rounds_data"] for tournament in objects]
+            == [tournament["rounds_data"] for tournament in dicts])
+    expected, dict_standings_ms = timed(
+        lambda: [Standings.compute(tournament) for tournament in dicts])
+    computed, column_standings_ms = timed(
+        lambda: [tournament.compute_standings() for tournament in objects])
+    assert computed == expected
+    # The opponent index is only built when a round is paired
+    _, index_mib = retained_memory(
+        lambda: [tournament.opponents for tournament in objects])
+    print(f"{matches} matchs")
+    print(f"dictionnaires : {dicts_mib:.1f} MiB, "
+          f"classements en {dict_standings_ms:.0f} ms")
+    print(f"objets : {objects_mib:.1f} MiB, construits en {objects_ms:.0f} ms, "
+          f"classements en {column_standings_ms:.0f} ms")
+    print(f"index des adversaires : {index_mib:.1f} MiB")
+
+
+class SimulatedRound:
+    """Round columns, as read by pairing_history and OpponentIndex"""
+
+    __slots__ = ("white", "black", "results")
+
+    def __init__(self, white, black, results):
+        self.white = white
+        self.black = black
+        self.results = results
+
+    def pairs(self):
+        return zip(self.white, self.black)
+
+
+def simulate_round(rng, ratings, pairs):
+    """Play a round between players of known ratings
+
+    Args:
+        rng (Random): Random generator
+        ratings (list): Rating of each player position, None for players
+        of equal strength
+        pairs (list): (white, black) position pairs, (player, None) for a bye
+
+    Returns:
+        SimulatedRound: The round with its results, a bye stored as a win
+        against oneself
+    """
+    pairs = [(white, white if black is None else black) for white, black in pairs]
+    results = []
+    for white, black in pairs:
+        if white == black:
+            results.append(6)
+            continue
+        if ratings is None:
+            results.append(rng.choice((2, 4, 6)))
+            continue
+        expected = 1 / (1 + 10 ** ((ratings[black] - ratings[white]) / 400))
+        draw = 0.3 * (1 - abs(2 * expected - 1))
+        roll = rng.random()
+        if roll < expected - draw / 2:
+            results.append(6)
+        elif roll < expected + draw / 2:
+            results.append(4)
+        else:
+            results.append(2)
+    return SimulatedRound([white for white, _ in pairs], [black for _, black in pairs],
+                          results)
+
+
+def bench_pairing(args):
+    """Pair Swiss tournaments of 100, 1 000 and 5 000 players with random results
+
+    Each round is paired from the ranking of the previous ones; the time of
+    the slowest round is reported with the rematches, which must stay at
+    zero, and the pairings between different score groups.
+    """
+    for count in (100, 1000, 5000):
+        rng = random.Random(count)
+        opponents = OpponentIndex()
+        rounds_data = []
+        durations = []
+        rematches = floats = 0
+        for _ in range(args.rounds):
+            half_points = pairing_history(rounds_data, count)[0]
+            ranking = sorted(range(count), key=lambda position: -half_points[position])
+            pairs, milliseconds = timed(swiss_pairs, ranking, half_points, opponents)
+            durations.append(milliseconds)
+            rematches += sum(opponents.has_played(*pair) for pair in pairs)
+            floats += sum(half_points[player1] != half_points[player2]
+                          for player1, player2 in pairs)
+            rounds_data.append(simulate_round(rng, None, pairs))
+            opponents.add_round(rounds_data[-1])
+        print(f"{count} joueurs, {args.rounds} tours : {sum(durations):.0f} ms "
+              f"(tour le plus lent {max(durations):.0f} ms), "
+              f"{rematches} revanches, {floats} appariements entre groupes")
+
+
+def bench_dutch(args):
+    """Compare the pairing systems on 300-player tournaments with rated players
+
+    Players are registered by decreasing rating and results follow the Elo
+    expectancy, with draws. The colour faults count players with three
+    more whites than blacks (or the reverse) or the same colour three times
+    in a row; the repeated floats count players floating down two rounds in
+    a row.
+    """
+    count = 300
+    for system in ("weighted", "dutch"):
+        rng = random.Random(1)
+        ratings = sorted((rng.randint(1200, 2500) for _ in range(count)), reverse=True)
+        opponents = OpponentIndex()
+        rounds_data = []
+        durations = []
+        rematches = repeated_floats = 0
+        for _ in range(args.rounds):
+            half_points, colours, floats = pairing_history(rounds_data, count)
+            ranking = sorted(range(count), key=lambda position: (-half_points[position],
+                                                                 position))
+            if system == "dutch":
+                pairs, milliseconds = timed(dutch_pairs, ranking, half_points,
+                                            opponents, colours, floats)
+            else:
+                pairs, milliseconds = timed(swiss_pairs, ranking, half_points,
+                                            opponents)
+            durations.append(milliseconds)
+            rematches += sum(opponents.has_played(*pair) for pair in pairs)
+            for white, black in pairs:
+                if half_points[white] != half_points[black]:
+                    higher = white if half_points[white] > half_points[black] else black
+                    repeated_floats += floats[higher] == 1
+            rounds_data.append(simulate_round(rng, ratings, pairs))
+            opponents.add_round(rounds_data[-1])
+        colours = pairing_history(rounds_data, count)[1]
+        faults = sum(abs(sum(played)) > 2
+                     or any(played[index] == played[index + 1] == played[index + 2]
+                            for index in range(len(played) - 2))
+                     for played in colours)
+        assert all(colour in (WHITE, BLACK)
+                   for played in colours for colour in played)
+        print(f"{system} : {count} joueurs, {args.rounds} tours "
+              f"en {sum(durations):.0f} ms "
+              f"(tour le plus lent {max(durations):.0f} ms), {rematches} revanches, "
+              f"{faults} joueurs en faute de couleurs, "
+              f"{repeated_floats} flottements répétés")
+
+
+def bench_opponents(args):
+    """Compare rescanning the rounds for previous games with the opponent index
+
+    A 5 000-player tournament of 13 rounds is paired round by round; before
+    each pairing the previous games are either collected again from every
+    round as sorted pairs, or taken from the index extended by the last
+    round. Both then answer the same rematch checks.
+    """
+    count = 5000
+    rng = random.Random(0)
+    rounds_data = []
+    for _ in range(13):
+        ranking = list(range(count))
+        rng.shuffle(ranking)
+        pairs = list(zip(ranking[::2], ranking[1::2]))
+        rounds_data.append(simulate_round(rng, None, pairs))
+    checks = [(rng.randrange(count), rng.randrange(count)) for _ in range(count)]
+    rescan_ms = index_ms = 0
+    opponents = OpponentIndex()
+    for played_rounds in range(1, len(rounds_data) + 1):
+        def rescan():
+            previous = {tuple(sorted(pair))
+                        for round_data in rounds_data[:played_rounds]
+                        for pair in round_data.pairs()}
+            return sum(tuple(sorted(pair)) in previous for pair in checks)
+
+        def extend():
+            opponents.add_round(rounds_data[played_rounds - 1])
+            return sum(opponents.has_played(*pair) for pair in checks)
+
+        expected, milliseconds = timed(rescan)
+        rescan_ms += milliseconds
+        found, milliseconds = timed(extend)
+        index_ms += milliseconds
+        assert found == expected
+    print(f"{count} joueurs, {len(rounds_data)} tours, "
+          f"{len(checks)} vérifications par tour")
+    print(f"parcours des rondes : {rescan_ms:.0f} ms")
+    print(f"index des adversaires : {index_ms:.0f} ms")
+
+
+def bench_byes(args):
+    """Pair a 301-player open with withdrawals by both systems
+
+    A player withdraws after the third round and another after the sixth,
+    so the number of players is odd, then even, then odd again.
+    Every round must be paired in one pass, with no rematch, no player
+    getting a second bye and the byes going to the lowest score group.
+    """
+    count = 301
+    for system in ("weighted", "dutch"):
+        rng = random.Random(2)
+        ratings = sorted((rng.randint(1200, 2500) for _ in range(count)), reverse=True)
+        active = list(range(count))
+        opponents = OpponentIndex()
+        rounds_data = []
+        durations = []
+        rematches = repeated_byes = misplaced_byes = 0
+        for number in range(1, args.rounds + 1):
+            if number in (4, 7):
+                active.remove(rng.choice(active))
+            half_points, colours, floats = pairing_history(rounds_data, count)
+            ranking = sorted(active,
+                             key=lambda position: (-half_points[position], position))
+            if system == "dutch":
+                pairs, milliseconds = timed(dutch_pairs, ranking, half_points,
+                                            opponents, colours, floats)
+            else:
+                pairs, milliseconds = timed(swiss_pairs, ranking, half_points,
+                                            opponents)
+            durations.append(milliseconds)
+            assert sorted(player for pair in pairs for player in pair
+                          if player is not None) == sorted(active)
+            for player1, player2 in pairs:
+                if player2 is None:
+                    repeated_byes += opponents.has_bye(player1)
+                    misplaced_byes += half_points[player1] != half_points[ranking[-1]]
+                else:
+                    rematches += opponents.has_played(player1, player2)
+            rounds_data.append(simulate_round(rng, ratings, pairs))
+            opponents.add_round(rounds_data[-1])
+        print(f"{system} : {args.rounds} tours en {sum(durations):.0f} ms "
+              f"(tour le plus lent {max(durations):.0f} ms), "
+              f"{len(opponents.byes)} exemptions, "
+              f"{repeated_byes} exemptions répétées, {misplaced_byes} hors du dernier "
+              f"groupe, {rematches} revanches")
+
+
+def bench_round_robin(args):
+    """Build the Berger tables of leagues of 10 to 301 players
+
+    Each table is computed once and its rounds are then read by index; every
+    pair of players must meet once per cycle. The colour figures are the
+    largest difference between whites and blacks of a player and the longest
+    run of the same colour.
+    """
+    for count in (10, 100, 300, 301):
+        for cycles in (1, 2):
+            table, build_ms = timed(BergerTable, count, cycles)
+            rounds, serve_ms = timed(lambda: [table.pairs(index)
+                                              for index in range(table.rounds)])
+            games = {}
+            colours = [[] for _ in range(count)]
+            for pairs in rounds:
+                for white, black in pairs:
+                    if black is None:
+                        continue
+                    key = (min(white, black), max(white, black))
+                    games[key] = games.get(key, 0) + 1
+                    colours[white].append(WHITE)
+                    colours[black].append(BLACK)
+            assert len(games) == count * (count - 1) // 2
+            assert set(games.values()) == {cycles}
+            longest = 0
+            for played in colours:
+                run = 0
+                for index, colour in enumerate(played):
+                    run = run + 1 if index and colour == played[index - 1] else 1
+                    longest = max(longest, run)
+            difference = max(abs(sum(played)) for played in colours)
+            kibibytes = table.table.itemsize * len(table.table) // 1024
+            print(f"{count} joueurs, {cycles} cycle(s) : {table.rounds} tours, "
+                  f"table en {build_ms:.1f} ms ({kibibytes} Kio), "
+                  f"toutes les rondes lues en {serve_ms:.1f} ms, écart de couleurs "
+                  f"{difference}, série de couleurs la plus longue {longest}")
+
+
+BENCHMARKS = {"formats": bench_formats,
+              "stream": bench_stream,
+              "concurrency": bench_concurrency,
+              "trf": bench_trf,
+              "migrate": bench_migrate,
+              "memory": bench_memory,
+              "pairing": bench_pairing,
+              "dutch": bench_dutch,
+              "opponents": bench_opponents,
+              "byes": bench_byes,
+              "roundrobin": bench_round_robin}
+
+
+def main(argv=None):
+    """Run a benchmark
+
+    Args:
+        argv (list): Command line arguments, defaults to sys.argv
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks du stockage")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--processes", type=int, default=8,
+                        help="nombre de processus (concurrency)")
+    parser.add_argument("--rounds", type=int, default=9,
+                        help="nombre de tours (pairing, dutch, byes)")
+    args = parser.parse_args(argv)
+    BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+"""Command line maintenance tool for the chess tournament database
+
+Usage:
+    python -m utils.DatabaseTool convert --format json-lzma [--layout sharded]
+    python -m utils.DatabaseTool export "Nom du tournoi" [-o tournoi.json]
+    python -m utils.DatabaseTool verify-standings [--repair]
+    python -m utils.DatabaseTool import-players joueurs.csv
+    python -m utils.DatabaseTool import-trf tournoi.trf
+    python -m utils.DatabaseTool export-trf "Nom du tournoi" [-o tournoi.trf]
+    python -m utils.DatabaseTool export-trf --all [-d dossier]
+    python -m utils.DatabaseTool archive ["Nom du tournoi" ...]
+    python -m utils.DatabaseTool snapshot ["Motif"]
+    python -m utils.DatabaseTool snapshots
+    python -m utils.DatabaseTool restore 20240101-100000-000000
+    python -m utils.DatabaseTool tournaments [--from 01/09/2023] [--to 31/08/2024]
+"""
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+from models.DataManager import DataManager
+from models.Formats import FORMATS
+from models.Player import Player
+from models.StorageFactory import StorageFactory
+from utils.Dates import format_date, parse_date
+from utils.PlayerImport import read_players_csv
+from utils.Settings import Settings
+from utils.Trf import import_trf, write_trf
+
+
+def convert(args, settings):
+    """Rewrite the JSON database in another format and/or layout
+
+    Args:
+        args: Parsed command line arguments
+        settings (dict): Application settings
+    """
+    layout = args.layout or settings["json_layout"]
+    file_format = args.format or settings["json_format"]
+    data_manager = DataManager(args.path or settings["json_path"],
+                               layout=layout,
+                               file_format=file_format)
+    data_manager.save_data(data_manager.load_data())
+    data_manager.flush()
+    print(f"Base convertie : format {file_format}, organisation {layout}")
+    if (file_format, layout) != (settings["json_format"], settings["json_layout"]):
+        print("Pensez à mettre à jour json_format et json_layout dans "
+              "data/settings.json, sinon la base sera reconvertie au "
+              "prochain lancement.")
+
+
+def export(args, settings):
+    """Export a single tournament, with its rounds, as JSON
+
+    The database is read incrementally, so memory use is proportional to
+    the exported tournament only.
+
+    Args:
+        args: Parsed command line arguments
+        settings (dict): Application settings
+    """
+    data_manager = DataManager(args.path or settings["json_path"],
+                               layout=settings["json_layout"],
+                               file_format=settings["json_format"])
+    tournament = data_manager.find_tournament(args.name)
+    if not tournament:
+        sys.exit(f"Tournoi {args.name} non trouvé")
+    if args.output:
+        with open(args.output,
+                  "w",
+                  encoding="utf-8") as file:
+            json.dump(tournament, file, indent=4)
+    else:
+        json.dump(tournament, sys.stdout, indent=4)
+
+
+def verify_standings(args, settings):
+    """Check the stored standings of every tournament against its matches
+
+    Args:
+        args: Parsed command line arguments
+        settings (dict): Application settings
+    """
+    data_manager = DataManager(args.path or settings["json_path"],
+                               layout=settings["json_layout"],
+                               file_format=settings["json_format"])
+    drifted = 0
+    for name in data_manager.get_tournament_summaries():
+        drift = data_manager.verify_standings(name, repair=args.repair)
+        if not drift:
+            continue
+        drifted += 1
+        print(f"{name} : classement incorrect pour {len(drift)} joueur(s)")
+        for player_id, fields in drift.items():
+            details = ", ".join(f"{field} {stored} au lieu de {expected}"
+                                for field, (stored, expected) in fields.items())
+            print(f"  {player_id} : {details}")
+    data_manager.flush()
+    if not drifted:
+        print("Tous les classements sont corrects")
+    elif args.repair:
+        print(f"{drifted} classement(s) corrigé(s)")
+    else:
+        sys.exit(1)
+
+
+def import_players(args, settings):
+    """Import players from a CSV file with a single write
+
+    Args:
+        args: Parsed command line arguments
+        settings (dict): Application settings
+    """
+    if args.path:
+        settings["json_path"] = args.path
+    data_manager = StorageFactory.create(settings)
+    with open(args.file,
+              "r",
+              encoding="utf-8-sig",
+              newline="") as file:
+        players, errors = read_players_csv(file, data_manager.get_players())
+    for line, error in errors:
+        print(f"Ligne {line} : {error}", file=sys.stderr)
+    if players:
+        StorageFactory.create_snapshots(settings).take(data_manager,
+                                                       "Import de joueurs CSV")
+        data_manager.save_players([Player.from_dict(player_data)
+                                   for player_data in players.values()])
+        data_manager.flush()
+    print(f"{len(players)} joueur(s) importé(s), {len(errors)} ligne(s) rejetée(s)")
+
+
+def import_trf_file(args, settings):
+    """Import a tournament, its players and its rounds from a TRF file
+
+    Args:
+        args: Parsed command line arguments
+        settings (dict): Application settings
+    """
+    if args.path:
+        settings["json_path"] = args.path
+    data_manager = StorageFactory.create(settings)
+    StorageFactory.create_snapshots(settings).take(data_manager, "Import TRF")
+    try:
+        with open(args.file,
+                  "r",
+                  encoding="utf-8-sig") as file:
+            name, warnings = import_trf(data_manager, file)
+    except ValueError as error:
+        sys.exit(str(error))
+    data_manager.flush()
+    for warning in warnings:
+        print(warning, file=sys.stderr)
+    print(f"Tournoi {name} importé")
+
+
+def export_trf(args, settings):
+    """Export tournaments to TRF, reading the database incrementally
+
+    Args:
+        args: Parsed command line arguments
+        settings (dict): Application settings
+    """
+    data_manager = DataManager(args.path or settings["json_path"],
+                               layout=settings["json_layout"],
+                               file_format=settings["json_format"])
+    if args.all:
+        players = dict(data_manager.iter_players())
+        directory = Path(args.directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name, tournament in data_manager.iter_tournaments():
+            filepath = directory / (re.sub(r"[^\w-]+", "_", name) + ".trf")
+            with open(filepath,
+                      "w",
+                      encoding="utf-8") as file:
+                write_trf(file, tournament, players)
+            print(f"{name} : {filepath}")
+        return
+    if not args.name:
+        sys.exit("Indiquez un tournoi ou --all")
+    tournament = data_manager.find_tournament(args.name)
+    if not tournament:
+        sys.exit(f"Tournoi {args.name} non trouvé")
+    registered = set(tournament.get("players", []))
+    players = {player_id: player
+               for player_id, player in data_manager.iter_players()
+               if player_id in registered}
+    if args.output:
+        with open(args.output,
+                  "w",
+                  encoding="utf-8") as file:
+            write_trf(file, tournament, players)
+    else:
+        write_trf(sys.stdout, tournament, players)
+
+
+def archive(args, settings):
+    """Move finished tournaments to the compressed per-season archives
+
+    Args:
+        args: Parsed command line arguments
+        settings (dict): Application settings
+    """
+    data_manager = DataManager(args.path or settings["json_path"],
+                               layout=settings["json_layout"],
+                               file_format=settings["json_format"])
+    StorageFactory.create_snapshots(settings).take(data_manager,
+                                                   "Archivage des tournois terminés")
+    seasons = data_manager.archive_tournaments(args.names or None)
+    if not seasons:
+        print("Aucun tournoi à archiver")
+    for season, names in sorted(seasons.items()):
+        print(f"{data_manager.archive_path(season)} : "
+              f"{len(names)} tournoi(s)")
+
+
+def snapshot(args, settings):
+    """Take a snapshot of the database
+
+    Args:
+        args: Parsed command line arguments
+        settings (dict): Application settings
+    """
+    if args.path:
+        settings["json_path"] = args.path
+    snapshot_id = StorageFactory.create_snapshots(settings).take(
+        StorageFactory.create(settings), args.label)
+    if snapshot_id is None:
+        sys.exit("Les sauvegardes sont désactivées (snapshot_keep vaut 0)")
+    print(f"Sauvegarde {snapshot_id}")
+
+
+def list_snapshots(args, settings):
+    """List the snapshots, oldest first
+
+    Args:
+        args: Parsed command line arguments
+        settings (dict): Application settings
+    """
+    snapshots = StorageFactory.create_snapshots(settings).list_snapshots()
+    if not snapshots:
+        print("Aucune sauvegarde")
+    for entry in snapshots:
+        print(f"{entry['id']}  {entry['created_at']}  {entry['players']:>6} joueurs "
+              f"{entry['tournaments']:>4} tournois  {entry['label']}")
+
+
+def restore(args, settings):
+    """Replace the database with a snapshot
+
+    Args:
+        args: Parsed command line arguments
+        settings (dict): Application settings
+    """
+    if args.path:
+        settings["json_path"] = args.path
+    try:
+        StorageFactory.create_snapshots(settings).restore(
+            StorageFactory.create(settings), args.snapshot)
+    except ValueError as error:
+        sys.exit(str(error))
+    print(f"Base restaurée depuis la sauvegarde {args.snapshot}")
+
+
+def list_tournaments(args, settings):
+    """List the tournaments starting within a range of dates, by start date
+
+    Args:
+        args: Parsed command line arguments
+        settings (dict): Application settings
+    """
+    if args.path:
+        settings["json_path"] = args.path
+    tournaments = StorageFactory.create(settings).get_tournaments_between(args.start,
+                                                                          args.end)
+    if not tournaments:
+        print("Aucun tournoi")
+    for name, tournament in tournaments.items():
+        print(f"{format_date(tournament['start_date'])}  "
+              f"{format_date(tournament['end_date'])}  "
+              f"{tournament['status']:<12} {name}")
+
+
+def build_parser():
+    """Build the command line parser
+
+    Returns:
+        argparse.ArgumentParser: The parser
+    """
+    parser = argparse.ArgumentParser(description="Maintenance de la base de données")
+    parser.add_argument("--path",
+                        help="chemin de la base JSON (défaut : json_path)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = commands.add_parser("convert",
+                                         help="changer le format ou l'organisation")
+    convert_parser.add_argument("--format", choices=sorted(FORMATS))
+    convert_parser.add_argument("--layout", choices=["single", "sharded"])
+    convert_parser.set_defaults(handler=convert)
+
+    export_parser = commands.add_parser("export",
+                                        help="exporter un tournoi en JSON")
+    export_parser.add_argument("name", help="nom du tournoi")
+    export_parser.add_argument("-o", "--output", help="fichier de sortie")
+    export_parser.set_defaults(handler=export)
+
+    verify_parser = commands.add_parser("verify-standings",
+                                        help="vérifier les classements enregistrés")
+    verify_parser.add_argument("--repair", action="store_true",
+                               help="corriger les classements incorrects")
+    verify_parser.set_defaults(handler=verify_standings)
+
+    import_parser = commands.add_parser("import-players",
+                                        help="importer des joueurs depuis un CSV")
+    import_parser.add_argument("file", help="fichier CSV (last_name, first_name, "
+                                            "birth_date, national_id)")
+    import_parser.set_defaults(handler=import_players)
+
+    import_trf_parser = commands.add_parser("import-trf",
+                                            help="importer un tournoi TRF")
+    import_trf_parser.add_argument("file", help="fichier TRF")
+    import_trf_parser.set_defaults(handler=import_trf_file)
+
+    export_trf_parser = commands.add_parser("export-trf",
+                                            help="exporter des tournois en TRF")
+    export_trf_parser.add_argument("name", nargs="?", help="nom du tournoi")
+    export_trf_parser.add_argument("-o", "--output", help="fichier de sortie")
+    export_trf_parser.add_argument("--all", action="store_true",
+                                   help="exporter tous les tournois")
+    export_trf_parser.add_argument("-d", "--directory", default=".",
+                                   help="dossier de sortie avec --all")
+    export_trf_parser.set_defaults(handler=export_trf)
+
+    archive_parser = commands.add_parser("archive",
+                                         help="archiver les tournois terminés")
+    archive_parser.add_argument("names", nargs="*",
+                                help="tournois à archiver (défaut : tous les "
+                                     "tournois terminés)")
+    archive_parser.set_defaults(handler=archive)
+
+    snapshot_parser = commands.add_parser("snapshot",
+                                          help="sauvegarder la base")
+    snapshot_parser.add_argument("label", nargs="?", default="Sauvegarde manuelle",
+                                 help="motif de la sauvegarde")
+    snapshot_parser.set_defaults(handler=snapshot)
+
+    snapshots_parser = commands.add_parser("snapshots",
+                                           help="lister les sauvegardes")
+    snapshots_parser.set_defaults(handler=list_snapshots)
+
+    restore_parser = commands.add_parser("restore",
+                                         help="restaurer une sauvegarde")
+    restore_parser.add_argument("snapshot", help="identifiant de la sauvegarde")
+    restore_parser.set_defaults(handler=restore)
+
+    tournaments_parser = commands.add_parser(
+        "tournaments", help="lister les tournois par date de début")
+    tournaments_parser.add_argument("--from", dest="start", type=parse_date,
+                                    help="première date de début (JJ/MM/AAAA)")
+    tournaments_parser.add_argument("--to", dest="end", type=parse_date,
+                                    help="dernière date de début (JJ/MM/AAAA)")
+    tournaments_parser.set_defaults(handler=list_tournaments)
+    return parser
+
+
+def main(argv=None):
+    """Run the tool
+
+    Args:
+        argv (list): Command line arguments, defaults to sys.argv
+    """
+    args = build_parser().parse_args(argv)
+    args.handler(args, Settings.load())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Dates and times as stored in the database
+
+Tournament dates are stored as ordinals of the proleptic Gregorian
+calendar (`date.toordinal`) and round and creation times as Unix
+timestamps in whole seconds, so they sort and compare as plain integers.
+They are only turned into text when displayed.
+"""
+import re
+from datetime import date, datetime
+
+
+DATE_FORMAT = "%d/%m/%Y"
+TIME_FORMAT = "%d/%m/%Y %H:%M"
+DATE_INPUT = re.compile(r"(\d{2})/(\d{2})/(\d{4})")
+
+
+def parse_date(text):
+    """Convert a date typed as JJ/MM/AAAA to an ordinal
+
+    Args:
+        text (str): Date as JJ/MM/AAAA, between 1900 and 2100
+
+    Returns:
+        int: Ordinal of the date
+
+    Raises:
+        ValueError: If the text is not a valid date in this format
+    """
+    match = DATE_INPUT.fullmatch(text.strip())
+    if not match or not 1900 <= int(match.group(3)) <= 2100:
+        raise ValueError(f"Date invalide : {text}")
+    day, month, year = (int(part) for part in match.groups())
+    return date(year, month, day).toordinal()
+
+
+def format_date(ordinal):
+    """Format a stored date for display
+
+    Args:
+        ordinal (int): Ordinal of the date, or None
+
+    Returns:
+        str: The date as JJ/MM/AAAA, empty if there is none
+    """
+    if ordinal is None:
+        return ""
+    return date.fromordinal(ordinal).strftime(DATE_FORMAT)
+
+
+def format_time(timestamp):
+    """Format a stored time for display, in local time
+
+    Args:
+        timestamp (int): Unix timestamp, or None
+
+    Returns:
+        str: The time as JJ/MM/AAAA HH:MM, empty if there is none
+    """
+    if timestamp is None:
+        return ""
+    return datetime.fromtimestamp(timestamp).strftime(TIME_FORMAT)
+
+
+def today():
+    """Return the ordinal of the current date
+
+    Returns:
+        int: Ordinal of today
+    """
+    return date.today().toordinal()
+
+
+def now():
+    """Return the current time as stored
+
+    Returns:
+        int: Unix timestamp in whole seconds
+    """
+    return int(datetime.now().timestamp())
+
+
+def date_of(timestamp):
+    """Return the date of a stored time
+
+    Args:
+        timestamp (int): Unix timestamp, or None
+
+    Returns:
+        int: Ordinal of its date in local time, None if there is no time
+    """
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp).date().toordinal()
+
+
+def timestamp_of(ordinal):
+    """Return the time at midnight of a stored date
+
+    Args:
+        ordinal (int): Ordinal of the date
+
+    Returns:
+        int: Unix timestamp of its midnight, in local time
+    """
+    midnight = datetime.combine(date.fromordinal(ordinal), datetime.min.time())
+    return int(midnight.timestamp())
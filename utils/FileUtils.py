@@ -0,0 +1,203 @@
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+MSVCRT_LOCK_OFFSET = 1 << 30
+
+
+def atomic_write(filepath, content):
+    """Write a file atomically so readers never see a partial file
+
+    The content is written to a temporary file in the same directory,
+    flushed to disk, then renamed over the target.
+
+    Args:
+        filepath (str): Path of the file to write
+        content (str | bytes): Content of the file
+    """
+    with atomic_open(filepath) as file:
+        file.write(content if isinstance(content, bytes)
+                   else content.encode("utf-8"))
+
+
+@contextmanager
+def atomic_open(filepath):
+    """Open a file to be replaced atomically once written, see `atomic_write`
+
+    The file only replaces the target when the block exits without error.
+
+    Args:
+        filepath (str): Path of the file to write
+
+    Yields:
+        A binary file object
+    """
+    filepath = Path(filepath)
+    fd, temp_path = tempfile.mkstemp(dir=filepath.parent,
+                                     prefix=f".{filepath.name}.",
+                                     suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        # mkstemp creates the file readable by its owner only
+        os.chmod(temp_path, _file_mode(filepath))
+        os.replace(temp_path, filepath)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    fsync_directory(filepath.parent)
+
+
+def fsync_directory(directory):
+    """Flush a directory entry to disk so a rename survives a crash
+
+    Args:
+        directory (str): Path of the directory
+    """
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _file_mode(filepath):
+    """Return the permissions a rewritten file should keep
+
+    Args:
+        filepath (Path): Path of the file being written
+
+    Returns:
+        int: Mode of the existing file, or the default mode for new files
+    """
+    if filepath.exists():
+        return filepath.stat().st_mode & 0o777
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+class FileLock:
+    """Advisory lock shared between processes through a lock file
+
+    fcntl locks are used where available; on Windows a byte past the end
+    of the file is locked with msvcrt, which has no shared mode, so shared
+    holds are exclusive there. The lock is reentrant within a process: nested
+    holds are free, but a shared hold cannot be upgraded to an exclusive
+    one. While the lock is held, the file can also store a short value
+    with `read` and `write`.
+    """
+
+    def __init__(self, filepath):
+        """Initialize the lock
+
+        Args:
+            filepath (str): Path of the lock file, created when first held
+        """
+        self.filepath = Path(filepath)
+        self._fd = None
+        self._shared = False
+        self._depth = 0
+
+    @contextmanager
+    def hold(self, shared=False):
+        """Hold the lock for the duration of a with block
+
+        Args:
+            shared (bool): Allow other processes to hold the lock shared
+            at the same time, for readers
+
+        Raises:
+            RuntimeError: If an exclusive hold is requested inside a
+            shared one
+        """
+        if self._depth:
+            if self._shared and not shared:
+                raise RuntimeError("A shared file lock cannot be upgraded")
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+            return
+        fd = os.open(self.filepath, os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            _lock_fd(fd, shared)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd, self._shared, self._depth = fd, shared, 1
+        try:
+            yield
+        finally:
+            self._fd, self._depth = None, 0
+            _unlock_fd(fd)
+            os.close(fd)
+
+    def read(self):
+        """Read the value stored in the lock file while holding it
+
+        Returns:
+            str: The stored value, empty if none
+        """
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        return os.read(self._fd, 64).decode("ascii", "replace").strip()
+
+    def write(self, value):
+        """Store a value in the lock file while holding it exclusively
+
+        Args:
+            value (str): Short ASCII value
+        """
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        os.ftruncate(self._fd, 0)
+        os.write(self._fd, value.encode("ascii"))
+        os.fsync(self._fd)
+
+
+def _lock_fd(fd, shared):
+    """Block until a lock is obtained on an open file
+
+    Args:
+        fd (int): File descriptor of the lock file
+        shared (bool): Request a shared lock where supported
+    """
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+    elif msvcrt is not None:
+        while True:
+            # Locking past the stored value leaves it writable
+            os.lseek(fd, MSVCRT_LOCK_OFFSET, os.SEEK_SET)
+            try:
+                # LK_LOCK itself retries for 10 seconds before failing
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+
+def _unlock_fd(fd):
+    """Release the lock held on an open file
+
+    Args:
+        fd (int): File descriptor of the lock file
+    """
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    elif msvcrt is not None:
+        os.lseek(fd, MSVCRT_LOCK_OFFSET, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
@@ -0,0 +1,405 @@
+"""Maximum weight matching in general graphs
+
+Edmonds' blossom algorithm in its primal-dual form (Galil, "Efficient
+algorithms for finding maximum matching in graphs", 1986), following the
+structure of the well-known reference implementation by J. van Rantwijk.
+It runs in O(n^3) time for n vertices; with integer weights every dual
+variable stays an integer, so no floating point error can creep in.
+
+Vertices are numbered 0..n-1 and edges given as (i, j, weight) tuples.
+Endpoints of edge k are numbered 2k and 2k+1 so that `p ^ 1` is the other
+end of the edge of endpoint p.
+"""
+
+
+def max_weight_matching(edges, max_cardinality=False):
+    """Compute a maximum weight matching
+
+    Edges whose weight equals the maximum weight are tight for the initial
+    dual solution, so they are matched greedily, in the given order, before
+    the first stage. This leaves few stages to run when most of the optimum
+    is made of such edges, as with Swiss pairings inside score groups.
+
+    Args:
+        edges (list): (i, j, weight) tuples with integer weights, i != j,
+        at most one edge per pair of vertices
+        max_cardinality (bool): Only consider matchings of maximum size,
+        then of maximum weight among them
+
+    Returns:
+        list: mate[v], the vertex matched with v, or -1 if v is single
+    """
+    if not edges:
+        return []
+    edge_count = len(edges)
+    vertex_count = 1 + max(max(i, j) for i, j, _ in edges)
+    max_weight = max(0, max(weight for _, _, weight in edges))
+    endpoint = [vertex for i, j, _ in edges for vertex in (i, j)]
+    # Remote endpoints of the edges of each vertex
+    neighbour_ends = [[] for _ in range(vertex_count)]
+    for k, (i, j, _) in enumerate(edges):
+        neighbour_ends[i].append(2 * k + 1)
+        neighbour_ends[j].append(2 * k)
+    # Remote endpoint of the matched edge of each vertex, -1 if single
+    mate = [-1] * vertex_count
+    # Labels of top-level blossoms: 0 free, 1 S (outer), 2 T (inner)
+    label = [0] * (2 * vertex_count)
+    # Endpoint through which a labeled blossom got its label
+    label_end = [-1] * (2 * vertex_count)
+    in_blossom = list(range(vertex_count))
+    blossom_parent = [-1] * (2 * vertex_count)
+    blossom_children = [None] * (2 * vertex_count)
+    blossom_base = list(range(vertex_count)) + [-1] * vertex_count
+    blossom_endpoints = [None] * (2 * vertex_count)
+    # Least-slack edge to a different S-blossom, or to an S-vertex
+    best_edge = [-1] * (2 * vertex_count)
+    blossom_best_edges = [None] * (2 * vertex_count)
+    unused_blossoms = list(range(vertex_count, 2 * vertex_count))
+    dual = [max_weight] * vertex_count + [0] * vertex_count
+    allowed = [False] * edge_count
+    queue = []
+
+    def slack(k):
+        i, j, weight = edges[k]
+        return dual[i] + dual[j] - 2 * weight
+
+    def leaves(b):
+        if b < vertex_count:
+            return [b]
+        result = []
+        stack = [b]
+        while stack:
+            t = stack.pop()
+            if t < vertex_count:
+                result.append(t)
+            else:
+                stack.extend(blossom_children[t])
+        return result
+
+    def assign_label(w, t, p):
+        b = in_blossom[w]
+        label[w] = label[b] = t
+        label_end[w] = label_end[b] = p
+        best_edge[w] = best_edge[b] = -1
+        if t == 1:
+            queue.extend(leaves(b))
+        else:
+            base = blossom_base[b]
+            assign_label(endpoint[mate[base]], 1, mate[base] ^ 1)
+
+    def scan_blossom(v, w):
+        # Trace back from v and w to find a new blossom or an augmenting path
+        path = []
+        base = -1
+        while v != -1 or w != -1:
+            b = in_blossom[v]
+            if label[b] & 4:
+                base = blossom_base[b]
+                break
+            path.append(b)
+            label[b] = 5
+            if label_end[b] == -1:
+                v = -1
+            else:
+                v = endpoint[label_end[b]]
+                b = in_blossom[v]
+                v = endpoint[label_end[b]]
+            if w != -1:
+                v, w = w, v
+        for b in path:
+            label[b] = 1
+        return base
+
+    def add_blossom(base, k):
+        v, w, _ = edges[k]
+        base_blossom = in_blossom[base]
+        bv = in_blossom[v]
+        bw = in_blossom[w]
+        b = unused_blossoms.pop()
+        blossom_base[b] = base
+        blossom_parent[b] = -1
+        blossom_parent[base_blossom] = b
+        blossom_children[b] = path = []
+        blossom_endpoints[b] = ends = []
+        while bv != base_blossom:
+            blossom_parent[bv] = b
+            path.append(bv)
+            ends.append(label_end[bv])
+            v = endpoint[label_end[bv]]
+            bv = in_blossom[v]
+        path.append(base_blossom)
+        path.reverse()
+        ends.reverse()
+        ends.append(2 * k)
+        while bw != base_blossom:
+            blossom_parent[bw] = b
+            path.append(bw)
+            ends.append(label_end[bw] ^ 1)
+            w = endpoint[label_end[bw]]
+            bw = in_blossom[w]
+        label[b] = 1
+        label_end[b] = label_end[base_blossom]
+        dual[b] = 0
+        for v in leaves(b):
+            if label[in_blossom[v]] == 2:
+                # T-vertices become S-vertices and must be scanned
+                queue.append(v)
+            in_blossom[v] = b
+        best_to = {}
+        for child in path:
+            if blossom_best_edges[child] is None:
+                edge_lists = [[p // 2 for p in neighbour_ends[v]]
+                              for v in leaves(child)]
+            else:
+                edge_lists = [blossom_best_edges[child]]
+            for edge_list in edge_lists:
+                for k in edge_list:
+                    i, j, _ = edges[k]
+                    if in_blossom[j] == b:
+                        i, j = j, i
+                    bj = in_blossom[j]
+                    if (bj != b and label[bj] == 1
+                            and (bj not in best_to or slack(k) < slack(best_to[bj]))):
+                        best_to[bj] = k
+            blossom_best_edges[child] = None
+            best_edge[child] = -1
+        blossom_best_edges[b] = list(best_to.values())
+        best_edge[b] = -1
+        for k in blossom_best_edges[b]:
+            if best_edge[b] == -1 or slack(k) < slack(best_edge[b]):
+                best_edge[b] = k
+
+    def expand_blossom(top, end_stage):
+        # Sub-blossoms expanded along with it at the end of a stage are kept
+        # on a stack, blossoms can be nested deeper than the recursion limit
+        stack = [top]
+        while stack:
+            b = stack.pop()
+            for child in blossom_children[b]:
+                blossom_parent[child] = -1
+                if child < vertex_count:
+                    in_blossom[child] = child
+                elif end_stage and dual[child] == 0:
+                    stack.append(child)
+                else:
+                    for v in leaves(child):
+                        in_blossom[v] = child
+            if not end_stage and label[b] == 2:
+                # Relabel the children on the path through the expanded T-blossom
+                entry_child = in_blossom[endpoint[label_end[b] ^ 1]]
+                j = blossom_children[b].index(entry_child)
+                if j & 1:
+                    j -= len(blossom_children[b])
+                    step = 1
+                    trick = 0
+                else:
+                    step = -1
+                    trick = 1
+                p = label_end[b]
+                while j != 0:
+                    label[endpoint[p ^ 1]] = 0
+                    label[endpoint[blossom_endpoints[b][j - trick] ^ trick ^ 1]] = 0
+                    assign_label(endpoint[p ^ 1], 2, p)
+                    allowed[blossom_endpoints[b][j - trick] // 2] = True
+                    j += step
+                    p = blossom_endpoints[b][j - trick] ^ trick
+                    allowed[p // 2] = True
+                    j += step
+                child = blossom_children[b][j]
+                label[endpoint[p ^ 1]] = label[child] = 2
+                label_end[endpoint[p ^ 1]] = label_end[child] = p
+                best_edge[child] = -1
+                j += step
+                while blossom_children[b][j] != entry_child:
+                    child = blossom_children[b][j]
+                    if label[child] == 1:
+                        j += step
+                        continue
+                    labeled = next((v for v in leaves(child) if label[v] != 0), None)
+                    if labeled is not None:
+                        label[labeled] = 0
+                        label[endpoint[mate[blossom_base[child]]]] = 0
+                        assign_label(labeled, 2, label_end[labeled])
+                    j += step
+            label[b] = label_end[b] = -1
+            blossom_children[b] = blossom_endpoints[b] = None
+            blossom_base[b] = -1
+            blossom_best_edges[b] = None
+            best_edge[b] = -1
+            unused_blossoms.append(b)
+
+    def augment_blossom(top, base):
+        # Swap matched and unmatched edges inside a blossom so that base
+        # becomes its base. The sub-blossoms to update in turn do not depend
+        # on each other, so they are kept on a stack rather than recursed into
+        stack = [(top, base)]
+        while stack:
+            b, v = stack.pop()
+            t = v
+            while blossom_parent[t] != b:
+                t = blossom_parent[t]
+            if t >= vertex_count:
+                stack.append((t, v))
+            i = j = blossom_children[b].index(t)
+            if i & 1:
+                j -= len(blossom_children[b])
+                step = 1
+                trick = 0
+            else:
+                step = -1
+                trick = 1
+            while j != 0:
+                j += step
+                t = blossom_children[b][j]
+                p = blossom_endpoints[b][j - trick] ^ trick
+                if t >= vertex_count:
+                    stack.append((t, endpoint[p]))
+                j += step
+                t = blossom_children[b][j]
+                if t >= vertex_count:
+                    stack.append((t, endpoint[p ^ 1]))
+                mate[endpoint[p]] = p ^ 1
+                mate[endpoint[p ^ 1]] = p
+            blossom_children[b] = blossom_children[b][i:] + blossom_children[b][:i]
+            blossom_endpoints[b] = blossom_endpoints[b][i:] + blossom_endpoints[b][:i]
+            blossom_base[b] = v
+
+    def augment_matching(k):
+        v, w, _ = edges[k]
+        for s, p in ((v, 2 * k + 1), (w, 2 * k)):
+            while True:
+                bs = in_blossom[s]
+                if bs >= vertex_count:
+                    augment_blossom(bs, s)
+                mate[s] = p
+                if label_end[bs] == -1:
+                    break
+                t = endpoint[label_end[bs]]
+                bt = in_blossom[t]
+                s = endpoint[label_end[bt]]
+                j = endpoint[label_end[bt] ^ 1]
+                if bt >= vertex_count:
+                    augment_blossom(bt, j)
+                mate[j] = label_end[bt]
+                p = label_end[bt] ^ 1
+
+    for k, (i, j, weight) in enumerate(edges):
+        if weight == max_weight and mate[i] == -1 and mate[j] == -1:
+            mate[i] = 2 * k + 1
+            mate[j] = 2 * k
+
+    while True:
+        # Each stage grows alternating trees from the single vertices until
+        # an augmenting path is found, or no further improvement is possible
+        label[:] = [0] * (2 * vertex_count)
+        best_edge[:] = [-1] * (2 * vertex_count)
+        blossom_best_edges[vertex_count:] = [None] * vertex_count
+        allowed[:] = [False] * edge_count
+        queue[:] = []
+        for v in range(vertex_count):
+            if mate[v] == -1 and label[in_blossom[v]] == 0:
+                assign_label(v, 1, -1)
+        augmented = False
+        while True:
+            while queue and not augmented:
+                v = queue.pop()
+                for p in neighbour_ends[v]:
+                    k = p // 2
+                    w = endpoint[p]
+                    if in_blossom[v] == in_blossom[w]:
+                        continue
+                    if not allowed[k]:
+                        k_slack = slack(k)
+                        if k_slack <= 0:
+                            allowed[k] = True
+                    if allowed[k]:
+                        if label[in_blossom[w]] == 0:
+                            assign_label(w, 2, p ^ 1)
+                        elif label[in_blossom[w]] == 1:
+                            base = scan_blossom(v, w)
+                            if base >= 0:
+                                add_blossom(base, k)
+                            else:
+                                augment_matching(k)
+                                augmented = True
+                                break
+                        elif label[w] == 0:
+                            label[w] = 2
+                            label_end[w] = p ^ 1
+                    elif label[in_blossom[w]] == 1:
+                        b = in_blossom[v]
+                        if best_edge[b] == -1 or k_slack < slack(best_edge[b]):
+                            best_edge[b] = k
+                    elif label[w] == 0:
+                        if best_edge[w] == -1 or k_slack < slack(best_edge[w]):
+                            best_edge[w] = k
+            if augmented:
+                break
+
+            # No augmenting path with the tight edges: update the duals
+            delta_type = -1
+            delta = delta_edge = delta_blossom = None
+            if not max_cardinality:
+                delta_type = 1
+                delta = min(dual[:vertex_count])
+            for v in range(vertex_count):
+                if label[in_blossom[v]] == 0 and best_edge[v] != -1:
+                    d = slack(best_edge[v])
+                    if delta_type == -1 or d < delta:
+                        delta = d
+                        delta_type = 2
+                        delta_edge = best_edge[v]
+            for b in range(2 * vertex_count):
+                if blossom_parent[b] == -1 and label[b] == 1 and best_edge[b] != -1:
+                    # Slacks between S-vertices are even with integer weights
+                    d = slack(best_edge[b]) // 2
+                    if delta_type == -1 or d < delta:
+                        delta = d
+                        delta_type = 3
+                        delta_edge = best_edge[b]
+            for b in range(vertex_count, 2 * vertex_count):
+                if (blossom_base[b] >= 0 and blossom_parent[b] == -1 and label[b] == 2
+                        and (delta_type == -1 or dual[b] < delta)):
+                    delta = dual[b]
+                    delta_type = 4
+                    delta_blossom = b
+            if delta_type == -1:
+                # Maximum cardinality reached: finish with the optimum duals
+                delta_type = 1
+                delta = max(0, min(dual[:vertex_count]))
+
+            for v in range(vertex_count):
+                if label[in_blossom[v]] == 1:
+                    dual[v] -= delta
+                elif label[in_blossom[v]] == 2:
+                    dual[v] += delta
+            for b in range(vertex_count, 2 * vertex_count):
+                if blossom_base[b] >= 0 and blossom_parent[b] == -1:
+                    if label[b] == 1:
+                        dual[b] += delta
+                    elif label[b] == 2:
+                        dual[b] -= delta
+
+            if delta_type == 1:
+                break
+            elif delta_type == 2:
+                allowed[delta_edge] = True
+                i, j, _ = edges[delta_edge]
+                if label[in_blossom[i]] == 0:
+                    i, j = j, i
+                queue.append(i)
+            elif delta_type == 3:
+                allowed[delta_edge] = True
+                i, j, _ = edges[delta_edge]
+                queue.append(i)
+            else:
+                expand_blossom(delta_blossom, False)
+        if not augmented:
+            break
+        # Expand the S-blossoms whose dual variable dropped to zero
+        for b in range(vertex_count, 2 * vertex_count):
+            if (blossom_parent[b] == -1 and blossom_base[b] >= 0
+                    and label[b] == 1 and dual[b] == 0):
+                expand_blossom(b, True)
+
+    return [endpoint[p] if p >= 0 else -1 for p in mate]
@@ -0,0 +1,71 @@
+import csv
+import re
+
+
+NATIONAL_ID = re.compile(r"[^\W\d_]{2}\d{5}")
+BIRTH_DATE = re.compile(r"(\d{2})/(\d{2})/(\d{4})")
+FIELDS = ("last_name", "first_name", "birth_date", "national_id")
+
+
+def validate_player(player_data):
+    """Check the fields of a player, except the uniqueness of its ID
+
+    Args:
+        player_data (dict): Player information with last_name, first_name,
+        birth_date and national_id
+
+    Returns:
+        str: Error message, None if the player is valid
+    """
+    if not all(player_data.get(field) for field in FIELDS):
+        return "Tous les champs sont obligatoires."
+    if not NATIONAL_ID.fullmatch(player_data["national_id"]):
+        return "L'ID national doit contenir 2 lettres suivies de 5 chiffres"
+    date = BIRTH_DATE.fullmatch(player_data["birth_date"])
+    if not (date
+            and 1 <= int(date.group(1)) <= 31
+            and 1 <= int(date.group(2)) <= 12
+            and 1900 <= int(date.group(3)) <= 2100):
+        return "Format de date invalide. Utilisez JJ/MM/AAAA"
+    return None
+
+
+def read_players_csv(file, existing_ids=()):
+    """Read and validate players from a CSV file in a single pass
+
+    The first line holds the column names last_name, first_name,
+    birth_date and national_id; the delimiter (comma, semicolon or tab)
+    is detected. Rows are read one at a time.
+
+    Args:
+        file: Text file object opened with newline=""
+        existing_ids: National IDs already in the database
+
+    Returns:
+        tuple: (valid players keyed by national ID,
+        list of (line number, error message) for the rejected rows)
+    """
+    sample = file.read(4096)
+    file.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.DictReader(file, dialect=dialect)
+    missing = [field for field in FIELDS if field not in (reader.fieldnames or ())]
+    if missing:
+        return {}, [(1, f"Colonnes manquantes : {', '.join(missing)}")]
+    players = {}
+    errors = []
+    for row in reader:
+        player_data = {field: (row[field] or "").strip() for field in FIELDS}
+        error = validate_player(player_data)
+        national_id = player_data["national_id"]
+        if error is None and (national_id in existing_ids
+                              or national_id in players):
+            error = f"Un joueur avec l'ID {national_id} existe déjà."
+        if error is None:
+            players[national_id] = player_data
+        else:
+            errors.append((reader.line_num, error))
+    return players, errors
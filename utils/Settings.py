@@ -0,0 +1,56 @@
+import json
+import os
+from pathlib import Path
+
+
+class Settings:
+    """Application settings
+
+    Values come from the defaults below, overridden by the optional
+    data/settings.json file, then by CHESS_<NAME> environment variables
+    (for instance CHESS_STORAGE_BACKEND=sqlite).
+    """
+
+    DEFAULTS = {
+        # "json" or "sqlite"
+        "storage_backend": "json",
+        "json_path": "data/database.json",
+        # "single" file or "sharded" with one file per tournament
+        "json_layout": "single",
+        # "json", "json-compact", "json-gzip", "json-lzma" or "binary"
+        "json_format": "json",
+        "sqlite_path": "data/database.sqlite3",
+        # When saves are written: "immediate", "interval" (grouped over
+        # flush_interval_ms), "mutations" (every flush_mutations saves) or
+        # "manual" (on view switch and on exit only)
+        "flush_policy": "interval",
+        "flush_interval_ms": 5,
+        "flush_mutations": 20,
+        # Snapshots taken before risky operations, the snapshot_keep most
+        # recent are kept (0 disables them)
+        "snapshot_dir": "data/snapshots",
+        "snapshot_keep": 20,
+    }
+
+    @classmethod
+    def load(cls, filepath="data/settings.json"):
+        """Load the application settings
+
+        Args:
+            filepath (str): Path to the optional JSON settings file
+
+        Returns:
+            dict: Settings merged over the defaults
+        """
+        settings = dict(cls.DEFAULTS)
+        filepath = Path(filepath)
+        if filepath.exists():
+            with open(filepath,
+                      "r",
+                      encoding="utf-8") as file:
+                settings.update(json.load(file))
+        for key, default in cls.DEFAULTS.items():
+            value = os.environ.get(f"CHESS_{key.upper()}")
+            if value is not None:
+                settings[key] = type(default)(value)
+        return settings
@@ -74,3 +74,9 @@ class StyleConfig:
                         foreground='white',
                         font=('Helvetica', 12, 'bold')
                         )
+
+        style.configure('Status.TLabel',
+                        background='#2C3E50',
+                        foreground='#BDC3C7',
+                        font=('Helvetica', 10)
+                        )
@@ -0,0 +1,355 @@
+"""Import and export of tournaments in the FIDE TRF format (TRF16)
+
+A TRF file is a text file with one record per line, identified by its
+first three characters: 012 for the tournament name, 022 for the city,
+042 and 052 for the dates, 132 for the round dates and 001 for each
+player with the results of every round, in fixed columns.
+"""
+import re
+from datetime import date
+from models.Match import BYE_SCORE
+from models.Player import Player
+from models.PlayerIndex import PlayerIndex
+from models.Round import Round
+from models.RoundRobin import CYCLES
+from models.Standings import Standings
+from models.Tournament import Tournament
+from utils.Dates import date_of, timestamp_of
+
+
+# Results of the player on the line, for played and forfeited games
+RESULTS = {"1": 1.0, "=": 0.5, "0": 0.0, "+": 1.0, "-": 0.0,
+           "W": 1.0, "D": 0.5, "L": 0.0}
+# Pairing-allocated bye, recorded as a bye match
+PAIRING_BYE = "U"
+# Other byes and absences, which have no match in this application
+BYES = "HFZ"
+DATE = re.compile(r"(\d{2,4})[/.\-](\d{1,2})[/.\-](\d{2,4})")
+ROUND_START = 91
+ROUND_WIDTH = 10
+
+
+def _date(text, century="20"):
+    """Convert a TRF date to the JJ/MM/AAAA format
+
+    Args:
+        text (str): Date as YYYY/MM/DD, YY/MM/DD or DD.MM.YYYY
+        century (str): Century of two-digit years
+
+    Returns:
+        str: The date as JJ/MM/AAAA, or the text unchanged if not a date
+    """
+    match = DATE.search(text)
+    if not match:
+        return text.strip()
+    first, month, last = match.groups()
+    if len(last) == 4:
+        day, year = first, last
+    else:
+        year, day = first, last
+    if len(year) == 2:
+        year = century + year
+    return f"{int(day):02d}/{int(month):02d}/{year}"
+
+
+def _ordinal(text):
+    """Convert a TRF date to an ordinal
+
+    Args:
+        text (str): Date as YYYY/MM/DD, YY/MM/DD or DD.MM.YYYY
+
+    Returns:
+        int: Ordinal of the date, None if it is not a date
+    """
+    match = DATE.fullmatch(_date(text))
+    if not match:
+        return None
+    day, month, year = (int(part) for part in match.groups())
+    try:
+        return date(year, month, day).toordinal()
+    except ValueError:
+        return None
+
+
+def _trf_day(ordinal):
+    """Convert a stored date to the TRF YYYY/MM/DD format
+
+    Args:
+        ordinal (int): Ordinal of the date, or None
+
+    Returns:
+        str: The date as YYYY/MM/DD, empty if there is none
+    """
+    if ordinal is None:
+        return ""
+    return date.fromordinal(ordinal).strftime("%Y/%m/%d")
+
+
+def _trf_date(date):
+    """Convert a JJ/MM/AAAA date to the TRF YYYY/MM/DD format
+
+    Args:
+        date (str): Date as JJ/MM/AAAA
+
+    Returns:
+        str: The date as YYYY/MM/DD, empty if it is not a date
+    """
+    parts = date.split(" ")[0].split("/")
+    if len(parts) != 3:
+        return ""
+    day, month, year = parts
+    return f"{year}/{month}/{day}"
+
+
+def read_trf(file):
+    """Parse a TRF file in a single pass
+
+    Args:
+        file: Text file object
+
+    Returns:
+        dict: "tournament" (name, location, dates, rounds), "round_dates",
+        "players" as dicts with start_rank, last_name, first_name,
+        birth_date and results, a list of (opponent rank, color, result)
+        per round
+    """
+    tournament = {"name": "", "location": "", "start_date": None, "end_date": None,
+                  "rounds": 0}
+    round_dates = []
+    players = []
+    for line in file:
+        line = line.rstrip("\r\n")
+        code = line[:3]
+        value = line[4:].strip()
+        if code == "012":
+            tournament["name"] = value
+        elif code == "022":
+            tournament["location"] = value
+        elif code == "042":
+            tournament["start_date"] = _ordinal(value)
+        elif code == "052":
+            tournament["end_date"] = _ordinal(value)
+        elif code == "XXR":
+            tournament["rounds"] = int(value or 0)
+        elif code == "132":
+            round_dates = [_ordinal(line[start:start + 8])
+                           for start in range(ROUND_START, len(line), ROUND_WIDTH)]
+        elif code == "001":
+            last_name, _, first_name = line[14:47].partition(",")
+            birth = line[69:79].strip()
+            if len(birth) == 4 and birth.isdigit():
+                birth = f"{birth}/01/01"
+            results = []
+            for start in range(ROUND_START, len(line), ROUND_WIDTH):
+                cell = line[start:start + 8].ljust(8)
+                opponent = cell[:4].strip()
+                results.append((int(opponent) if opponent.isdigit() else 0,
+                                cell[5].lower(), cell[7].upper()))
+            players.append({"start_rank": int(line[4:8]),
+                            "last_name": last_name.strip(),
+                            "first_name": first_name.strip(),
+                            "birth_date": _date(birth, century="19"),
+                            "results": results})
+    tournament["rounds"] = max([tournament["rounds"]]
+                               + [len(player["results"]) for player in players])
+    return {"tournament": tournament, "round_dates": round_dates,
+            "players": players}
+
+
+def _rounds_data(parsed, ids):
+    """Build the rounds of a parsed TRF tournament
+
+    Each game is built from the first of its two lines that records it,
+    so a game left blank on one side is still imported.
+
+    Args:
+        parsed (dict): Result of `read_trf`
+        ids (dict): National ID of each player, keyed by starting rank
+
+    Returns:
+        tuple: (rounds_data, number of byes and absences left out)
+    """
+    by_rank = {player["start_rank"]: player for player in parsed["players"]}
+    rounds_data = []
+    byes = 0
+    for index in range(parsed["tournament"]["rounds"]):
+        matches = []
+        paired = set()
+        complete = True
+        for player in parsed["players"]:
+            rank = player["start_rank"]
+            if index >= len(player["results"]):
+                continue
+            opponent, color, result = player["results"][index]
+            if opponent == 0 or opponent not in by_rank:
+                if result == PAIRING_BYE:
+                    matches.append([[ids[rank], BYE_SCORE], [None, 0.0]])
+                byes += result in BYES
+                continue
+            if (min(rank, opponent), max(rank, opponent)) in paired:
+                continue
+            paired.add((min(rank, opponent), max(rank, opponent)))
+            other_results = by_rank[opponent]["results"]
+            other = (other_results[index][2] if index < len(other_results)
+                     and other_results[index][0] == rank else "")
+            complete &= result in RESULTS
+            score = RESULTS.get(result, 0.0)
+            other_score = RESULTS.get(other, 1.0 - score if result in RESULTS else 0.0)
+            pair = [[ids[rank], score], [ids[opponent], other_score]]
+            matches.append(pair if color != "b" else pair[::-1])
+        if not matches:
+            break
+        dates = parsed["round_dates"]
+        day = (dates[index] if index < len(dates) and dates[index] is not None
+               else parsed["tournament"]["start_date"])
+        time = timestamp_of(day) if day is not None else None
+        rounds_data.append({"name": f"Round {index + 1}",
+                            "start_time": time,
+                            "end_time": time if complete else None,
+                            "matches": matches})
+    return rounds_data, byes
+
+
+def import_trf(data_manager, file):
+    """Create a tournament, its players and its rounds from a TRF file
+
+    Players already in the database with the same name and a valid birth
+    date are reused; the others are created, one per starting rank, with
+    IDs TR00001, TR00002... as TRF files do not hold national IDs.
+    Pairing-allocated byes are imported, other byes and absences are not
+    since rounds only hold matches.
+
+    Args:
+        data_manager: DataManager or SqliteDataManager
+        file: Text file object
+
+    Returns:
+        tuple: (tournament name, list of warnings)
+
+    Raises:
+        ValueError: If the file holds no tournament or the tournament
+        already exists
+    """
+    parsed = read_trf(file)
+    info = parsed["tournament"]
+    if not info["name"] or not parsed["players"]:
+        raise ValueError("Le fichier ne contient pas de tournoi TRF")
+    if data_manager.get_tournament_summary(info["name"]):
+        raise ValueError(f"Un tournoi avec le nom {info['name']} existe déjà.")
+    warnings = []
+    existing = data_manager.get_players()
+    known = {(player["last_name"], player["first_name"], player["birth_date"]):
+             national_id for national_id, player in existing.items()}
+    number = 0
+    ids = {}
+    reused = set()
+    new_players = []
+    for player in parsed["players"]:
+        key = (player["last_name"], player["first_name"], player["birth_date"])
+        valid = DATE.fullmatch(player["birth_date"])
+        national_id = known.get(key) if valid else None
+        if national_id is None or national_id in reused:
+            number += 1
+            while f"TR{number:05d}" in existing:
+                number += 1
+            national_id = f"TR{number:05d}"
+            new_players.append(Player(*key, national_id))
+            if not valid:
+                warnings.append(f"{player['last_name']} : date de naissance "
+                                f"absente ou invalide")
+        else:
+            reused.add(national_id)
+        ids[player["start_rank"]] = national_id
+    rounds_data, byes = _rounds_data(parsed, ids)
+    if byes:
+        warnings.append(f"{byes} exemption(s) non importée(s)")
+    tournament = Tournament(info["name"], info["location"], info["start_date"],
+                            info["end_date"] or info["start_date"],
+                            info["rounds"], "Importé depuis un fichier TRF")
+    tournament.players = [Player(player["last_name"], player["first_name"],
+                                 player["birth_date"], ids[player["start_rank"]])
+                          for player in parsed["players"]]
+    tournament.player_index = PlayerIndex(tournament.player_ids)
+    for index, round_data in enumerate(rounds_data):
+        tournament.add_round(index,
+                             Round.from_dict(round_data, tournament.player_index))
+    if len(rounds_data) == info["rounds"] and rounds_data[-1]["end_time"] is not None:
+        tournament.status = "Terminé"
+    elif rounds_data:
+        tournament.status = "En cours"
+    if new_players:
+        data_manager.save_players(new_players)
+    data_manager.save_tournament(tournament)
+    return info["name"], warnings
+
+
+def iter_trf_lines(tournament, players):
+    """Generate the lines of the TRF file of a tournament
+
+    Args:
+        tournament (dict): Tournament data with its rounds
+        players (dict): Player data keyed by national ID, must hold the
+        players of the tournament
+
+    Yields:
+        str: Lines of the file, without line endings
+    """
+    player_ids = tournament.get("players", [])
+    start_ranks = {player_id: rank for rank, player_id in enumerate(player_ids, 1)}
+    rounds_data = tournament.get("rounds_data", [])
+    results = {player_id: [None] * len(rounds_data) for player_id in player_ids}
+    for index, round_data in enumerate(rounds_data):
+        for (white, white_score), (black, black_score) in round_data["matches"]:
+            if black is None:
+                if white in results:
+                    results[white][index] = ("0000", "-", PAIRING_BYE)
+                continue
+            played = white_score or black_score
+            for player_id, opponent, color, score in (
+                    (white, black, "w", white_score),
+                    (black, white, "b", black_score)):
+                if player_id in results:
+                    code = ("1" if score == 1 else "=" if score == 0.5 else "0"
+                            ) if played else " "
+                    results[player_id][index] = (start_ranks.get(opponent, 0),
+                                                 color, code)
+    standings = Standings.compute(tournament)
+    order = sorted(player_ids, key=lambda player_id: (-standings[player_id]["points"],
+                                                      start_ranks[player_id]))
+    places = {player_id: place for place, player_id in enumerate(order, 1)}
+
+    yield f"012 {tournament.get('name', '')}"
+    yield f"022 {tournament.get('location', '')}"
+    yield f"042 {_trf_day(tournament['start_date'])}"
+    yield f"052 {_trf_day(tournament['end_date'])}"
+    yield f"062 {len(player_ids)}"
+    yield ("092 Individual: Round-Robin" if tournament.get("pairing") in CYCLES
+           else "092 Individual: Swiss-System")
+    yield f"XXR {tournament.get('rounds', len(rounds_data))}"
+    if rounds_data:
+        yield "132" + " " * (ROUND_START - 5) + "".join(
+            f"  {_trf_day(date_of(round_data['start_time']))[2:]:8}"
+            for round_data in rounds_data)
+    for player_id in player_ids:
+        player = players.get(player_id, {})
+        name = f"{player.get('last_name', '')}, {player.get('first_name', '')}"
+        line = (f"001 {start_ranks[player_id]:>4}      {name[:33]:<33} "
+                f"{'':>4} {'':>3} {'':>11} "
+                f"{_trf_date(player.get('birth_date', '')):>10} "
+                f"{standings[player_id]['points']:>4.1f} {places[player_id]:>4}")
+        for result in results[player_id]:
+            line += (f"  {result[0]:>4} {result[1]} {result[2]}" if result
+                     else " " * ROUND_WIDTH)
+        yield line.rstrip()
+
+
+def write_trf(file, tournament, players):
+    """Write the TRF file of a tournament line by line
+
+    Args:
+        file: Text file object opened for writing
+        tournament (dict): Tournament data with its rounds
+        players (dict): Player data keyed by national ID
+    """
+    for line in iter_trf_lines(tournament, players):
+        file.write(line + "\n")
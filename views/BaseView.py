@@ -17,6 +17,7 @@ class BaseView:
             - Sets up responsive grid layout
             - Loads and displays chess logo
             - Creates content container for child views
+            - Shows a status bar with the number of unsaved changes
         """
 
         self.master = master
@@ -79,3 +80,24 @@ class BaseView:
                                                  weight=1)
         self.content_container.grid_columnconfigure(0,
                                                     weight=1)
+
+        # Status bar showing the saves not written to disk yet
+        self.status_label = ttk.Label(self.frame,
+                                      style='Status.TLabel')
+        self.status_label.grid(row=2,
+                               column=0,
+                               sticky="e",
+                               padx=20,
+                               pady=(0, 10))
+
+    def set_unsaved_changes(self, count):
+        """Display the number of unsaved changes
+
+        Args:
+            count (int): Number of saves not written to disk yet
+        """
+        if count:
+            text = f"Modifications non enregistrées : {count}"
+        else:
+            text = "Toutes les modifications sont enregistrées"
+        self.status_label.configure(text=text)
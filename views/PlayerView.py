@@ -1,5 +1,5 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 
 
 class PlayerView(ttk.Frame):
@@ -63,7 +63,7 @@ class PlayerView(ttk.Frame):
         - Birth date
         - National ID
         """
-        for i in range(5):
+        for i in range(6):
             self.add_player_frame.grid_rowconfigure(i,
                                                     weight=1)
             self.add_player_frame.grid_columnconfigure(0,
@@ -107,6 +107,15 @@ class PlayerView(ttk.Frame):
                           columnspan=2,
                           pady=20)
 
+        ttk.Button(self.add_player_frame,
+                   text="Importer un fichier CSV",
+                   command=self.import_players,
+                   style='Custom.TButton'
+                   ).grid(row=5,
+                          column=0,
+                          columnspan=2,
+                          pady=(0, 20))
+
     def _setup_list_players_tab(self):
         """Set up the tab for displaying the list of players
 
@@ -199,6 +208,27 @@ class PlayerView(ttk.Frame):
         else:
             messagebox.showerror("Erreur", message)
 
+    def import_players(self):
+        """Import players from a CSV file chosen by the user"""
+        filepath = filedialog.askopenfilename(
+            title="Importer des joueurs",
+            filetypes=[("Fichiers CSV", "*.csv"), ("Tous les fichiers", "*.*")])
+        if not filepath:
+            return
+        imported, errors = self.callbacks.get('import_players')(filepath)
+        message = f"{imported} joueur(s) importé(s)."
+        if errors:
+            message += f"\n{len(errors)} ligne(s) rejetée(s) :\n"
+            message += "\n".join(f"Ligne {line} : {error}"
+                                 for line, error in errors[:15])
+            if len(errors) > 15:
+                message += "\n..."
+            messagebox.showwarning("Import", message)
+        else:
+            messagebox.showinfo("Import", message)
+        if imported:
+            self.load_players()
+
     def handle_click(self, event):
         """Handle click events on the players table"""
         region = self.players_table.identify_region(event.x,
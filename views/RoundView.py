@@ -1,5 +1,6 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+from utils.Dates import format_time
 
 
 class RoundView(ttk.Frame):
@@ -308,18 +309,15 @@ class RoundView(ttk.Frame):
         for item in self.rounds_table.get_children():
             self.rounds_table.delete(item)
 
-        rounds_data = self.tournament_data.get('rounds_data',
-                                               [])
-
-        for round_data in rounds_data:
-            status = "Terminé" if round_data.get('end_time') else "En cours"
+        for round_data in self.tournament_data.rounds_data:
+            status = "Terminé" if round_data.is_finished else "En cours"
             self.rounds_table.insert(
                 "",
                 tk.END,
                 values=(
-                    round_data.get('name', ''),
-                    round_data.get('start_time', ''),
-                    round_data.get('end_time', ''),
+                    round_data.name,
+                    format_time(round_data.start_time),
+                    format_time(round_data.end_time),
                     status
                 )
             )
@@ -339,32 +337,27 @@ class RoundView(ttk.Frame):
             player_names = self.callbacks.get('get_player_names')()
 
         # Load matches from all rounds
-        rounds_data = self.tournament_data.get('rounds_data', [])
-
-        for round_data in rounds_data:
-            round_name = round_data.get('name', '')
-
-            for match in round_data.get('matches', []):
-                if isinstance(match, list) and len(match) == 2:
-                    player1_id, score1 = match[0]
-                    player2_id, score2 = match[1]
-
-                    player1_name = player_names.get(player1_id, f"Joueur {player1_id}")
-                    player2_name = player_names.get(player2_id, f"Joueur {player2_id}")
-
-                    self.matches_table.insert(
-                        "",
-                        tk.END,
-                        values=(
-                            round_name,
-                            player1_name,
-                            score1,
-                            player2_name,
-                            score2
-                        ),
-                        # Store player IDs as tags for later use
-                        tags=(player1_id, player2_id)
-                    )
+        for round_data in self.tournament_data.rounds_data:
+            for match in round_data.matches:
+                player1_name = player_names.get(match.player1,
+                                                f"Joueur {match.player1}")
+                player2_name = ("Exemption" if match.is_bye
+                                else player_names.get(match.player2,
+                                                      f"Joueur {match.player2}"))
+
+                self.matches_table.insert(
+                    "",
+                    tk.END,
+                    values=(
+                        round_data.name,
+                        player1_name,
+                        match.score1,
+                        player2_name,
+                        match.score2
+                    ),
+                    # Store player IDs as tags for later use
+                    tags=match.players[:1] if match.is_bye else match.players
+                )
 
     def update_rankings(self):
         """Update the player rankings display"""
@@ -446,6 +439,11 @@ class RoundView(ttk.Frame):
         values = self.matches_table.item(item)['values']
         tags = self.matches_table.item(item)['tags']
 
+        if len(tags) < 2:
+            messagebox.showinfo("Information",
+                                "Une exemption n'a pas de score à saisir")
+            return
+
         round_name = values[0]
         player1_id, player2_id = tags[0], tags[1]
 
@@ -1,5 +1,7 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
+from models.Pairing import DEFAULT_PAIRING, PAIRING_SYSTEMS
+from utils.Dates import format_date
 
 
 class TournamentView(ttk.Frame):
@@ -64,6 +66,7 @@ class TournamentView(ttk.Frame):
         - Start/End dates
         - Number of rounds
         - Description
+        - Pairing system
         """
         for i in range(7):
             self.add_tournament_frame.grid_rowconfigure(i,
@@ -105,6 +108,24 @@ class TournamentView(ttk.Frame):
                        pady=10)
             self.entries[field_name] = entry
 
+        ttk.Label(self.add_tournament_frame,
+                  text="Appariements:",
+                  style='Custom.TLabel').grid(row=len(fields),
+                                              column=0,
+                                              sticky='e',
+                                              padx=10,
+                                              pady=10)
+        self.pairing_choice = ttk.Combobox(self.add_tournament_frame,
+                                           values=list(PAIRING_SYSTEMS.values()),
+                                           state="readonly",
+                                           width=37)
+        self.pairing_choice.set(PAIRING_SYSTEMS[DEFAULT_PAIRING])
+        self.pairing_choice.grid(row=len(fields),
+                                 column=1,
+                                 sticky='w',
+                                 padx=10,
+                                 pady=10)
+
         ttk.Button(self.add_tournament_frame,
                    text="Enregistrer",
                    command=self.save_tournament,
@@ -198,6 +219,18 @@ class TournamentView(ttk.Frame):
                    text="Gestion du tournoi",
                    command=self.start_selected_tournament,
                    style='Custom.TButton').pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame,
+                   text="Importer TRF",
+                   command=self.import_trf,
+                   style='Custom.TButton').pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame,
+                   text="Exporter TRF",
+                   command=self.export_trf,
+                   style='Custom.TButton').pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame,
+                   text="Archiver les terminés",
+                   command=self.archive_tournaments,
+                   style='Custom.TButton').pack(side=tk.LEFT, padx=5)
 
         self.load_tournaments()
 
@@ -208,7 +241,9 @@ class TournamentView(ttk.Frame):
             "start_date": self.entries["start_date"].get().strip(),
             "end_date": self.entries["end_date"].get().strip(),
             "rounds": self.entries["rounds"].get().strip() or "4",
-            "description": self.entries["description"].get("1.0", tk.END).strip()
+            "description": self.entries["description"].get("1.0", tk.END).strip(),
+            "pairing": next(key for key, label in PAIRING_SYSTEMS.items()
+                            if label == self.pairing_choice.get())
         }
 
         # Add the original name if in edit mode
@@ -236,6 +271,7 @@ class TournamentView(ttk.Frame):
                              tk.END)
             else:
                 entry.delete(0, tk.END)
+        self.pairing_choice.set(PAIRING_SYSTEMS[DEFAULT_PAIRING])
 
         self.edit_mode = False
         self.current_tournament_name = None
@@ -268,10 +304,13 @@ class TournamentView(ttk.Frame):
         # Fill the form fields
         for field in ["name", "location", "start_date", "end_date", "rounds"]:
             if field in self.entries and field in tournament_data:
+                value = tournament_data[field]
+                if field in ("start_date", "end_date"):
+                    value = format_date(value)
                 self.entries[field].delete(0,
                                            tk.END)
                 self.entries[field].insert(0,
-                                           tournament_data[field])
+                                           value)
 
         # Handle the description text widget separately
         if "description" in self.entries and "description" in tournament_data:
@@ -279,6 +318,8 @@ class TournamentView(ttk.Frame):
                                                tk.END)
             self.entries["description"].insert("1.0",
                                                tournament_data["description"])
+        self.pairing_choice.set(
+            PAIRING_SYSTEMS[tournament_data.get("pairing", DEFAULT_PAIRING)])
 
         # Update UI to reflect edit mode
         self.edit_mode = True
@@ -306,7 +347,7 @@ class TournamentView(ttk.Frame):
                     tournament_data["name"],
                     tournament_data["location"],
                     status,  # Add status here
-                    tournament_data["start_date"],
+                    format_date(tournament_data["start_date"]),
                     len(tournament_data.get("players", [])),
                     "✏️"
                 )
@@ -401,6 +442,54 @@ class TournamentView(ttk.Frame):
             messagebox.showwerror("Aucun joueur sélectionné",
                                   "Veuillez sélectionner au moins un joueur")
 
+    def import_trf(self):
+        """Import a tournament from a TRF file chosen by the user"""
+        filepath = filedialog.askopenfilename(
+            title="Importer un tournoi",
+            filetypes=[("Fichiers TRF", "*.trf *.txt"), ("Tous les fichiers", "*.*")])
+        if not filepath:
+            return
+        success, message = self.callbacks.get('import_trf')(filepath)
+        if success:
+            messagebox.showinfo("Succès", message)
+            self.load_tournaments()
+        else:
+            messagebox.showerror("Erreur", message)
+
+    def export_trf(self):
+        """Export the selected tournament to a TRF file"""
+        selected = self.tournaments_table.selection()
+        if not selected:
+            messagebox.showwarning("Sélection requise",
+                                   "Veuillez sélectionner un tournoi")
+            return
+        tournament_name = self.tournaments_table.item(selected[0])['values'][0]
+        filepath = filedialog.asksaveasfilename(
+            title="Exporter le tournoi",
+            defaultextension=".trf",
+            initialfile=f"{tournament_name}.trf",
+            filetypes=[("Fichiers TRF", "*.trf")])
+        if not filepath:
+            return
+        success, message = self.callbacks.get('export_trf')(tournament_name, filepath)
+        if success:
+            messagebox.showinfo("Succès", message)
+        else:
+            messagebox.showerror("Erreur", message)
+
+    def archive_tournaments(self):
+        """Archive the finished tournaments after confirmation"""
+        if not messagebox.askyesno("Archiver",
+                                   "Déplacer les tournois terminés vers les "
+                                   "archives de leur saison ?"):
+            return
+        success, message = self.callbacks.get('archive_tournaments')()
+        if success:
+            messagebox.showinfo("Succès", message)
+            self.load_tournaments()
+        else:
+            messagebox.showerror("Erreur", message)
+
     def start_selected_tournament(self):
         selected = self.tournaments_table.selection()
         if not selected: